@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import CustomUser, JobDescription, OTP, Resume, ResumeAnalysis, Feedback
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .forms import UserImportForm
+from .models import CustomUser, ImageJob, JobDescription, OTP, OutboundEmail, Resume, ResumeAnalysis, Feedback
+from .user_import import import_uploaded_file
 
 @admin.register(CustomUser)
 class CustomUserAdmin(admin.ModelAdmin):
@@ -8,6 +14,34 @@ class CustomUserAdmin(admin.ModelAdmin):
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('-last_login',)
 
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_users_view), name='job_analysis_customuser_import'),
+        ] + super().get_urls()
+
+    def import_users_view(self, request):
+        # Smaller cohorts only; large files should go through `manage.py import_users`, which hashes in parallel.
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = UserImportForm()
+        if request.method == 'POST':
+            data = request.POST.copy()
+            # An unticked checkbox is left out of the POST, which UserImportForm reads as "send".
+            data.setdefault('send_welcome_email', '')
+            form = UserImportForm(data, request.FILES)
+            if form.is_valid():
+                try:
+                    totals = import_uploaded_file(form.cleaned_data['file'],
+                                                  send_welcome_email=form.cleaned_data['send_welcome_email'])
+                except (ValueError, UnicodeDecodeError) as e:
+                    form.add_error('file', f"Could not read the file: {e}")
+                else:
+                    self.message_user(request, f"Imported {totals['created']} users ({totals['skipped']} already existed, "
+                                               f"{totals['invalid']} invalid rows) in {totals['seconds']}s.")
+                    return redirect('admin:job_analysis_customuser_changelist')
+        context = {**self.admin_site.each_context(request), 'title': 'Import users', 'opts': self.model._meta, 'form': form}
+        return TemplateResponse(request, 'import_users.html', context)
+
 @admin.register(JobDescription)
 class JobDescriptionAdmin(admin.ModelAdmin):
     list_display = ('title', 'company_name', 'posted_at')
@@ -43,6 +77,20 @@ class FeedbackAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'comment')
     ordering = ('-created_at',)
 
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'last_error')
+    ordering = ('-created_at',)
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('source', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at', 'processed_at')
+    list_filter = ('status', 'kind', 'created_at')
+    search_fields = ('source', 'last_error')
+    ordering = ('-created_at',)
+
 # Unregister the default admin registrations
 admin.site.unregister(CustomUser)
 admin.site.unregister(JobDescription)
@@ -1,45 +1,286 @@
+import json
+from datetime import timedelta
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from .models import CustomUser, ResumeAnalysis, JobDescription
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import (
+    AnalysisSkill, CustomUser, ResumeAnalysis, JobDescription, Resume, ResumeSkill, Skill, SkillDayStat, DEGREE_LEVELS,
+)
+from .skills import canonical_skill_name
+from .ranking import ranking_index
+from .minhash import DEFAULT_THRESHOLD, find_similar
+from .token_cache import get_token_user_cache
+from .outbox import outbox_stats
+from .forms import UserImportForm
+from .user_import import import_uploaded_file
+from .streaming import CHUNK_SIZE as STREAM_CHUNK_SIZE, streaming_json_response
+from .pagination import InvalidCursor, get_page_size, pack_cursor, paginate, unpack_cursor
+from .projection import Field, Projection
+from . import rollups, search
+
+DASHBOARD_ANALYSIS = Projection({
+    "id": "id",
+    "user_email": "user__email",
+    "job_title": "job_description__title",
+    "company": "job_description__company_name",
+    "match_percentage": "match_percentage",
+    "missing_skills": "missing_skills",
+    "extra_skills": "extra_skills",
+    "analyzed_at": Field("analyzed_at", lambda value: value.strftime('%Y-%m-%d %H:%M:%S')),
+    "user_details": {
+        "first_name": "user__first_name",
+        "last_name": "user__last_name",
+        "phone_number": "user__phone_number",
+    },
+})
+
+def _date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD).")
+    return day
+
+def _float_param(request, name):
+    value = request.GET.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number.")
 
 @login_required
 @require_http_methods(["GET"])
 def admin_dashboard(request):
+    """
+    Dashboard summary: analysis count, average match, analyses per day and top
+    companies, optionally between ``since`` and ``until``. Served from the
+    ``rollups`` tables; the analyses themselves are listed by ``dashboard_analyses``.
+    """
     if not request.user.is_admin:
         return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
-    
-    # Get all analyses with related user and job description
-    analyses = ResumeAnalysis.objects.select_related('user', 'job_description').all()
-    
-    # Prepare data for response
+
+    try:
+        since, until = _date_param(request, 'since'), _date_param(request, 'until')
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "message": "Dashboard summary retrieved successfully",
+        "total_users": CustomUser.objects.count(),
+        **rollups.summary(since, until),
+    }, status=200)
+
+# Longest range a trend endpoint returns, one entry per day.
+MAX_TREND_DAYS = 731
+
+def _trend_range(request, default_days=30):
+    until = _date_param(request, 'until') or rollups.day_of(timezone.now())
+    since = _date_param(request, 'since') or until - timedelta(days=default_days - 1)
+    if since > until:
+        raise ValueError("since must not be after until.")
+    if (until - since).days >= MAX_TREND_DAYS:
+        raise ValueError(f"The range may cover at most {MAX_TREND_DAYS} days.")
+    return since, until
+
+@login_required
+@require_http_methods(["GET"])
+def analysis_trends(request):
+    """
+    Analyses and average match per day between ``since`` and ``until`` (by
+    default the last 30 days), optionally for one ``company``.
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    try:
+        since, until = _trend_range(request)
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "message": "Analysis trends retrieved successfully",
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "trend": rollups.match_trend(since, until, request.GET.get('company')),
+    }, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def skill_trends(request):
+    """
+    Skills most often missing (``kind=missing``, the default) or extra
+    (``kind=extra``) between ``since`` and ``until``; with ``skill``, that
+    skill's count per day instead.
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    kind = request.GET.get('kind', SkillDayStat.KIND_MISSING)
+    if kind not in dict(SkillDayStat.KIND_CHOICES):
+        return JsonResponse({"success": False, "message": "kind must be 'missing' or 'extra'."}, status=400)
+    try:
+        since, until = _trend_range(request)
+        limit = max(1, min(int(request.GET.get('limit', 10)), 100))
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+
+    response = {
+        "success": True,
+        "message": "Skill trends retrieved successfully",
+        "kind": kind,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+    }
+    skill = request.GET.get('skill')
+    if skill:
+        name = canonical_skill_name(skill)
+        if name is None:
+            return JsonResponse({"success": False, "message": f"Unknown skill: {skill}"}, status=400)
+        response.update(skill=name, trend=rollups.skill_trend(kind, name, since, until))
+    else:
+        response["skills"] = rollups.top_skills(kind, since, until, limit)
+    return JsonResponse(response, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def skill_gaps(request):
+    """
+    How many candidates (and analyses) list each skill as missing (``kind=missing``,
+    the default) or extra, most common first; ``skill`` narrows it to one skill.
+    Counted from ``AnalysisSkill`` with a GROUP BY on its (kind, skill, user) index.
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    kind = request.GET.get('kind', AnalysisSkill.KIND_MISSING)
+    if kind not in dict(AnalysisSkill.KIND_CHOICES):
+        return JsonResponse({"success": False, "message": "kind must be 'missing' or 'extra'."}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        return JsonResponse({"success": False, "message": "limit must be an integer."}, status=400)
+
+    links = AnalysisSkill.objects.filter(kind=kind)
+    skill = request.GET.get('skill')
+    if skill:
+        name = canonical_skill_name(skill)
+        skill_id = Skill.objects.filter(name=name).values_list('id', flat=True).first() if name else None
+        if skill_id is None:
+            return JsonResponse({"success": False, "message": f"Unknown skill: {skill}"}, status=400)
+        links = links.filter(skill_id=skill_id)
+
+    rows = list(
+        links.values('skill_id').annotate(candidates=Count('user_id', distinct=True), analyses=Count('id'))
+        .order_by('-candidates', 'skill_id')[:limit]
+    )
+    names = dict(Skill.objects.filter(id__in=[row['skill_id'] for row in rows]).values_list('id', 'name'))
+
+    return JsonResponse({
+        "success": True,
+        "message": "Skill gaps retrieved successfully",
+        "kind": kind,
+        "skills": [
+            {"skill": names[row['skill_id']], "candidates": row['candidates'], "analyses": row['analyses']}
+            for row in rows
+        ],
+    }, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def dashboard_analyses(request):
+    """
+    Analyses newest first, one keyset page per request, filtered by ``company``,
+    ``since``/``until`` (days) and ``min_match``/``max_match``.
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    analyses = ResumeAnalysis.objects.all()
+    try:
+        since, until = _date_param(request, 'since'), _date_param(request, 'until')
+        min_match, max_match = _float_param(request, 'min_match'), _float_param(request, 'max_match')
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+    if request.GET.get('company'):
+        analyses = analyses.filter(job_description__company_name=request.GET['company'])
+    if since:
+        analyses = analyses.filter(analyzed_at__gte=rollups.day_bounds(since)[0])
+    if until:
+        analyses = analyses.filter(analyzed_at__lt=rollups.day_bounds(until)[1])
+    if min_match is not None:
+        analyses = analyses.filter(match_percentage__gte=min_match)
+    if max_match is not None:
+        analyses = analyses.filter(match_percentage__lte=max_match)
+
+    try:
+        rows, page_info = paginate(
+            request, DASHBOARD_ANALYSIS.values(analyses, 'user__city', 'user__country'), field='analyzed_at'
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+
     analysis_data = []
-    for analysis in analyses:
-        analysis_data.append({
-            "user_email": analysis.user.email,
-            "job_title": analysis.job_description.title,
-            "company": analysis.job_description.company_name,
-            "match_percentage": analysis.match_percentage,
-            "missing_skills": analysis.missing_skills,
-            "extra_skills": analysis.extra_skills,
-            "analyzed_at": analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "user_details": {
-                "first_name": analysis.user.first_name,
-                "last_name": analysis.user.last_name,
-                "phone_number": analysis.user.phone_number,
-                "location": f"{analysis.user.city}, {analysis.user.country}" if analysis.user.city else "N/A"
-            }
-        })
-    
+    for row in rows:
+        data = DASHBOARD_ANALYSIS.dict(row)
+        data["user_details"]["location"] = f"{row['user__city']}, {row['user__country']}" if row['user__city'] else "N/A"
+        analysis_data.append(data)
+
     return JsonResponse({
         "success": True,
         "message": "Analysis data retrieved successfully",
-        "analyses": analysis_data
+        "analyses": analysis_data,
+        "pagination": page_info
     }, status=200)
 
+@login_required
+@require_http_methods(["GET"])
+def export_dashboard_analyses(request):
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+    
+    # Every analysis is returned, so rows are streamed instead of collected into a list.
+    analyses = ResumeAnalysis.objects.select_related('user', 'job_description').only(
+        'match_percentage', 'missing_skills', 'extra_skills', 'analyzed_at',
+        'user__email', 'user__first_name', 'user__last_name', 'user__phone_number', 'user__city', 'user__country',
+        'job_description__title', 'job_description__company_name',
+    )
+    return streaming_json_response(
+        request,
+        {"success": True, "message": "Analysis data retrieved successfully"},
+        "analyses",
+        analyses.iterator(chunk_size=STREAM_CHUNK_SIZE),
+        serialize_dashboard_analysis,
+    )
+
+def serialize_dashboard_analysis(analysis):
+    return {
+        "user_email": analysis.user.email,
+        "job_title": analysis.job_description.title,
+        "company": analysis.job_description.company_name,
+        "match_percentage": analysis.match_percentage,
+        "missing_skills": analysis.missing_skills,
+        "extra_skills": analysis.extra_skills,
+        "analyzed_at": analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S'),
+        "user_details": {
+            "first_name": analysis.user.first_name,
+            "last_name": analysis.user.last_name,
+            "phone_number": analysis.user.phone_number,
+            "location": f"{analysis.user.city}, {analysis.user.country}" if analysis.user.city else "N/A"
+        }
+    }
+
 @login_required
 @require_http_methods(["GET"])
 def get_analysis_details(request, analysis_id):
@@ -75,36 +316,312 @@ def get_analysis_details(request, analysis_id):
     except ResumeAnalysis.DoesNotExist:
         return JsonResponse({"success": False, "message": "Analysis not found"}, status=404)
 
+# Search results stop after this many matches however far the client pages.
+SEARCH_RESULT_CAP = 500
+
+ANALYSIS_SEARCH_RESULT = Projection({
+    "id": "id",
+    "user_email": "user__email",
+    "job_title": "job_description__title",
+    "company": "job_description__company_name",
+    "match_percentage": "match_percentage",
+    "analyzed_at": Field("analyzed_at", lambda value: value.strftime('%Y-%m-%d %H:%M:%S')),
+})
+
 @login_required
 @require_http_methods(["GET"])
 def search_analyses(request):
+    """
+    Search analyses by user email or name and JD title or company.
+
+    Matches come from the full-text index over ``ResumeAnalysis.search_document``
+    (every word required, the last one as a prefix), best first, one page per
+    request and at most ``SEARCH_RESULT_CAP`` in total. Without a query the most
+    recent analyses are listed.
+    """
     if not request.user.is_admin:
         return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
     
     query = request.GET.get('q', '')
-    
-    # Search across multiple fields
-    analyses = ResumeAnalysis.objects.select_related('user', 'job_description').filter(
-        Q(user__email__icontains=query) |
-        Q(job_description__title__icontains=query) |
-        Q(job_description__company_name__icontains=query) |
-        Q(user__first_name__icontains=query) |
-        Q(user__last_name__icontains=query)
-    )
-    
-    analysis_data = []
-    for analysis in analyses:
-        analysis_data.append({
-            "id": analysis.id,
-            "user_email": analysis.user.email,
-            "job_title": analysis.job_description.title,
-            "company": analysis.job_description.company_name,
-            "match_percentage": analysis.match_percentage,
-            "analyzed_at": analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S')
-        })
+
+    try:
+        if not search.query_terms(query):
+            rows, page_info = paginate(
+                request, ANALYSIS_SEARCH_RESULT.values(ResumeAnalysis.objects.all(), 'analyzed_at'), field='analyzed_at'
+            )
+            analysis_data = [ANALYSIS_SEARCH_RESULT.dict(row) for row in rows]
+        else:
+            page_size = get_page_size(request)
+            after, served = None, 0
+            if request.GET.get('cursor'):
+                payload = unpack_cursor(request.GET['cursor'])
+                try:
+                    after, served = (float(payload['s']), int(payload['id'])), int(payload['n'])
+                except (KeyError, TypeError, ValueError):
+                    raise InvalidCursor('Invalid cursor.')
+            limit = max(min(page_size, SEARCH_RESULT_CAP - served), 0)
+            hits = search.search('analyses', query, limit + 1, after) if limit else []
+
+            page = hits[:limit]
+            rows = {row['pk']: row for row in ANALYSIS_SEARCH_RESULT.values(
+                ResumeAnalysis.objects.filter(pk__in=[hit['id'] for hit in page])
+            )}
+            analysis_data = [
+                {**ANALYSIS_SEARCH_RESULT.dict(rows[hit['id']]), "score": hit['score']} for hit in page if hit['id'] in rows
+            ]
+            next_cursor = None
+            if len(hits) > limit and served + limit < SEARCH_RESULT_CAP:
+                next_cursor = pack_cursor({'s': page[-1]['score'], 'id': page[-1]['id'], 'n': served + limit})
+            page_info = {'next_cursor': next_cursor, 'page_size': page_size}
+    except InvalidCursor as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+    except search.SearchUnavailable as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=501)
     
     return JsonResponse({
         "success": True,
         "message": "Search results retrieved successfully",
-        "results": analysis_data
+        "results": analysis_data,
+        "pagination": page_info
+    }, status=200)
+
+
+def _skill_names(value):
+    return [canonical_skill_name(name) for name in value.split(',') if name.strip()] if value else []
+
+@login_required
+@require_http_methods(["GET"])
+def candidate_search(request):
+    """
+    Find resumes by skills and experience using the normalized skill index.
+
+    Query params:
+        skills: comma-separated skills a resume must all have
+        any_skills: comma-separated skills a resume must have at least one of
+        exclude_skills: comma-separated skills a resume must not have
+        min_experience / max_experience: years of experience bounds
+        min_degree: minimum degree level (see models.DEGREE_LEVELS)
+        page / page_size: 1-based page number and page size (max 100)
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    required = _skill_names(request.GET.get('skills'))
+    any_of = _skill_names(request.GET.get('any_skills'))
+    excluded = _skill_names(request.GET.get('exclude_skills'))
+
+    try:
+        min_experience = int(request.GET.get('min_experience', 0))
+        max_experience = int(request.GET['max_experience']) if request.GET.get('max_experience') else None
+        min_degree = int(request.GET.get('min_degree', 0))
+        page_number = int(request.GET.get('page', 1))
+        page_size = min(max(int(request.GET.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "Numeric query parameters must be integers"}, status=400)
+
+    resumes = Resume.objects.select_related('user')
+
+    if required:
+        if None in required:
+            # A skill outside the taxonomy can never be matched.
+            resumes = resumes.none()
+        else:
+            skill_ids = list(Skill.objects.filter(name__in=required).values_list('id', flat=True))
+            if len(skill_ids) < len(set(required)):
+                resumes = resumes.none()
+            else:
+                # Intersect the per-skill posting lists: keep resumes present in every one of them.
+                matching = (
+                    ResumeSkill.objects.filter(skill_id__in=skill_ids)
+                    .values('resume_id')
+                    .annotate(matched=Count('skill_id'))
+                    .filter(matched=len(skill_ids))
+                    .values('resume_id')
+                )
+                resumes = resumes.filter(id__in=matching)
+
+    if any_of:
+        resumes = resumes.filter(id__in=ResumeSkill.objects.filter(skill__name__in=any_of).values('resume_id'))
+
+    excluded = [name for name in excluded if name]
+    if excluded:
+        resumes = resumes.exclude(id__in=ResumeSkill.objects.filter(skill__name__in=excluded).values('resume_id'))
+
+    if min_experience:
+        resumes = resumes.filter(experience_years__gte=min_experience)
+    if max_experience is not None:
+        resumes = resumes.filter(experience_years__lte=max_experience)
+    if min_degree:
+        resumes = resumes.filter(degree_level__gte=min_degree)
+
+    paginator = Paginator(resumes.order_by('-experience_years', '-degree_level', 'id'), page_size)
+    try:
+        page = paginator.page(page_number)
+    except EmptyPage:
+        page = None
+
+    degree_names = dict(DEGREE_LEVELS)
+    results = []
+    for resume in (page.object_list if page else []):
+        results.append({
+            "resume_id": resume.id,
+            "user_email": resume.user.email,
+            "full_name": f"{resume.user.first_name} {resume.user.last_name}",
+            "skills": resume.skills,
+            "experience_years": resume.experience_years,
+            "degree": degree_names.get(resume.degree_level),
+            "uploaded_at": resume.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    return JsonResponse({
+        "success": True,
+        "message": "Candidates retrieved successfully",
+        "results": results,
+        "pagination": {
+            "page": page_number,
+            "page_size": page_size,
+            "total": paginator.count,
+            "has_next": page.has_next() if page else False
+        }
+    }, status=200)
+
+@csrf_exempt
+@login_required
+@require_http_methods(["POST"])
+def rank_resumes(request):
+    """
+    Return the stored resumes that best match one job description, best first.
+
+    Body (JSON): job_description_text or job_description_id, plus optional
+    page, page_size (max 100) and skill_weight (0-1, default 0.5).
+    """
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    # Deferred: importing the analysis views loads the NLTK corpora.
+    from .views.analysis_views import extract_skills, preprocess_text
+
+    try:
+        data = json.loads(request.body)
+        page_number = max(int(data.get('page', 1)), 1)
+        page_size = min(max(int(data.get('page_size', 20)), 1), 100)
+        skill_weight = min(max(float(data.get('skill_weight', 0.5)), 0.0), 1.0)
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return JsonResponse({"success": False, "message": "Invalid JSON in request body"}, status=400)
+
+    jd_text = data.get('job_description_text')
+    if not jd_text and data.get('job_description_id'):
+        try:
+            jd_text = JobDescription.objects.values_list('description', flat=True).get(id=data['job_description_id'])
+        except JobDescription.DoesNotExist:
+            return JsonResponse({"success": False, "message": "Job description not found"}, status=404)
+    if not jd_text:
+        return JsonResponse({"success": False, "message": "Job Description text or id is required"}, status=400)
+
+    results, total = ranking_index.rank(
+        preprocess_text(jd_text),
+        extract_skills(jd_text),
+        offset=(page_number - 1) * page_size,
+        limit=page_size,
+        skill_weight=skill_weight,
+    )
+
+    return JsonResponse({
+        "success": True,
+        "message": "Resumes ranked successfully",
+        "results": [{
+            "resume_id": result['resume'].id,
+            "user_email": result['resume'].user.email,
+            "full_name": f"{result['resume'].user.first_name} {result['resume'].user.last_name}",
+            "score": round(result['score'], 2),
+            "text_match_percentage": round(result['text_match_percentage'], 2),
+            "skills_match_percentage": round(result['skills_match_percentage'], 2),
+            "skills": result['resume'].skills,
+        } for result in results],
+        "pagination": {
+            "page": page_number,
+            "page_size": page_size,
+            "total": total,
+            "has_next": page_number * page_size < total
+        }
+    }, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def similar_job_descriptions(request, job_description_id):
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    try:
+        threshold = float(request.GET.get('threshold', DEFAULT_THRESHOLD))
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({"success": False, "message": "threshold and limit must be numeric"}, status=400)
+
+    try:
+        job_description = JobDescription.objects.defer('description').get(id=job_description_id)
+    except JobDescription.DoesNotExist:
+        return JsonResponse({"success": False, "message": "Job description not found"}, status=404)
+
+    similar = [{
+        "id": candidate.id,
+        "title": candidate.title,
+        "company": candidate.company_name,
+        "posted_at": candidate.posted_at.strftime('%Y-%m-%d %H:%M:%S'),
+        "similarity": round(score, 3)
+    } for candidate, score in find_similar(job_description, threshold=threshold, limit=limit)]
+
+    return JsonResponse({
+        "success": True,
+        "message": "Similar postings retrieved successfully",
+        "similar_postings": similar
+    }, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def token_cache_stats(request):
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    cache = get_token_user_cache()
+    return JsonResponse({
+        "success": True,
+        "message": "Token cache statistics retrieved successfully",
+        "enabled": cache is not None,
+        "stats": cache.stats() if cache is not None else None
+    }, status=200)
+
+@login_required
+@require_http_methods(["GET"])
+def email_outbox_stats(request):
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    return JsonResponse({
+        "success": True,
+        "message": "Email outbox statistics retrieved successfully",
+        "stats": outbox_stats()
+    }, status=200)
+
+@csrf_exempt
+@login_required
+@require_http_methods(["POST"])
+def import_users_view(request):
+    if not request.user.is_admin:
+        return JsonResponse({"success": False, "message": "Unauthorized access"}, status=403)
+
+    # Smaller cohorts only; large files should go through `manage.py import_users`, which hashes in parallel.
+    form = UserImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({"success": False, "message": "Invalid upload", "errors": form.errors}, status=400)
+
+    try:
+        totals = import_uploaded_file(form.cleaned_data['file'], send_welcome_email=form.cleaned_data['send_welcome_email'])
+    except (ValueError, UnicodeDecodeError) as e:
+        return JsonResponse({"success": False, "message": f"Could not read the file: {e}"}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "message": "Users imported successfully",
+        "result": totals
     }, status=200)
@@ -8,18 +8,26 @@ from nltk.stem import WordNetLemmatizer
 from sklearn.feature_extraction.text import TfidfVectorizer 
 from sklearn.metrics.pairwise import cosine_similarity 
 
+from django.db import transaction
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 from job_analysis.models import Resume, ResumeAnalysis, JobDescription, CustomUser
-from job_analysis.utils import auth_user, jwt_decode
+from job_analysis.skills import (
+    SKILL_TAXONOMY, bitset_to_skills, skill_overlap, skills_match_percentage, skills_to_bitset, sync_analysis_skills,
+    sync_job_description_skills, sync_resume_skills,
+)
+from job_analysis.utils import jwt_required
 
 nltk.download('punkt')
 nltk.download('punkt_tab')
 nltk.download('wordnet')
 nltk.download('stopwords')
 
+# Bump whenever calculate_similarity changes so stored analyses can be re-scored.
+SCORING_ENGINE_VERSION = "2"
+
 def preprocess_text(text):
     text = text.lower()
     text = re.sub(r'[^a-z\s]', '', text)
@@ -30,15 +38,15 @@ def preprocess_text(text):
     words = [lemmatizer.lemmatize(word) for word in words]
     return ' '.join(words)
 
-def extract_text_from_file(file):
+def extract_raw_text_from_file(file):
     """
-    Extract text from either PDF or DOCX file.
+    Extract text from either PDF or DOCX file, as written.
     
     Args:
         file: File object or file path
         
     Returns:
-        str: Extracted and preprocessed text
+        str: Extracted text, before preprocess_text strips digits and punctuation
     """
     text = ""
     
@@ -86,238 +94,28 @@ def extract_text_from_file(file):
         if not text.strip():
             raise ValueError(f"No text extracted from the file. Please check the file.")
 
-        return preprocess_text(text)
+        return text
 
     except Exception as e:
         print(f"Error extracting text from file: {e}")
         return None
 
-def extract_skills(text):
-    predefined_skills = [
-        # Technical Skills (General)
-        "Python", "Java", "C++", "JavaScript", "SQL", "Machine Learning", 
-        "Data Science", "Django", "Flask", "HTML", "CSS", "React", "Node.js", 
-        "AWS", "Azure", "Docker", "Kubernetes", "Git", "PostgreSQL", "MongoDB", 
-        "Agile", "Leadership", "Teamwork",
-        
-        # AI/ML & Data Science
-        "TensorFlow", "PyTorch", "OpenCV", "NLP", "Computer Vision",
-        "Deep Learning", "Neural Networks", "Reinforcement Learning",
-        "Natural Language Processing", "Text Analytics",
-        "Data Mining", "Predictive Analytics",
-        "Big Data Analytics", "Data Warehousing",
-        "ETL", "Data Pipelines", "Data Integration",
-        "Machine Learning Operations", "MLOps",
-        
-        # Cloud & Infrastructure
-        "AWS Lambda", "AWS S3", "AWS EC2", "AWS RDS",
-        "Azure Functions", "Azure Blob Storage", "Azure VMs",
-        "Google Cloud Platform", "GCP Cloud Storage",
-        "Cloud Architecture", "Cloud Security",
-        "Infrastructure as Code", "Infrastructure Automation",
-        "Terraform", "Ansible", "SaltStack",
-        
-        # DevOps & CI/CD
-        "CI/CD", "Continuous Integration", "Continuous Deployment",
-        "Jenkins", "GitLab CI", "GitHub Actions",
-        "Docker Compose", "Docker Swarm", "Kubernetes",
-        "Kafka", "RabbitMQ", "Message Queues",
-        "Redis", "Memcached", "Caching",
-        "Monitoring", "Logging", "Debugging",
-        "Performance Optimization", "Load Testing",
-        "Chaos Engineering", "Site Reliability Engineering",
-        
-        # Web Development
-        "REST API", "GraphQL", "Microservices", "Serverless",
-        "Next.js", "Nuxt.js", "Gatsby",
-        "Vue.js", "Angular", "Svelte",
-        "TypeScript", "GraphQL", "Apollo",
-        "Progressive Web Apps", "Web Components",
-        "Web Accessibility", "Performance Optimization",
-        
-        # Mobile Development
-        "React Native", "Flutter", "Swift", "Kotlin",
-        "Android", "iOS", "Xamarin", "Ionic",
-        "Mobile UI/UX", "Mobile Performance",
-        "Push Notifications", "Location Services",
-        
-        # Game Development
-        "Unity", "Unreal Engine", "Godot",
-        "Game Physics", "Game AI", "Game Graphics",
-        "Game Design", "Level Design", "Game Testing",
-        
-        # AR/VR & 3D
-        "ARKit", "ARCore", "WebXR",
-        "Three.js", "WebGL", "WebGPU",
-        "3D Modeling", "3D Animation", "3D Rendering",
-        "Virtual Reality", "Augmented Reality",
-        
-        # Security
-        "Cyber Security", "Penetration Testing", "Ethical Hacking",
-        "Network Security", "Application Security",
-        "Identity and Access Management", "IAM",
-        "Security Compliance", "Security Auditing",
-        "Security Architecture",
-        
-        # Dev Tools & IDEs
-        "Visual Studio Code", "IntelliJ IDEA", "PyCharm",
-        "Eclipse", "NetBeans", "Sublime Text",
-        "Postman", "JMeter", "Selenium",
-        "Jira", "Trello", "Asana",
-        
-        # UI/UX Design
-        "UI/UX Design", "Adobe Creative Suite", "Figma", "Sketch",
-        "Adobe XD", "InVision", "Zeplin",
-        "Wireframing", "Prototyping", "User Testing",
-        "Responsive Design", "Accessibility Design",
-        
-        # Data Visualization
-        "Tableau", "Power BI", "Matplotlib", "Seaborn",
-        "Plotly", "D3.js", "Bokeh",
-        "Data Storytelling", "Dashboard Design",
-        
-        # Version Control
-        "Git", "GitLab", "Bitbucket", "GitHub Actions",
-        "Branch Management", "Code Review",
-        "Version Control Best Practices",
-        
-        # Testing
-        "JUnit", "Selenium", "Postman", "Load Testing",
-        "Test-Driven Development", "Behavior-Driven Development",
-        "Unit Testing", "Integration Testing",
-        "Performance Testing", "Security Testing",
-        
-        # Database
-        "Database Design", "Database Optimization",
-        "SQL", "NoSQL", "MongoDB", "Cassandra",
-        "Redis", "Elasticsearch", "Neo4j",
-        
-        # Network & Systems
-        "Network Administration", "System Administration",
-        "Linux Administration", "Windows Administration",
-        "Network Security", "Network Troubleshooting",
-        
-        # IoT & Embedded Systems
-        "IoT", "Embedded Systems", "Arduino", "Raspberry Pi",
-        "Microcontrollers", "Real-time Systems",
-        "Embedded Software", "Firmware Development",
-        
-        # Engineering Skills
-        "Thermodynamics", "Fluid Mechanics", "Structural Analysis",
-        "Circuit Design", "Control Systems", "Signal Processing",
-        "Material Science", "Process Engineering", "Chemical Engineering",
-        "Aerodynamics", "Structural Design", "Mechanical Design",
-        "Electrical Systems", "Power Systems", "Electronics",
-        "Civil Engineering", "Construction Management",
-        "Chemical Process Design", "Process Optimization",
-        "Biomedical Instrumentation", "Medical Devices",
-        "Environmental Systems", "Waste Management",
-        "Materials Testing", "Manufacturing Processes",
-        "Industrial Engineering", "Operations Research",
-        
-        # Medical Skills
-        "Clinical Research", "Patient Care", "Medical Diagnosis", "Treatment Planning",
-        "Medical Records Management", "Healthcare Documentation", "Patient Assessment",
-        "Emergency Medicine", "Surgery", "Anesthesia", "Radiology", "Pathology",
-        "Pharmacology", "Medical Ethics", "Infection Control", "Sterilization",
-        "Medical Equipment Operation", "Diagnostic Testing",
-        "Nursing Care", "Physiotherapy", "Pharmacy Management",
-        "Optometry", "Medical Imaging", "Medical Laboratory",
-        
-        # Business Skills
-        "Financial Analysis", "Budgeting", "Cost Management",
-        "Marketing Strategy", "Market Research", "Sales Management",
-        "Human Resource Management", "Recruitment", "Training",
-        "Economic Analysis", "Financial Planning",
-        "Accounting", "Taxation", "Auditing",
-        "Business Strategy", "Entrepreneurship",
-        "Customer Relationship Management",
-        "Supply Chain Management", "Logistics",
-        
-        # Science Skills
-        "Physics", "Chemistry", "Biology", "Mathematics", "Statistics",
-        "Research Methodology", "Experimental Design",
-        "Data Analysis", "Scientific Computing",
-        "Environmental Science", "Ecology",
-        "Biotechnology", "Genetic Engineering",
-        "Biochemistry", "Molecular Biology",
-        "Computational Science", "Scientific Programming",
-        
-        # Arts Skills
-        "Literary Analysis", "Historical Research",
-        "Political Science", "Public Policy",
-        "Sociology", "Anthropology",
-        "Psychological Research", "Behavioral Science",
-        "Journalism", "Media Studies",
-        "Art History", "Visual Arts",
-        "Performance Arts", "Theatre Production",
-        
-        # Law Skills
-        "Legal Research", "Legal Writing",
-        "Contract Law", "Corporate Law",
-        "Intellectual Property", "Patent Law",
-        "Criminal Law", "Civil Law",
-        "Legal Advocacy", "Legal Ethics",
-        
-        # Education Skills
-        "Teaching Methodology", "Curriculum Design",
-        "Educational Technology", "Learning Assessment",
-        "Pedagogy", "Educational Research",
-        "Classroom Management", "Student Development",
-        
-        # Professional Skills
-        "Accounting", "Auditing", "Taxation",
-        "Legal Practice", "Legal Consultation",
-        "Architecture", "Urban Planning",
-        "Surveying", "Construction Management",
-        
-        # Specialized Skills
-        "Data Science", "Machine Learning", "AI Development",
-        "Digital Marketing", "SEO", "Social Media",
-        "Hospitality Management", "Food Service",
-        "Event Planning", "Tourism Management",
-        "Social Work", "Community Development",
-        "Public Administration", "Policy Analysis",
-        "Sports Science", "Physical Training",
-        "Music Theory", "Composition",
-        "Dance Choreography", "Theatre Direction",
-        
-        # Non-Technical Skills
-        "Communication", "Problem Solving", "Time Management", "Adaptability",
-        "Critical Thinking", "Decision Making", "Conflict Resolution",
-        "Project Management", "Budget Management", "Risk Management",
-        "Customer Service", "Negotiation", "Presentation", "Research",
-        "Data Analysis", "Report Writing", "Documentation", "Quality Control",
-        "Team Leadership", "Mentoring", "Stress Management", "Multi-tasking",
-        "Attention to Detail", "Creativity", "Strategic Thinking",
-        "Business Development", "Marketing", "Sales",
-        
-        # Sports Skills
-        "Football", "Cricket", "Basketball", "Volleyball", "Badminton",
-        "Tennis", "Swimming", "Athletics", "Track and Field",
-        "Gymnastics", "Martial Arts", "Karate", "Taekwondo",
-        "Yoga", "Aerobics", "Fitness Training",
-        "Team Sports", "Individual Sports", "Sports Leadership",
-        "Sportsmanship", "Sports Strategy",
-        
-        # Dance Skills
-        "Bharatanatyam", "Kathak", "Kuchipudi", "Odissi",
-        "Ballet", "Hip-Hop", "Contemporary", "Jazz",
-        "Salsa", "Bhangra", "Garba", "Folk Dance",
-        "Choreography", "Performance", "Stage Presence",
-        "Dance Technique", "Rhythm", "Expression",
+def extract_text_from_file(file):
+    """
+    Extract text from either PDF or DOCX file.
+    
+    Args:
+        file: File object or file path
         
-        # Singing Skills
-        "Classical Singing", "Carnatic Music", "Hindustani Music",
-        "Western Classical", "Pop Singing", "Jazz Singing",
-        "Vocal Training", "Sight Reading", "Music Theory",
-        "Instrumental", "Guitar", "Piano", "Keyboard",
-        "Voice Modulation", "Breathing Techniques",
-        "Stage Performance", "Audition Preparation",
-        "Music Production", "Recording", "Composition"
-    ]
+    Returns:
+        str: Extracted and preprocessed text
+    """
+    text = extract_raw_text_from_file(file)
+    return preprocess_text(text) if text is not None else None
+
+def extract_skills(text):
     text = text.lower()
-    matching_skills = [skill for skill in predefined_skills if skill.lower() in text]
+    matching_skills = [skill for skill in SKILL_TAXONOMY if skill.lower() in text]
     return matching_skills
 
 def extract_education(text):
@@ -385,6 +183,22 @@ def extract_education(text):
     matching_degrees = [degree for degree in predefined_degrees if degree in text]
     return matching_degrees
 
+DEGREE_KEYWORDS = {
+    4: ["phd", "doctorate", "doctor of philosophy"],
+    3: ["master", "master's", "master of", "msc", "mcom", "mba", "mca", "mtech", "mpharm", "mhm", "msw", "llm"],
+    2: ["bachelor", "bachelor's", "bachelor of", "b.sc", "b.com", "bba", "bca", "bsc", "btech", "bpharm",
+        "bhm", "bsw", "bcom", "llb", "mbbs"],
+    1: ["associate", "associate's", "associate degree"],
+}
+
+def extract_degree_level(education):
+    """Highest degree level (see models.DEGREE_LEVELS) among the matches from extract_education."""
+    education = set(education)
+    for level, keywords in DEGREE_KEYWORDS.items():
+        if education.intersection(keywords):
+            return level
+    return 0
+
 def extract_experience(text):
     experience_years = re.findall(r'(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience', text, re.IGNORECASE)
     if experience_years:
@@ -398,13 +212,14 @@ def calculate_similarity(resume_text, jd_text):
         similarity_matrix = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
         match_percentage = similarity_matrix[0][0] * 100
 
-        resume_skills = extract_skills(resume_text)
-        jd_skills = extract_skills(jd_text)
+        resume_bits = skills_to_bitset(extract_skills(resume_text))
+        jd_bits = skills_to_bitset(extract_skills(jd_text))
 
-        matching_skills = list(set(resume_skills) & set(jd_skills))
-        missing_skills = list(set(jd_skills) - set(resume_skills))
-        extra_skills = list(set(resume_skills) - set(jd_skills))
-        skills_match_percentage = len(matching_skills) / len(jd_skills) * 100 if jd_skills else 0
+        matching_bits, missing_bits, extra_bits = skill_overlap(resume_bits, jd_bits)
+        matching_skills = bitset_to_skills(matching_bits)
+        missing_skills = bitset_to_skills(missing_bits)
+        extra_skills = bitset_to_skills(extra_bits)
+        skills_match = skills_match_percentage(resume_bits, jd_bits)
 
         # Education Match Percentage
         resume_education = extract_education(resume_text)
@@ -418,7 +233,7 @@ def calculate_similarity(resume_text, jd_text):
 
         analysis_results = {
             "overall_match_percentage": match_percentage,
-            "skills_match_percentage": skills_match_percentage,
+            "skills_match_percentage": skills_match,
             "education_match_percentage": education_match_percentage,
             "experience_match_percentage": experience_match_percentage,
             "matching_skills": matching_skills,
@@ -436,22 +251,9 @@ def calculate_similarity(resume_text, jd_text):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def analyze_resume(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
     
     resume_file = request.FILES.get("resume_pdf")
     jd_file = request.FILES.get("job_description_pdf")
@@ -463,13 +265,15 @@ def analyze_resume(request):
     if not (jd_file or jd_text):
         return JsonResponse({"success": False, "message": "Job Description PDF or Text is required"}, status=400)
 
-    resume_text = extract_text_from_file(resume_file)
-    if resume_text is None:
+    raw_resume_text = extract_raw_text_from_file(resume_file)
+    if raw_resume_text is None:
         return JsonResponse({"success": False, "message": "Error extracting text from Resume file"}, status=400)
+    resume_text = preprocess_text(raw_resume_text)
 
     resume_skills = extract_skills(resume_text)
-    resume_education = extract_education(resume_text)
-    resume_experience = extract_experience(resume_text)
+    # Years and degrees like "5 years" or "b.sc" need the digits and punctuation preprocessing strips.
+    resume_education = extract_education(raw_resume_text)
+    resume_experience = extract_experience(raw_resume_text)
 
     try:
         resume = Resume.objects.get(user=user)
@@ -479,19 +283,25 @@ def analyze_resume(request):
     if resume_file:
         resume.resume_file = resume_file
     resume.summary = resume_text[:300]
+    resume.content = resume_text
     resume.skills = ', '.join(resume_skills)
     resume.education = ', '.join(resume_education)
     resume.experience = str(resume_experience)
+    resume.experience_years = min(resume_experience, 32767)
+    resume.degree_level = extract_degree_level(resume_education)
     resume.save()
+    sync_resume_skills(resume, resume_skills)
 
+    raw_jd_text = jd_text
     if jd_file:
-        jd_text = extract_text_from_file(jd_file)
-        if jd_text is None:
+        raw_jd_text = extract_raw_text_from_file(jd_file)
+        if raw_jd_text is None:
             return JsonResponse({"success": False, "message": "Error extracting text from Job Description file"}, status=400)
+        jd_text = preprocess_text(raw_jd_text)
 
     jd_skills = extract_skills(jd_text)
-    jd_experience = extract_experience(jd_text)
-    jd_education = extract_education(jd_text)
+    jd_experience = extract_experience(raw_jd_text)
+    jd_education = extract_education(raw_jd_text)
 
     title = jd_text.strip()[:255]
     if not title:
@@ -504,19 +314,24 @@ def analyze_resume(request):
         skills_required=', '.join(jd_skills),
         experience_required=str(jd_experience),
     )
+    sync_job_description_skills(jd_instance, jd_skills)
 
     analysis_results = calculate_similarity(resume_text, jd_text)
     if analysis_results is None:
         return JsonResponse({"success": False, "message": "Internal Server Error"}, status=500)
 
-    ResumeAnalysis.objects.create(
-        user=user,
-        job_description=jd_instance,
-        resume=resume,
-        match_percentage=analysis_results['overall_match_percentage'],
-        missing_skills=', '.join(analysis_results['missing_skills']),
-        extra_skills=', '.join(analysis_results['extra_skills']),
-        analysis_details=analysis_results['analysis_details'],
-    )
+    # The post_save signal rolls the analysis up; it commits together with the rollups and skill links.
+    with transaction.atomic():
+        analysis = ResumeAnalysis.objects.create(
+            user=user,
+            job_description=jd_instance,
+            resume=resume,
+            match_percentage=analysis_results['overall_match_percentage'],
+            missing_skills=', '.join(analysis_results['missing_skills']),
+            extra_skills=', '.join(analysis_results['extra_skills']),
+            analysis_details=analysis_results['analysis_details'],
+            engine_version=SCORING_ENGINE_VERSION,
+        )
+        sync_analysis_skills([(analysis.pk, user.pk, analysis_results['missing_skills'], analysis_results['extra_skills'])])
 
     return JsonResponse({"success": True, "message": "Analysis completed successfully", **analysis_results}, status=200)
\ No newline at end of file
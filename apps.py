@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class JobAnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'job_analysis'
\ No newline at end of file
+    name = 'job_analysis'
+
+    def ready(self):
+        from job_analysis import signals  # noqa: F401
\ No newline at end of file
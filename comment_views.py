@@ -1,32 +1,23 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
 
 import json
 
 from community.models import Comment, Post, CustomUser
 
-from job_analysis.utils import jwt_decode, auth_user
+from job_analysis.pagination import InvalidCursor, paginate
+from community.post_views import comment_queryset
+from job_analysis.serializers import COMMENT
+from job_analysis.utils import jwt_required
 from django.forms.models import model_to_dict
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def create_comment_view(request, post_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         post = Post.objects.get(id=post_id)
@@ -44,11 +35,12 @@ def create_comment_view(request, post_id):
         return JsonResponse({'success': False, 'message': 'Content is required.'}, status=400)
 
     try:
-        comment = Comment.objects.create(
-            user=user,
-            post=post,
-            content=content
-        )
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=user,
+                post=post,
+                content=content
+            )
     except Exception as e:
         return JsonResponse({"success": False, "message": f"Error creating comment: {e}"}, status=500)
 
@@ -56,22 +48,9 @@ def create_comment_view(request, post_id):
 
 @csrf_exempt
 @require_http_methods(["PUT"])
+@jwt_required
 def update_comment_view(request, comment_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         comment = Comment.objects.get(id=comment_id)
@@ -98,22 +77,9 @@ def update_comment_view(request, comment_id):
 
 @csrf_exempt
 @require_http_methods(["DELETE"])
+@jwt_required
 def delete_comment_view(request, comment_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         comment = Comment.objects.get(id=comment_id)
@@ -123,21 +89,23 @@ def delete_comment_view(request, comment_id):
     if comment.user != user:
         return JsonResponse({"success": False, "message": "You are not authorized to delete this comment."}, status=403)
 
-    comment.delete()
+    with transaction.atomic():
+        comment.delete()
 
     return JsonResponse({"success": True, "message": "Comment deleted successfully."}, status=200)
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_comments_for_post_view(request, post_id):
-    try:
-        post = Post.objects.get(id=post_id)
-    except Post.DoesNotExist:
+    if not Post.objects.filter(id=post_id).exists():
         return JsonResponse({'success': False, 'message': 'Post not found.'}, status=404)
 
-    comments = post.comments.all()
-    comments_data = [model_to_dict(comment) for comment in comments]
-    return JsonResponse(comments_data, safe=False)
+    try:
+        comments, page_info = paginate(request, COMMENT.values(comment_queryset().filter(post_id=post_id)))
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    comments_data = [COMMENT.dict(row) for row in comments]
+    return JsonResponse({'success': True, 'message': 'Comments retrieved successfully.', 'comments': comments_data, 'pagination': page_info}, status=200)
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -1,12 +1,17 @@
 import json
+import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.forms.models import model_to_dict
-from django.core.mail import EmailMessage
+from django.db import transaction
 from django.template.loader import render_to_string
+from django.utils.html import strip_tags
 from django.conf import settings
 from job_analysis.models import ContactUs
+from job_analysis.outbox import queue_email
+
+logger = logging.getLogger(__name__)
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -25,60 +30,49 @@ def contact_us(request):
                 'message': 'All fields are required'
             }, status=400)
 
-        # Save to database
-        ContactUs.objects.create(
+        # Save the submission first, so a template error cannot lose it.
+        submission = ContactUs.objects.create(
             name=name,
             email=email,
             subject=subject,
             message=message
         )
 
-        # Send email to user
+        context = {
+            'name': name,
+            'email': email,
+            'subject': subject,
+            'message': message
+        }
         try:
-            user_html_content = render_to_string('email_templates/contact_us.html', {
-                'name': name,
-                'email': email,
-                'subject': subject,
-                'message': message
-            })
-
-            user_email = EmailMessage(
-                subject="YOUR CONTACT FORM SUBMITTED SUCCESSFULLY",
-                body=user_html_content,
-                from_email=settings.EMAIL_HOST_USER,
-                to=[email]
-            )
-            user_email.content_subtype = "html"
-            user_email.send(fail_silently=False)
-
-            # Send email to admin
-            admin_html_content = render_to_string('email_templates/admin_contact_us.html', {
-                'name': name,
-                'email': email,
-                'subject': subject,
-                'message': message
-            })
-
-            admin_email = EmailMessage(
-                subject="USER WANTS TO CONTACT US",
-                body=admin_html_content,
-                from_email=settings.EMAIL_HOST_USER,
-                to=[settings.EMAIL_HOST_USER]
-            )
-            admin_email.content_subtype = "html"
-            admin_email.send(fail_silently=False)
-
+            user_html_content = render_to_string('email_templates/contact_us.html', context)
+            admin_html_content = render_to_string('email_templates/admin_contact_us.html', context)
+        except Exception:
+            logger.exception("Could not render the emails for contact submission %s", submission.pk)
             return JsonResponse({
                 'success': True,
-                'message': 'Message sent successfully'
+                'message': 'Message received'
             }, status=200)
 
-        except Exception as e:
-            # If email fails but data is saved, still return success
-            return JsonResponse({
-                'success': True,
-                'message': 'Message saved successfully but email sending failed'
-            }, status=200)
+        # Queue both emails together; send_queued_emails delivers them.
+        with transaction.atomic():
+            queue_email(
+                "YOUR CONTACT FORM SUBMITTED SUCCESSFULLY",
+                strip_tags(user_html_content),
+                [email],
+                html_message=user_html_content
+            )
+            queue_email(
+                "USER WANTS TO CONTACT US",
+                strip_tags(admin_html_content),
+                [settings.EMAIL_HOST_USER],
+                html_message=admin_html_content
+            )
+
+        return JsonResponse({
+            'success': True,
+            'message': 'Message sent successfully'
+        }, status=200)
 
     except Exception as e:
         return JsonResponse({
@@ -0,0 +1,85 @@
+"""
+Denormalized like, comment and reply counts for community posts and comments.
+
+``PostCounter`` and ``CommentCounter`` hold the counts the feed shows, so
+reading them is a join instead of a COUNT over ``community_like``,
+``community_comment`` or ``community_reply``. ``signals.py`` adjusts them with
+``F()`` updates whenever a Like, Comment or Reply is created or deleted,
+so a count changes in the same transaction as the row it counts. Rows
+removed by the cascade of their own post or comment are skipped: that
+parent's counter row is deleted with it, so deleting a thread costs the same
+number of queries however many rows it holds.
+
+A missing counter row (content from before counters existed) is rebuilt from
+a real count the first time it would be incremented. ``manage.py
+reconcile_counters`` recomputes every counter in batches and fixes any drift.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from community.models import Comment, Like, Post, Reply
+from job_analysis.models import CommentCounter, PostCounter
+
+
+def _count(model, fk):
+    counts = model.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _adjust(counter_model, pk, field, delta, rebuild):
+    if delta > 0:
+        if not counter_model.objects.filter(pk=pk).update(**{field: F(field) + delta}):
+            # The real count already includes the row that triggered this call.
+            rebuild([pk])
+    else:
+        counter_model.objects.filter(pk=pk, **{f'{field}__gte': -delta}).update(**{field: F(field) + delta})
+
+
+def adjust_post(post_id, field, delta):
+    """Add ``delta`` to ``like_count`` or ``comment_count`` of one post."""
+    _adjust(PostCounter, post_id, field, delta, reconcile_posts)
+
+
+def adjust_comment(comment_id, delta):
+    """Add ``delta`` to the reply count of one comment."""
+    _adjust(CommentCounter, comment_id, 'reply_count', delta, reconcile_comments)
+
+
+def reconcile_posts(post_ids):
+    """Recount the given posts and repair their counters; returns how many were wrong or missing."""
+    rows = Post.objects.filter(pk__in=post_ids).annotate(
+        actual_likes=_count(Like, 'post'),
+        actual_comments=_count(Comment, 'post'),
+        stored_likes=F('counter__like_count'),
+        stored_comments=F('counter__comment_count'),
+    ).values_list('pk', 'actual_likes', 'actual_comments', 'stored_likes', 'stored_comments')
+
+    missing, drifted = [], []
+    for pk, likes, comments, stored_likes, stored_comments in rows:
+        counter = PostCounter(post_id=pk, like_count=likes, comment_count=comments)
+        if stored_likes is None:
+            missing.append(counter)
+        elif (stored_likes, stored_comments) != (likes, comments):
+            drifted.append(counter)
+    PostCounter.objects.bulk_create(missing, ignore_conflicts=True)
+    PostCounter.objects.bulk_update(drifted, ['like_count', 'comment_count'])
+    return len(missing) + len(drifted)
+
+
+def reconcile_comments(comment_ids):
+    """Recount the given comments and repair their counters; returns how many were wrong or missing."""
+    rows = Comment.objects.filter(pk__in=comment_ids).annotate(
+        actual_replies=_count(Reply, 'comment'),
+        stored_replies=F('counter__reply_count'),
+    ).values_list('pk', 'actual_replies', 'stored_replies')
+
+    missing, drifted = [], []
+    for pk, replies, stored_replies in rows:
+        counter = CommentCounter(comment_id=pk, reply_count=replies)
+        if stored_replies is None:
+            missing.append(counter)
+        elif stored_replies != replies:
+            drifted.append(counter)
+    CommentCounter.objects.bulk_create(missing, ignore_conflicts=True)
+    CommentCounter.objects.bulk_update(drifted, ['reply_count'])
+    return len(missing) + len(drifted)
@@ -7,29 +7,39 @@ from django.forms.models import model_to_dict
 from django.db.models import Avg, Count
 
 from job_analysis.models import CustomUser, Feedback
-from job_analysis.utils import jwt_decode, auth_user
+from job_analysis.pagination import InvalidCursor, paginate
+from job_analysis.projection import Field, Projection, iso_datetime
+from job_analysis.utils import jwt_required, load_user
 
 # =============================== #
 # ======== Feedback API's ======= #
 # =============================== #
+FEEDBACK = Projection({
+    "id": "id",
+    "comment": "comment",
+    "rating": "rating",
+    "publish": "publish",
+    "created_at": Field("created_at", iso_datetime),
+})
+
+FEEDBACK_WITH_USER = Projection({
+    "id": "id",
+    "user": {
+        "email": "user__email",
+        "first_name": "user__first_name",
+        "username": "user__username",
+    },
+    "comment": "comment",
+    "rating": "rating",
+    "publish": "publish",
+    "created_at": Field("created_at", iso_datetime),
+})
+
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def add_feedback_view(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = load_user(request.user)
 
     try:
         data = json.loads(request.body)
@@ -73,22 +83,9 @@ def add_feedback_view(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def toggle_publish_feedback_view(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         data = json.loads(request.body)
@@ -118,61 +115,35 @@ def toggle_publish_feedback_view(request):
 @require_http_methods(["GET"])
 def get_all_feedbacks_view(request):
     try:
-        feedbacks = Feedback.objects.all().order_by('-created_at')
-        feedbacks_data = []
-        for f in feedbacks:
-            feedbacks_data.append({
-                "id": f.id,
-                "user": {
-                    "email": f.user.email,
-                    "first_name": f.user.first_name,
-                    "username": f.user.username,
-                },
-                "comment": f.comment,
-                "rating": f.rating,
-                "publish": f.publish,
-                "created_at": f.created_at,
-            })
+        feedbacks, page_info = paginate(request, FEEDBACK_WITH_USER.values(Feedback.objects.all()))
+        feedbacks_data = [FEEDBACK_WITH_USER.dict(row) for row in feedbacks]
         return JsonResponse({
             "success": True, 
             "message": "All feedbacks fetched successfully.", 
-            "feedbacks": feedbacks_data
+            "feedbacks": feedbacks_data,
+            "pagination": page_info
         })
+    except InvalidCursor as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "message": str(e)}, status=500)
 
 @require_http_methods(["GET"])
+@jwt_required
 def get_feedbacks_view(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
+    user = request.user
 
     try:
-        user = CustomUser.objects.get(email=user_email)
-        feedbacks = Feedback.objects.filter(user=user).order_by('-created_at')
-        feedbacks_data = []
-        for f in feedbacks:
-            feedbacks_data.append({
-                "id": f.id,
-                "comment": f.comment,
-                "rating": f.rating,
-                "publish": f.publish,
-                "created_at": f.created_at,
-            })
+        feedbacks, page_info = paginate(request, FEEDBACK.values(Feedback.objects.filter(user=user)))
+        feedbacks_data = [FEEDBACK.dict(row) for row in feedbacks]
         return JsonResponse({
             "success": True, 
             "message": "Feedbacks fetched successfully.", 
-            "feedbacks": feedbacks_data
+            "feedbacks": feedbacks_data,
+            "pagination": page_info
         }, status=200)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "message": str(e)}, status=500)
 
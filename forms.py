@@ -3,4 +3,18 @@ from django import forms
 class ContactForm(forms.Form):
     name = forms.CharField(max_length=100, required=True)
     email = forms.EmailField(required=True)
-    message = forms.CharField(widget=forms.Textarea, required=True)
\ No newline at end of file
+    message = forms.CharField(widget=forms.Textarea, required=True)
+
+class UserImportForm(forms.Form):
+    file = forms.FileField(required=True)
+    send_welcome_email = forms.BooleanField(required=False, initial=True)
+
+    def clean_file(self):
+        uploaded = self.cleaned_data['file']
+        if not uploaded.name.lower().endswith(('.csv', '.jsonl', '.ndjson', '.json')):
+            raise forms.ValidationError('Upload a .csv or .jsonl file.')
+        return uploaded
+
+    def clean_send_welcome_email(self):
+        # Omitting the field keeps the default of sending; only an explicit false turns the emails off.
+        return self.cleaned_data['send_welcome_email'] or 'send_welcome_email' not in self.data
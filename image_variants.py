@@ -0,0 +1,229 @@
+"""
+Background resizing of uploaded post images and profile pictures.
+
+Upload views store the original as before and call ``queue_image``, which only
+inserts an ``ImageJob`` row; no image is decoded while the client waits. The
+``process_images`` command claims due jobs (same lease and backoff scheme as
+``job_analysis.outbox``) and writes, next to the original, one WebP and one
+JPEG per configured size::
+
+    posts/photo.jpg -> posts/photo.thumbnail.webp, posts/photo.thumbnail.jpg,
+                       posts/photo.feed.webp, ... posts/photo.full.jpg
+
+Variants are bounded on their longest side, never upscaled, rotated according
+to the EXIF orientation and saved without EXIF, ICC or any other metadata.
+Payloads expose them through ``variant_urls``; until a job is done (or when it
+is dead) ``variant_urls`` returns None and ``display_url`` falls back to the
+original, so clients can always render something.
+
+Configured through ``settings.IMAGE_VARIANTS``::
+
+    IMAGE_VARIANTS = {'SIZES': {'thumbnail': 160, 'feed': 1080, 'full': 2048}, 'QUALITY': 82,
+                      'BATCH_SIZE': 10, 'MAX_ATTEMPTS': 3, 'BACKOFF': 60, 'MAX_BACKOFF': 3600, 'LEASE': 600}
+"""
+import io
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from job_analysis import post_cache
+from job_analysis.models import ImageJob
+
+DEFAULTS = {
+    'SIZES': {'thumbnail': 160, 'feed': 1080, 'full': 2048},
+    'QUALITY': 82,
+    'BATCH_SIZE': 10,
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF': 60,
+    'MAX_BACKOFF': 3600,
+    'LEASE': 600,
+}
+
+FORMATS = (('webp', 'WEBP', 'webp'), ('jpeg', 'JPEG', 'jpg'))
+
+# The variant the feed shows in place of the original once it exists.
+DISPLAY_VARIANT = 'feed'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'IMAGE_VARIANTS', {})}
+
+
+def queue_image(source, kind, object_id=None):
+    """Queue variants for the stored file ``source`` (a FieldFile or storage name)."""
+    source = getattr(source, 'name', source)
+    if not source:
+        return None
+    job, _ = ImageJob.objects.get_or_create(source=source, defaults={'kind': kind, 'object_id': object_id})
+    return job
+
+
+def variant_name(source, size, extension):
+    root, _ = os.path.splitext(source)
+    return f'{root}.{size}.{extension}'
+
+
+def _render(image, longest, pillow_format, quality):
+    variant = image.copy()
+    variant.thumbnail((longest, longest), Image.LANCZOS)
+    if pillow_format == 'JPEG':
+        variant = variant.convert('RGB')
+    variant.info = {}
+    buffer = io.BytesIO()
+    if pillow_format == 'JPEG':
+        variant.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        variant.save(buffer, 'WEBP', quality=quality, method=4)
+    return variant.size, buffer.getvalue()
+
+
+def render_variants(job, storage=None, config=None):
+    """Write every variant of ``job.source`` to ``storage`` and return the ``variants`` mapping."""
+    storage = storage or default_storage
+    config = config or get_config()
+    sizes = config['SIZES']
+
+    with storage.open(job.source, 'rb') as fh:
+        image = Image.open(fh)
+        # Lets the JPEG decoder downscale by up to 8x while decoding.
+        image.draft('RGB', (max(sizes.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    variants = {}
+    for size, longest in sizes.items():
+        entry = {}
+        for key, pillow_format, extension in FORMATS:
+            (width, height), data = _render(image, longest, pillow_format, config['QUALITY'])
+            name = variant_name(job.source, size, extension)
+            # Deterministic names: a retry overwrites what a failed attempt left behind.
+            if storage.exists(name):
+                storage.delete(name)
+            entry[key] = storage.save(name, ContentFile(data))
+        entry['width'], entry['height'] = width, height
+        variants[size] = entry
+    return variants
+
+
+def retry_delay(attempts, config=None):
+    config = config or get_config()
+    return min(config['BACKOFF'] * 2 ** max(attempts - 1, 0), config['MAX_BACKOFF'])
+
+
+def claim_batch(batch_size, lease):
+    """Lease up to ``batch_size`` due jobs to this worker and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImageJob.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            ImageJob.objects.filter(id__in=[job.id for job in batch]).update(
+                next_attempt_at=now + timedelta(seconds=lease)
+            )
+    return batch
+
+
+def process_batch(batch, storage=None, config=None):
+    """
+    Render every job in ``batch`` and record each outcome.
+
+    Returns ``{'done': n, 'retried': n, 'dead': n}``. Posts whose image is done
+    get their cached feed fragment invalidated so the feed picks the variants up.
+    """
+    config = config or get_config()
+    counts = {'done': 0, 'retried': 0, 'dead': 0}
+    done = []
+    failed = []
+    for job in batch:
+        job.attempts += 1
+        try:
+            job.variants = render_variants(job, storage, config)
+        except Exception as e:
+            job.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if job.attempts >= config['MAX_ATTEMPTS']:
+                job.status = ImageJob.STATUS_DEAD
+                counts['dead'] += 1
+            else:
+                job.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts, config))
+                counts['retried'] += 1
+            failed.append(job)
+        else:
+            job.status = ImageJob.STATUS_DONE
+            job.processed_at = timezone.now()
+            job.last_error = None
+            done.append(job)
+            counts['done'] += 1
+
+    ImageJob.objects.bulk_update(done, ['status', 'attempts', 'variants', 'processed_at', 'last_error'])
+    ImageJob.objects.bulk_update(failed, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+    for job in done:
+        if job.kind == ImageJob.KIND_POST_IMAGE:
+            post_cache.invalidate_post(job.object_id)
+    return counts
+
+
+def drain(batch_size=None, max_batches=None, storage=None):
+    """
+    Process every due job, one batch at a time.
+
+    Returns the totals of ``process_batch`` plus ``batches`` and ``seconds``.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    totals = {'done': 0, 'retried': 0, 'dead': 0, 'batches': 0}
+    started = time.monotonic()
+    while max_batches is None or totals['batches'] < max_batches:
+        batch = claim_batch(batch_size, config['LEASE'])
+        if not batch:
+            break
+        for key, value in process_batch(batch, storage, config).items():
+            totals[key] += value
+        totals['batches'] += 1
+    totals['seconds'] = round(time.monotonic() - started, 3)
+    return totals
+
+
+def variants_for(sources):
+    """``{source: variants}`` for the given storage names whose variants are ready, in one query."""
+    sources = [source for source in sources if source]
+    if not sources:
+        return {}
+    return dict(
+        ImageJob.objects.filter(source__in=sources, status=ImageJob.STATUS_DONE).values_list('source', 'variants')
+    )
+
+
+def variant_urls(variants, storage=None):
+    """Payload form of a ``variants`` mapping: URLs instead of storage names, or None when not ready."""
+    if not variants:
+        return None
+    storage = storage or default_storage
+    return {
+        size: {
+            'webp': storage.url(entry['webp']),
+            'jpeg': storage.url(entry['jpeg']),
+            'width': entry['width'],
+            'height': entry['height'],
+        }
+        for size, entry in variants.items()
+    }
+
+
+def display_url(source, variants, storage=None):
+    """URL the feed shows: the ``feed`` JPEG variant when ready, else the original, else None."""
+    storage = storage or default_storage
+    if variants and DISPLAY_VARIANT in variants:
+        return storage.url(variants[DISPLAY_VARIANT]['jpeg'])
+    return storage.url(source) if source else None
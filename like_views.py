@@ -1,10 +1,13 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
 
 from community.models import Like, Post, CustomUser
 
-from job_analysis.utils import jwt_decode, auth_user
+from job_analysis.pagination import InvalidCursor, paginate, paginated_list_response
+from job_analysis.projection import Projection
+from job_analysis.utils import jwt_required
 from django.forms.models import model_to_dict
 
 import json
@@ -12,46 +15,41 @@ import json
 # =============================== #
 # ======== Like API's ========== #
 # =============================== #
+# Same keys as model_to_dict(like).
+LIKE = Projection({'id': 'id', 'user': 'user_id', 'post': 'post_id'})
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_likes_view(request):
-    likes = Like.objects.all()
-    likes_data = [model_to_dict(like) for like in likes]
-    return JsonResponse(likes_data, safe=False)
+    try:
+        likes, page_info = paginate(request, LIKE.values(Like.objects.all(), 'created_at'))
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    likes_data = [LIKE.dict(row) for row in likes]
+    return paginated_list_response(likes_data, page_info)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def toggle_like_view(request, post_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Post not found.'}, status=404)
 
-    like, created = Like.objects.get_or_create(
-        user=user,
-        post=post
-    )
+    # The like and the post's like_count (updated by signal) change together.
+    with transaction.atomic():
+        like, created = Like.objects.get_or_create(
+            user=user,
+            post=post
+        )
+        if not created:
+            like.delete()
     if not created:
-        like.delete()
         return JsonResponse({'success': True, 'message': 'Like removed successfully.'}, status=200)
     
     return JsonResponse({"success": True, "message": "Like created successfully.", "like": model_to_dict(like)}, status=200)
@@ -59,24 +57,14 @@ def toggle_like_view(request, post_id):
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@jwt_required
 def list_posts_liked_by_user_view(request, user_email):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
+    user = request.user
 
     try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-
-    likes = user.likes.all()
-    likes_data = [model_to_dict(like) for like in likes]
-    return JsonResponse(likes_data, safe=False)
+        likes, page_info = paginate(request, LIKE.values(user.likes.all(), 'created_at'))
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    likes_data = [LIKE.dict(row) for row in likes]
+    return paginated_list_response(likes_data, page_info)
 
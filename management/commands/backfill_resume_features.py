@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_analysis.models import Resume, ResumeSkill, Skill
+from job_analysis.skills import SKILL_TAXONOMY, split_skills
+from job_analysis.views.analysis_views import (
+    extract_degree_level, extract_education, extract_experience, extract_raw_text_from_file,
+)
+
+
+class Command(BaseCommand):
+    help = "Populate normalized skill rows, experience_years and degree_level for existing resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        Skill.objects.bulk_create([Skill(name=name) for name in SKILL_TAXONOMY], ignore_conflicts=True)
+        skill_ids = dict(Skill.objects.values_list('name', 'id'))
+
+        processed = 0
+        last_pk = 0
+        while True:
+            resumes = list(
+                Resume.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('id', 'resume_file', 'skills', 'education', 'experience')[:batch_size]
+            )
+            if not resumes:
+                break
+
+            links = []
+            for resume in resumes:
+                # experience and education used to be extracted after preprocessing stripped
+                # digits, so they are re-read from the uploaded file when there is one.
+                text = extract_raw_text_from_file(resume.resume_file.path) if resume.resume_file else None
+                if text is not None:
+                    resume.experience = str(extract_experience(text))
+                    resume.education = ', '.join(extract_education(text))
+                experience = (resume.experience or '').strip()
+                resume.experience_years = min(int(experience), 32767) if experience.isdigit() else 0
+                resume.degree_level = extract_degree_level(
+                    part.strip() for part in (resume.education or '').split(',')
+                )
+                links.extend(
+                    ResumeSkill(resume_id=resume.pk, skill_id=skill_ids[name])
+                    for name in split_skills(resume.skills)
+                )
+
+            with transaction.atomic():
+                Resume.objects.bulk_update(resumes, ['experience', 'education', 'experience_years', 'degree_level'])
+                ResumeSkill.objects.bulk_create(links, ignore_conflicts=True)
+
+            processed += len(resumes)
+            last_pk = resumes[-1].pk
+            self.stdout.write(f"{processed} resumes backfilled")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {processed} resumes."))
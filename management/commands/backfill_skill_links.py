@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_analysis.models import JobDescription, JobDescriptionSkill, ResumeAnalysis
+from job_analysis.skills import SKILL_TAXONOMY, skill_ids, split_skills, sync_analysis_skills
+
+
+class Command(BaseCommand):
+    help = "Populate normalized skill rows for existing job descriptions and analyses from their comma-joined skills."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--start-after', type=int, default=0,
+                            help="Resume after this primary key (applies to the first table processed).")
+        parser.add_argument('--only', choices=('job_descriptions', 'analyses'), help="Backfill a single table.")
+
+    def handle(self, *args, **options):
+        ids = skill_ids(SKILL_TAXONOMY)
+        start_after = options['start_after']
+
+        if options['only'] in (None, 'job_descriptions'):
+            self.backfill(
+                'job descriptions', JobDescription.objects.only('id', 'skills_required'), options['batch_size'], start_after,
+                lambda batch: JobDescriptionSkill.objects.bulk_create([
+                    JobDescriptionSkill(job_description_id=job.pk, skill_id=ids[name])
+                    for job in batch for name in split_skills(job.skills_required)
+                ], ignore_conflicts=True),
+            )
+            start_after = 0
+        if options['only'] in (None, 'analyses'):
+            self.backfill(
+                'analyses', ResumeAnalysis.objects.only('id', 'user_id', 'missing_skills', 'extra_skills'),
+                options['batch_size'], start_after,
+                lambda batch: sync_analysis_skills(
+                    (analysis.pk, analysis.user_id, analysis.missing_skills, analysis.extra_skills) for analysis in batch
+                ),
+            )
+
+    def backfill(self, label, queryset, batch_size, last_pk, write):
+        processed = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                write(batch)
+            processed += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"{processed} {label} backfilled (last id {last_pk})")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {processed} {label}."))
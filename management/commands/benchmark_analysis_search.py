@@ -0,0 +1,82 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from job_analysis import search
+from job_analysis.models import CustomUser, JobDescription, Resume, ResumeAnalysis
+
+USERS = 2000
+JOBS = 500
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = "Measure admin analysis search: the five-way icontains OR against the full-text index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help="Number of analyses to create.")
+        parser.add_argument('--queries', type=int, default=10)
+
+    def timed(self, func):
+        samples = []
+        for _ in range(self.queries):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    def handle(self, *args, **options):
+        self.queries = options['queries']
+        rng = random.Random(0)
+        names = [f'name{i}' for i in range(1000)]
+        companies = [f'company{i}' for i in range(200)]
+
+        # The benchmark data lives only inside this transaction.
+        with transaction.atomic():
+            search.install()
+            users = CustomUser.objects.bulk_create([
+                CustomUser(email=f'analysis-benchmark-{i}@example.invalid', username=f'analysis-benchmark-{i}',
+                           first_name=rng.choice(names), last_name=rng.choice(names))
+                for i in range(USERS)
+            ])
+            resumes = Resume.objects.bulk_create([Resume(user=user) for user in users])
+            jobs = JobDescription.objects.bulk_create([
+                JobDescription(user=users[0], title=f'{rng.choice(names)} engineer', company_name=rng.choice(companies),
+                               description='-')
+                for _ in range(JOBS)
+            ])
+            created = 0
+            while created < options['rows']:
+                batch = []
+                for _ in range(min(10000, options['rows'] - created)):
+                    index = rng.randrange(USERS)
+                    user, job = users[index], rng.choice(jobs)
+                    batch.append(ResumeAnalysis(
+                        user=user, job_description=job, resume=resumes[index], match_percentage=rng.random() * 100,
+                        search_document=search.analysis_document(
+                            user.email, user.first_name, user.last_name, job.title, job.company_name
+                        ),
+                    ))
+                ResumeAnalysis.objects.bulk_create(batch)
+                created += len(batch)
+
+            def icontains(query):
+                return list(ResumeAnalysis.objects.select_related('user', 'job_description').filter(
+                    Q(user__email__icontains=query) |
+                    Q(job_description__title__icontains=query) |
+                    Q(job_description__company_name__icontains=query) |
+                    Q(user__first_name__icontains=query) |
+                    Q(user__last_name__icontains=query)
+                ))
+
+            for query in ('company7', 'name42', 'analysis-benchmark-1999', 'nomatch'):
+                fts = self.timed(lambda: search.search('analyses', query, PAGE_SIZE + 1))
+                scan = self.timed(lambda: icontains(query))
+                self.stdout.write(
+                    f"{created} analyses, q={query!r}: fts page {fts:8.2f} ms, icontains OR {scan:8.2f} ms (median)"
+                )
+            transaction.set_rollback(True)
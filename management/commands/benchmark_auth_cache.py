@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from job_analysis.models import CustomUser
+from job_analysis.token_cache import get_token_user_cache, reset_token_user_cache
+from job_analysis.utils import jwt_encode, jwt_required
+
+
+@jwt_required
+def _authenticated_view(request):
+    return JsonResponse({'id': request.user.pk})
+
+
+class Command(BaseCommand):
+    help = "Measure jwt_required throughput with the token-user cache enabled and disabled."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        factory = RequestFactory()
+
+        # The benchmark user lives only inside this transaction.
+        with transaction.atomic():
+            user = CustomUser.objects.create(email='auth-cache-benchmark@example.invalid', username='benchmark')
+            request = factory.get('/', HTTP_AUTHORIZATION=f'Bearer {jwt_encode(user)}')
+
+            for label, enabled in (('cache off', False), ('cache on', True)):
+                with override_settings(JWT_USER_CACHE={'ENABLED': enabled}):
+                    reset_token_user_cache()
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        for _ in range(count):
+                            _authenticated_view(request)
+                        elapsed = time.perf_counter() - started
+                    cache = get_token_user_cache()
+                    hit_rate = cache.stats()['hit_rate'] if cache is not None else 0.0
+                    self.stdout.write(
+                        f"{label:>9}: {count / elapsed:>10.0f} req/s, "
+                        f"{len(queries) / count:.2f} queries/request, hit rate {hit_rate:.2%}"
+                    )
+
+            transaction.set_rollback(True)
+        reset_token_user_cache()
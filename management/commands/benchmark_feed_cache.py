@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from community.models import Comment, Like, Post, Reply
+from job_analysis import post_cache
+from job_analysis.models import CustomUser
+from community.post_views import list_all_posts
+from job_analysis.utils import jwt_encode
+
+
+class Command(BaseCommand):
+    help = "Measure list_all_posts latency with a cold and a warm post fragment cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=5, help="Comments per post, each with two replies.")
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+
+        # The benchmark data lives only inside this transaction.
+        with transaction.atomic():
+            user = CustomUser.objects.create(email='feed-cache-benchmark@example.invalid', username='benchmark')
+            post_ids = []
+            for i in range(options['posts']):
+                post = Post.objects.create(user=user, title=f'Benchmark post {i}', content='Lorem ipsum ' * 40)
+                post_ids.append(post.id)
+                Like.objects.create(user=user, post=post)
+                for _ in range(options['comments']):
+                    comment = Comment.objects.create(user=user, post=post, content='A comment')
+                    Reply.objects.bulk_create([Reply(user=user, comment=comment, content='A reply') for _ in range(2)])
+
+            request = factory.get('/', {'page_size': options['page_size']},
+                                  HTTP_AUTHORIZATION=f'Bearer {jwt_encode(user)}')
+
+            for label, cold in (('cold', True), ('warm', False)):
+                list_all_posts(request)
+                elapsed = 0.0
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options['requests']):
+                        if cold:
+                            post_cache.forget(post_ids)
+                        started = time.perf_counter()
+                        list_all_posts(request)
+                        elapsed += time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {elapsed / options['requests'] * 1000:.2f} ms/request, "
+                    f"{len(queries) / options['requests']:.1f} queries/request"
+                )
+
+            post_cache.forget(post_ids)
+            transaction.set_rollback(True)
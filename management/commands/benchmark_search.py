@@ -0,0 +1,60 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community.models import Post
+from job_analysis import search
+from job_analysis.models import CustomUser
+
+NEEDLE_POSTS = 50
+
+
+class Command(BaseCommand):
+    help = "Measure full-text search latency as the number of posts grows, against an icontains scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help="Comma-separated post counts to measure at.")
+        parser.add_argument('--queries', type=int, default=20)
+
+    def timed(self, func):
+        samples = []
+        for _ in range(self.queries):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    def handle(self, *args, **options):
+        self.queries = options['queries']
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rng = random.Random(0)
+        vocabulary = [f'word{i}' for i in range(5000)]
+
+        # The benchmark data lives only inside this transaction.
+        with transaction.atomic():
+            search.install()
+            user = CustomUser.objects.create(email='search-benchmark@example.invalid', username='benchmark')
+            created = 0
+            for size in sizes:
+                posts = [
+                    Post(user=user, title=' '.join(rng.choices(vocabulary, k=6)),
+                         content=' '.join(rng.choices(vocabulary, k=80)))
+                    for _ in range(size - created)
+                ]
+                Post.objects.bulk_create(posts, batch_size=5000)
+                created = size
+                # A constant number of matches at every size, so only the table grows.
+                Post.objects.filter(title__startswith='needle').update(title='haystack')
+                needle_ids = Post.objects.filter(user=user).order_by('?').values_list('id', flat=True)[:NEEDLE_POSTS]
+                Post.objects.filter(id__in=list(needle_ids)).update(title='needle in the haystack')
+
+                fts = self.timed(lambda: search.search('posts', 'needle', 20))
+                prefix = self.timed(lambda: search.search('posts', 'needl', 20))
+                scan = self.timed(lambda: list(Post.objects.filter(title__icontains='needle')[:20]))
+                self.stdout.write(
+                    f"{size:>8} posts: fts {fts:7.2f} ms, prefix {prefix:7.2f} ms, icontains {scan:7.2f} ms (median)"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,72 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from job_analysis.views.feedback_views import FEEDBACK_WITH_USER
+from job_analysis.models import CustomUser, Feedback
+from job_analysis.views.user_views import USER_DETAILS
+
+
+def _instance_feedbacks(queryset):
+    """get_all_feedbacks_view's loop before projections."""
+    return [{
+        "id": f.id,
+        "user": {"email": f.user.email, "first_name": f.user.first_name, "username": f.user.username},
+        "comment": f.comment,
+        "rating": f.rating,
+        "publish": f.publish,
+        "created_at": f.created_at,
+    } for f in queryset.select_related('user')]
+
+
+def _instance_user(user):
+    data = model_to_dict(user)
+    data['profile_picture'] = user.profile_picture.url if user.profile_picture else None
+    return data
+
+
+class Command(BaseCommand):
+    help = "Compare rows serialized per second by model instances and by values() projections."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def run(self, label, count, serialize):
+        best = float('inf')
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            json.dumps(serialize(), cls=DjangoJSONEncoder)
+            best = min(best, time.perf_counter() - started)
+        self.stdout.write(f"{label:>24}: {count / best:>10.0f} rows/s")
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+
+        # The benchmark data lives only inside this transaction.
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create(
+                CustomUser(email=f'serializer-benchmark-{i}@example.invalid', username=f'user{i}', first_name='Bench')
+                for i in range(options['users'])
+            )
+            Feedback.objects.bulk_create(
+                (Feedback(user=users[i % len(users)], comment='Useful analysis ' * 5, rating=4)
+                 for i in range(options['rows'])),
+                batch_size=5000,
+            )
+            feedbacks = Feedback.objects.filter(user__in=users)
+            count = feedbacks.count()
+
+            self.run('feedbacks, instances', count, lambda: _instance_feedbacks(feedbacks))
+            self.run('feedbacks, projection', count, lambda: FEEDBACK_WITH_USER.serialize(feedbacks))
+
+            user = CustomUser.objects.get(pk=users[0].pk)
+            self.run('user details, instance', 1000, lambda: [_instance_user(user) for _ in range(1000)])
+            self.run('user details, projection', 1000, lambda: [USER_DETAILS.from_instance(user) for _ in range(1000)])
+
+            transaction.set_rollback(True)
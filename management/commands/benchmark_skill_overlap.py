@@ -0,0 +1,60 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from job_analysis.skills import (
+    SKILL_TAXONOMY, batch_skill_overlap, bitset_to_skills, bitset_to_words, encode_skill_matrix, skill_overlap,
+    skills_match_percentage, skills_to_bitset,
+)
+
+
+def _set_overlap(resume_skills, jd_skills):
+    """The string-set overlap calculate_similarity used before skill bitsets."""
+    matching = list(set(resume_skills) & set(jd_skills))
+    missing = list(set(jd_skills) - set(resume_skills))
+    extra = list(set(resume_skills) - set(jd_skills))
+    return matching, missing, extra, len(matching) / len(jd_skills) * 100 if jd_skills else 0
+
+
+class Command(BaseCommand):
+    help = "Benchmark set-based against bitset skill-overlap scoring for one resume and N job descriptions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,100,100000', help="Comma-separated comparison counts.")
+        parser.add_argument('--skills-per-document', type=int, default=25)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        per_document = options['skills_per_document']
+        resume_skills = rng.sample(SKILL_TAXONOMY, per_document)
+
+        self.stdout.write(f"{'comparisons':>12} {'sets':>12} {'int bitsets':>12} {'numpy batch':>12}")
+        for size in (int(value) for value in options['sizes'].split(',')):
+            jd_skill_lists = [rng.sample(SKILL_TAXONOMY, per_document) for _ in range(size)]
+
+            started = time.perf_counter()
+            for jd_skills in jd_skill_lists:
+                _set_overlap(resume_skills, jd_skills)
+            set_seconds = time.perf_counter() - started
+
+            # calculate_similarity stores no bitsets: it encodes both documents and decodes the
+            # overlap back to skill names on every call, so all of that is timed.
+            started = time.perf_counter()
+            for jd_skills in jd_skill_lists:
+                resume_bits, jd_bits = skills_to_bitset(resume_skills), skills_to_bitset(jd_skills)
+                for bits in skill_overlap(resume_bits, jd_bits):
+                    bitset_to_skills(bits)
+                skills_match_percentage(resume_bits, jd_bits)
+            int_seconds = time.perf_counter() - started
+
+            # The ranking index encodes its matrix once when it loads, so only the query side is timed here.
+            jd_matrix = encode_skill_matrix([skills_to_bitset(jd_skills) for jd_skills in jd_skill_lists])
+            started = time.perf_counter()
+            batch_skill_overlap(bitset_to_words(skills_to_bitset(resume_skills)), jd_matrix)
+            numpy_seconds = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{size:>12} {set_seconds * 1000:>10.3f}ms {int_seconds * 1000:>10.3f}ms {numpy_seconds * 1000:>10.3f}ms"
+            )
@@ -0,0 +1,61 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+from job_analysis.admin_views import export_dashboard_analyses, serialize_dashboard_analysis
+from job_analysis.models import CustomUser, JobDescription, Resume, ResumeAnalysis
+
+
+def _buffered_dashboard(request):
+    """export_dashboard_analyses as it was before streaming: one list, one JsonResponse body."""
+    analyses = ResumeAnalysis.objects.select_related('user', 'job_description').all()
+    return JsonResponse({
+        "success": True,
+        "message": "Analysis data retrieved successfully",
+        "analyses": [serialize_dashboard_analysis(analysis) for analysis in analyses]
+    }, status=200)
+
+
+class Command(BaseCommand):
+    help = "Compare peak Python memory of the analysis export buffered and streamed over a seeded table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+
+    def measure(self, label, view, request):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = view(request)
+        size = 0
+        for chunk in (response.streaming_content if response.streaming else [response.content]):
+            size += len(chunk)
+        response.close()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(f"{label:>9}: peak {peak / 2 ** 20:8.1f} MiB, {size / 2 ** 20:8.1f} MiB body, {elapsed:.2f} s")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+
+        # The benchmark data lives only inside this transaction.
+        with transaction.atomic():
+            admin = CustomUser.objects.create(email='streaming-benchmark@example.invalid', username='benchmark', is_admin=True)
+            job = JobDescription.objects.create(user=admin, title='Benchmark job', company_name='Example', description='-')
+            resume = Resume.objects.create(user=admin)
+            ResumeAnalysis.objects.bulk_create(
+                (ResumeAnalysis(user=admin, job_description=job, resume=resume, match_percentage=50.0,
+                                missing_skills='python, sql', extra_skills='excel', analysis_details='x' * 200)
+                 for _ in range(options['rows'])),
+                batch_size=5000,
+            )
+            request.user = admin
+
+            self.measure('buffered', _buffered_dashboard, request)
+            self.measure('streamed', export_dashboard_analyses, request)
+
+            transaction.set_rollback(True)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from job_analysis import search
+from job_analysis.models import ResumeAnalysis
+
+
+class Command(BaseCommand):
+    help = "Create the full-text search indexes for community content and admin analysis search (runs after migrate too)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Re-index every existing row.")
+        parser.add_argument('--documents', action='store_true',
+                            help="Recompute ResumeAnalysis.search_document first (after bulk imports or a backfill).")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if options['documents']:
+            changed = search.refresh_analysis_documents(ResumeAnalysis.objects.using(options['database']))
+            self.stdout.write(f"{changed} analysis search documents updated.")
+        try:
+            search.install(connection, rebuild=options['rebuild'])
+        except search.SearchUnavailable as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Search index ready on {connection.vendor}{' (rebuilt)' if options['rebuild'] else ''}.")
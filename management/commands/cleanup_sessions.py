@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from job_analysis.models import OTP
+
+
+class Command(BaseCommand):
+    help = "Delete expired django_session rows and stale OTP codes in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument('--otp-minutes', type=int, default=5,
+                            help="Delete OTP codes older than this many minutes (they expire after 5).")
+        parser.add_argument('--vacuum', action='store_true', help="VACUUM afterwards to give the space back (SQLite only).")
+
+    def handle(self, *args, **options):
+        self.report('Before')
+
+        now = timezone.now()
+        sessions = self.delete_in_batches(Session.objects.filter(expire_date__lt=now), 'session_key', options['batch_size'])
+        otps = self.delete_in_batches(
+            OTP.objects.filter(created_at__lt=now - timedelta(minutes=options['otp_minutes'])), 'pk', options['batch_size']
+        )
+        self.stdout.write(f"Deleted {sessions} expired sessions and {otps} stale OTP codes.")
+
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        self.report('After')
+
+    def delete_in_batches(self, queryset, key, batch_size):
+        # Short deletes keep each write lock brief, which matters on SQLite.
+        deleted = 0
+        while True:
+            keys = list(queryset.values_list(key, flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += queryset.model.objects.filter(**{f'{key}__in': keys}).delete()[0]
+
+    def report(self, label):
+        now = timezone.now()
+        # Every session write pushes expire_date to now + SESSION_COOKIE_AGE, so this counts rows written today.
+        written_since = now + timedelta(seconds=settings.SESSION_COOKIE_AGE) - timedelta(days=1)
+        sessions = Session.objects.count()
+        recent = Session.objects.filter(expire_date__gt=written_since).count()
+        expired = Session.objects.filter(expire_date__lt=now).count()
+        line = (f"{label}: django_session {sessions} rows ({expired} expired, ~{recent} written in the last 24h), "
+                f"OTP {OTP.objects.count()} rows")
+
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA page_count')
+                pages = cursor.fetchone()[0]
+                cursor.execute('PRAGMA page_size')
+                page_size = cursor.fetchone()[0]
+            line += f", database file {pages * page_size / 1024 / 1024:.1f} MiB"
+        self.stdout.write(line)
@@ -0,0 +1,88 @@
+import time
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_analysis import minhash
+from job_analysis.models import JobDescription, JobDescriptionBand
+
+
+class Command(BaseCommand):
+    help = "Backfill MinHash signatures for job descriptions and report near-duplicate clusters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=minhash.DEFAULT_THRESHOLD,
+                            help="Minimum estimated Jaccard similarity for two postings to be clustered.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--show', type=int, default=10, help="Number of largest clusters to print.")
+
+    def handle(self, *args, **options):
+        self._backfill(options['batch_size'])
+
+        started = time.monotonic()
+        rows = JobDescription.objects.exclude(minhash=None).values_list('id', 'minhash').iterator(chunk_size=5000)
+        signatures = {pk: minhash.from_bytes(data) for pk, data in rows}
+
+        parent = {}
+
+        def find(pk):
+            root = pk
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while pk != root:
+                parent[pk], pk = root, parent.get(pk, pk)
+            return root
+
+        # Only postings sharing a bucket are compared, so the work follows bucket sizes rather than N^2.
+        compared = set()
+        rows = JobDescriptionBand.objects.order_by('band', 'bucket', 'job_description_id').values_list(
+            'band', 'bucket', 'job_description_id'
+        ).iterator(chunk_size=10000)
+        for _, members in groupby(rows, key=lambda row: (row[0], row[1])):
+            ids = [row[2] for row in members]
+            for i, first in enumerate(ids):
+                for second in ids[i + 1:]:
+                    if (first, second) in compared or find(first) == find(second):
+                        continue
+                    compared.add((first, second))
+                    if minhash.similarity(signatures[first], signatures[second]) >= options['threshold']:
+                        root = find(first)
+                        parent.setdefault(root, root)
+                        parent[find(second)] = root
+
+        clusters = {}
+        for pk in parent:
+            clusters.setdefault(find(pk), []).append(pk)
+        clusters = sorted((sorted(members) for members in clusters.values() if len(members) > 1), key=len, reverse=True)
+
+        duplicates = sum(len(members) - 1 for members in clusters)
+        self.stdout.write(
+            f"{len(signatures)} postings, {len(clusters)} near-duplicate clusters, "
+            f"{duplicates} redundant postings ({time.monotonic() - started:.1f}s, {len(compared)} pairs compared)"
+        )
+        shown = clusters[:options['show']]
+        titles = dict(JobDescription.objects.filter(id__in=[members[0] for members in shown]).values_list('id', 'title'))
+        for members in shown:
+            self.stdout.write(f"  {len(members):>5} x {titles.get(members[0], '')[:60]!r}: {members[:20]}")
+
+    def _backfill(self, batch_size):
+        processed = 0
+        while True:
+            batch = list(JobDescription.objects.filter(minhash=None).only('id', 'description')[:batch_size])
+            if not batch:
+                break
+            bands = []
+            for job_description in batch:
+                sig = minhash.signature(job_description.description)
+                job_description.minhash = minhash.to_bytes(sig)
+                bands.extend(
+                    JobDescriptionBand(job_description_id=job_description.pk, band=band, bucket=bucket)
+                    for band, bucket in minhash.band_buckets(sig)
+                )
+            with transaction.atomic():
+                JobDescriptionBand.objects.filter(job_description__in=batch).delete()
+                JobDescription.objects.bulk_update(batch, ['minhash'])
+                JobDescriptionBand.objects.bulk_create(bands)
+            processed += len(batch)
+            self.stdout.write(f"{processed} signatures backfilled")
@@ -0,0 +1,74 @@
+import json
+import os
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from job_analysis.user_import import detect_format, import_users, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import users from a CSV or JSON Lines file, hashing passwords in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (with a header row) or .jsonl file of users.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows hashed and inserted per transaction.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Password hashing processes.")
+        parser.add_argument('--no-welcome-email', action='store_true', help="Do not queue welcome emails.")
+        parser.add_argument('--checkpoint', help="File recording rows already imported; resumes from it when present.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"No such file: {path}")
+
+        checkpoint = options['checkpoint']
+        skip = self._read_checkpoint(checkpoint)
+        if skip:
+            self.stdout.write(f"Resuming after row {skip}.")
+
+        def progress(totals):
+            self._write_checkpoint(checkpoint, totals['rows'])
+            rate = (totals['rows'] - skip) / totals['seconds'] if totals['seconds'] else 0
+            self.stdout.write(
+                f"{totals['rows']} rows: {totals['created']} created, {totals['skipped']} skipped, "
+                f"{totals['invalid']} invalid ({rate:.1f} rows/s)"
+            )
+
+        # Workers must not inherit open database connections from the parent.
+        connections.close_all()
+
+        workers = max(options['workers'], 1)
+        with open(path, newline='', encoding='utf-8-sig') as fh, Pool(processes=workers) as pool:
+            rows = read_rows(fh, options['format'] or detect_format(path))
+            totals = import_users(
+                rows,
+                batch_size=options['batch_size'],
+                pool=pool,
+                send_welcome_email=not options['no_welcome_email'],
+                skip=skip,
+                on_batch=progress,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['created']} users ({totals['skipped']} already existed, {totals['invalid']} invalid) "
+            f"in {totals['seconds']:.1f}s."
+        ))
+
+    @staticmethod
+    def _read_checkpoint(path):
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path) as fh:
+            return json.load(fh).get('rows', 0)
+
+    @staticmethod
+    def _write_checkpoint(path, rows):
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump({'rows': rows}, fh)
+        os.replace(tmp_path, path)
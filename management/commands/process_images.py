@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from job_analysis import image_variants
+
+
+class Command(BaseCommand):
+    help = "Generate resized, metadata-free variants for queued ImageJob rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Jobs claimed per batch (default IMAGE_VARIANTS['BATCH_SIZE']).")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches in one pass.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new jobs instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = image_variants.drain(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            if totals['batches']:
+                rate = totals['done'] / totals['seconds'] if totals['seconds'] else 0
+                self.stdout.write(
+                    f"{totals['done']} done, {totals['retried']} retried, {totals['dead']} dead "
+                    f"in {totals['batches']} batches ({totals['seconds']:.1f}s, {rate:.1f} images/s)"
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
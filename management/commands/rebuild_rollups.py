@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+
+from job_analysis import rollups
+from job_analysis.models import ResumeAnalysis
+
+
+class Command(BaseCommand):
+    help = "Recompute the analysis rollups (per day, per company and per skill) from ResumeAnalysis."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="First day to rebuild (YYYY-MM-DD); defaults to the oldest analysis.")
+        parser.add_argument('--until', help="Last day to rebuild (YYYY-MM-DD); defaults to the newest analysis.")
+        parser.add_argument('--window', type=int, default=31, help="Days rebuilt per transaction.")
+        parser.add_argument('--missing', action='store_true',
+                            help="Only roll up days that have analyses but no rollups yet (catch-up after a backfill).")
+
+    def handle(self, *args, **options):
+        if options['missing']:
+            return self.catch_up(options['window'])
+
+        bounds = ResumeAnalysis.objects.aggregate(first=Min('analyzed_at'), last=Max('analyzed_at'))
+        days = {}
+        for option, bound in (('since', 'first'), ('until', 'last')):
+            if options[option]:
+                days[option] = parse_date(options[option])
+                if days[option] is None:
+                    raise CommandError(f"Invalid --{option} date: {options[option]}")
+            elif bounds[bound] is not None:
+                days[option] = rollups.day_of(bounds[bound])
+        if len(days) < 2:
+            self.stdout.write("No analyses to roll up.")
+            return
+
+        started = time.monotonic()
+        written = 0
+        day = days['since']
+        while day <= days['until']:
+            last = min(day + timedelta(days=max(options['window'], 1) - 1), days['until'])
+            with transaction.atomic():
+                written += rollups.rebuild(day, last)
+            day = last + timedelta(days=1)
+        self.stdout.write(
+            f"Rolled up {written} days with analyses from {days['since']} to {days['until']} "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+
+    def catch_up(self, window):
+        started = time.monotonic()
+        days = rollups.missing_days()
+        for start in range(0, len(days), max(window, 1)):
+            with transaction.atomic():
+                rollups.rebuild_days(days[start:start + max(window, 1)])
+        self.stdout.write(f"Rolled up {len(days)} missing days ({time.monotonic() - started:.1f}s)")
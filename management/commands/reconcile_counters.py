@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community.models import Comment, Post
+from job_analysis.counters import reconcile_comments, reconcile_posts
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized post like/comment and comment reply counters and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Posts or comments recounted per transaction.")
+
+    def handle(self, *args, **options):
+        for label, model, reconcile in (('posts', Post, reconcile_posts), ('comments', Comment, reconcile_comments)):
+            started = time.monotonic()
+            checked = fixed = 0
+            last_pk = 0
+            while True:
+                pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+                if not pks:
+                    break
+                with transaction.atomic():
+                    fixed += reconcile(pks)
+                checked += len(pks)
+                last_pk = pks[-1]
+            self.stdout.write(f"{label}: {checked} checked, {fixed} counters repaired ({time.monotonic() - started:.1f}s)")
@@ -0,0 +1,157 @@
+import json
+import os
+import time
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils.dateparse import parse_date
+
+from job_analysis import rollups
+from job_analysis.models import ResumeAnalysis
+from job_analysis.skills import sync_analysis_skills
+from job_analysis.views.analysis_views import SCORING_ENGINE_VERSION, calculate_similarity, extract_text_from_file
+
+UPDATE_FIELDS = ['match_percentage', 'missing_skills', 'extra_skills', 'analysis_details', 'engine_version']
+
+
+def _rescore(row):
+    """Score one (pk, resume_text, resume_file, jd_text, ...) row inside a worker process."""
+    pk, resume_text, resume_file, jd_text = row[:4]
+    if not resume_text and resume_file:
+        resume_text = extract_text_from_file(os.path.join(settings.MEDIA_ROOT, resume_file))
+    if not resume_text or not jd_text:
+        return pk, None
+
+    results = calculate_similarity(resume_text, jd_text)
+    return pk, results
+
+
+class Command(BaseCommand):
+    help = "Re-score stored ResumeAnalysis rows with the current scoring engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only analyses made on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--until', help="Only analyses made on or before this date (YYYY-MM-DD).")
+        parser.add_argument('--engine-version', help="Only analyses scored by this engine version.")
+        parser.add_argument('--stale', action='store_true',
+                            help=f"Only analyses not scored by the current engine ({SCORING_ENGINE_VERSION}).")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per database round trip.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows scored and written per bulk_update.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Scoring processes.")
+        parser.add_argument('--checkpoint', help="File recording the last written pk; resumes from it when present.")
+
+    def handle(self, *args, **options):
+        analyses = ResumeAnalysis.objects.all()
+
+        for option, lookup in (('since', 'analyzed_at__date__gte'), ('until', 'analyzed_at__date__lte')):
+            if options[option]:
+                day = parse_date(options[option])
+                if day is None:
+                    raise CommandError(f"Invalid --{option} date: {options[option]}")
+                analyses = analyses.filter(**{lookup: day})
+
+        if options['engine_version']:
+            analyses = analyses.filter(engine_version=options['engine_version'])
+        if options['stale']:
+            analyses = analyses.exclude(engine_version=SCORING_ENGINE_VERSION)
+
+        checkpoint = options['checkpoint']
+        last_pk = self._read_checkpoint(checkpoint)
+        if last_pk:
+            analyses = analyses.filter(pk__gt=last_pk)
+            self.stdout.write(f"Resuming after analysis {last_pk}.")
+
+        rows = analyses.order_by('pk').values_list(
+            'pk', 'resume__content', 'resume__resume_file', 'job_description__description', 'resume__updated_at',
+            'analyzed_at', 'job_description__company_name', 'match_percentage', 'missing_skills', 'extra_skills', 'user_id',
+        ).iterator(chunk_size=options['chunk_size'])
+
+        # Workers must not inherit open database connections from the parent.
+        connections.close_all()
+
+        workers = max(options['workers'], 1)
+        processed = skipped = outdated = 0
+        started = time.monotonic()
+        with Pool(processes=workers) as pool:
+            for batch in self._batches(rows, options['batch_size']):
+                previous = {row[0]: row[5:] for row in batch}
+                # A user has one Resume, replaced on every upload. An analysis made before the latest
+                # upload would be scored against a resume it never saw, so it is left as it is.
+                current = []
+                for row in batch:
+                    if row[4] > row[5]:
+                        outdated += 1
+                        if options['verbosity'] > 1:
+                            self.stdout.write(f"Skipped analysis {row[0]}: its resume was replaced afterwards.")
+                    else:
+                        current.append(row)
+                updates = []
+                changes = []
+                skill_rows = []
+                for pk, results in pool.imap(_rescore, current, chunksize=max(len(current) // (workers * 4), 1)):
+                    if results is None:
+                        skipped += 1
+                        continue
+                    updates.append(ResumeAnalysis(
+                        pk=pk,
+                        match_percentage=results['overall_match_percentage'],
+                        missing_skills=', '.join(results['missing_skills']),
+                        extra_skills=', '.join(results['extra_skills']),
+                        analysis_details=results['analysis_details'],
+                        engine_version=SCORING_ENGINE_VERSION,
+                    ))
+                    analyzed_at, company, *old_scores, user_id = previous[pk]
+                    day, company = rollups.day_of(analyzed_at), company or ''
+                    changes.append((day, company, -1, *old_scores))
+                    new = updates[-1]
+                    changes.append((day, company, 1, new.match_percentage, new.missing_skills, new.extra_skills))
+                    skill_rows.append((pk, user_id, results['missing_skills'], results['extra_skills']))
+
+                # bulk_update sends no signals, so the rollups get the old scores out and the new ones in here,
+                # and the normalized skill rows are replaced along with the strings.
+                with transaction.atomic():
+                    ResumeAnalysis.objects.bulk_update(updates, UPDATE_FIELDS)
+                    rollups.apply(changes)
+                    sync_analysis_skills(skill_rows)
+                processed += len(batch)
+                self._write_checkpoint(checkpoint, batch[-1][0])
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{processed} rows ({len(updates)} updated in last batch, {skipped} skipped, "
+                    f"{outdated} with a replaced resume), {processed / elapsed if elapsed else 0:.1f} rows/s"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {processed - skipped - outdated} analyses with engine {SCORING_ENGINE_VERSION}, "
+            f"skipped {skipped}, and {outdated} whose resume was replaced after they were made."
+        ))
+
+    @staticmethod
+    def _batches(rows, size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _read_checkpoint(path):
+        if not path or not os.path.exists(path):
+            return None
+        with open(path) as fh:
+            return json.load(fh).get('last_pk')
+
+    @staticmethod
+    def _write_checkpoint(path, last_pk):
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump({'last_pk': last_pk}, fh)
+        os.replace(tmp_path, path)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from job_analysis import outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued OutboundEmail rows in batches over one reused SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Messages claimed per batch (default EMAIL_OUTBOX['BATCH_SIZE']).")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches in one pass.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new messages instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                totals = outbox.drain(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            except Exception as e:
+                # Typically the SMTP server refusing the connection; leased rows become due again later.
+                self.stderr.write(f"Outbox pass failed: {type(e).__name__}: {e}")
+                if not options['loop']:
+                    raise
+                totals = None
+
+            if totals and totals['batches']:
+                rate = totals['sent'] / totals['seconds'] if totals['seconds'] else 0
+                self.stdout.write(
+                    f"{totals['sent']} sent, {totals['retried']} retried, {totals['dead']} dead-lettered "
+                    f"in {totals['batches']} batches ({totals['seconds']:.1f}s, {rate:.1f} msg/s)"
+                )
+
+            if not options['loop']:
+                stats = outbox.outbox_stats()
+                self.stdout.write(
+                    f"Outbox: {stats['pending']} pending, {stats['dead']} dead, "
+                    f"oldest due message {stats['oldest_due_seconds']}s old"
+                )
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,195 @@
+"""
+Media delivery for files under ``MEDIA_ROOT``.
+
+``protected_media`` authorizes the request, answers conditional requests from
+a ``stat()`` alone, and then leaves the bytes to the cheapest available path:
+
+* ``'nginx'``: an empty response with ``X-Accel-Redirect`` to an
+  ``internal`` location that aliases ``MEDIA_ROOT``, so nginx sends the file
+  (with ``sendfile``, ``Range`` and its own validators) and the worker is
+  released immediately::
+
+      location /protected-media/ { internal; alias /path/to/media/; }
+
+* ``'sendfile'``: the same hand-off through ``X-Sendfile`` with the absolute
+  path (Apache ``mod_xsendfile``, lighttpd).
+* ``'django'``: a ``FileResponse`` over the open file, which WSGI servers
+  with ``wsgi.file_wrapper`` (gunicorn, uWSGI) send with zero-copy
+  ``sendfile``. A single ``Range`` is honoured with a ``206`` read from a
+  bounded wrapper instead.
+
+Every response carries a strong ``ETag`` built from the file size and mtime.
+File names matching ``IMMUTABLE_PATTERN`` (a content hash before the
+extension) are cached for a year as ``immutable``; others are revalidated.
+Files under ``PROTECTED_PREFIXES`` (resumes) are only served to their owner
+or an admin and are never stored by shared caches.
+
+Configured through ``settings.MEDIA_DELIVERY``::
+
+    MEDIA_DELIVERY = {'BACKEND': 'django', 'INTERNAL_PREFIX': '/protected-media/',
+                      'PROTECTED_PREFIXES': ('resumes/',), 'IMMUTABLE_PATTERN': r'\\.[0-9a-f]{8,}\\.\\w+$',
+                      'MAX_AGE': 3600}
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils._os import safe_join
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_http_methods
+
+from job_analysis.models import Resume
+from job_analysis.utils import get_bearer_token, resolve_token_user
+
+DEFAULTS = {
+    'BACKEND': 'django',
+    'INTERNAL_PREFIX': '/protected-media/',
+    'PROTECTED_PREFIXES': ('resumes/',),
+    'IMMUTABLE_PATTERN': r'\.[0-9a-f]{8,}\.\w+$',
+    'MAX_AGE': 3600,
+}
+
+IMMUTABLE_MAX_AGE = 31536000
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'MEDIA_DELIVERY', {})}
+
+
+def _request_user(request):
+    token = get_bearer_token(request)
+    if token:
+        return resolve_token_user(token)
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+def is_authorized(request, path, config):
+    """Public media is open to everyone; protected files only to their owner or an admin."""
+    if not path.startswith(tuple(config['PROTECTED_PREFIXES'])):
+        return True
+    user = _request_user(request)
+    if user is None:
+        return False
+    if user.is_admin:
+        return True
+    return Resume.objects.filter(resume_file=path, user_id=user.pk).exists()
+
+
+def make_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single satisfiable ``bytes=`` range, None to
+    send the whole file (no header, multiple or malformed ranges), or ``False``
+    when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of ``fh`` from ``start``, for ``FileResponse``."""
+
+    def __init__(self, fh, start, length):
+        fh.seek(start)
+        self.fh = fh
+        self.remaining = length
+        self.name = fh.name
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def _cache_headers(response, path, etag, protected, config):
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    scope = 'private' if protected else 'public'
+    if re.search(config['IMMUTABLE_PATTERN'], path):
+        response['Cache-Control'] = f'{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    elif protected:
+        response['Cache-Control'] = 'private, no-cache'
+    else:
+        response['Cache-Control'] = f'public, max-age={config["MAX_AGE"]}'
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def protected_media(request, path):
+    config = get_config()
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found.')
+    path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+    if not is_authorized(request, path, config):
+        return JsonResponse({'success': False, 'message': 'Unauthorized access'}, status=403)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('File not found.')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found.')
+
+    protected = path.startswith(tuple(config['PROTECTED_PREFIXES']))
+    etag = make_etag(stat)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        return _cache_headers(HttpResponseNotModified(), path, etag, protected, config)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    if config['BACKEND'] in ('nginx', 'sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if config['BACKEND'] == 'nginx':
+            response['X-Accel-Redirect'] = config['INTERNAL_PREFIX'] + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        return _cache_headers(response, path, etag, protected, config)
+
+    byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return _cache_headers(response, path, etag, protected, config)
+
+    fh = open(full_path, 'rb')
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(RangeFile(fh, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    else:
+        response = FileResponse(fh, content_type=content_type)
+    return _cache_headers(response, path, etag, protected, config)
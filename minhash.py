@@ -0,0 +1,127 @@
+"""
+MinHash signatures and LSH banding for near-duplicate job description detection.
+
+A description is normalized (case, digits, punctuation and whitespace removed),
+split into overlapping word shingles and reduced to a ``NUM_PERM``-value MinHash
+signature stored as ``uint32`` bytes on ``JobDescription.minhash``. The fraction
+of equal signature values estimates the Jaccard similarity of two shingle sets.
+
+For sub-linear lookup the signature is cut into ``BANDS`` bands of ``ROWS``
+values; each band is hashed to a bucket and stored in ``JobDescriptionBand``.
+Two postings sharing any (band, bucket) pair are candidates, which are then
+confirmed against the full signatures. With 16 bands of 8 rows, pairs above
+roughly 0.7 Jaccard similarity are found with high probability.
+
+``signals.py`` recomputes the signature on every save that may change the
+description and re-indexes the bands when it changed; ``manage.py
+cluster_job_postings`` backfills postings saved without one.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from django.db.models import Q
+
+from job_analysis.models import JobDescription, JobDescriptionBand
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+_PRIME = np.uint64((1 << 32) - 5)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, (1 << 32) - 5, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, (1 << 32) - 5, size=NUM_PERM, dtype=np.uint64)
+
+_NOISE = re.compile(r'[^a-z\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Lowercase and strip digits (dates, salaries, ids), punctuation and repeated whitespace."""
+    return _SPACES.sub(' ', _NOISE.sub(' ', (text or '').lower())).strip()
+
+
+def shingles(text):
+    """Hash every ``SHINGLE_SIZE``-word window of the normalized text to a 32-bit value."""
+    words = normalize(text).split()
+    if len(words) < SHINGLE_SIZE:
+        windows = [' '.join(words)] if words else []
+    else:
+        windows = (' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return np.fromiter({zlib.crc32(window.encode()) for window in windows}, dtype=np.uint64)
+
+
+def signature(text):
+    """MinHash signature of ``text`` as a ``uint32`` array of length ``NUM_PERM``."""
+    values = shingles(text)
+    if not len(values):
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    # a * x stays below 2**64 because both factors are below 2**32.
+    hashed = (values[:, None] * _A[None, :] % _PRIME + _B[None, :]) % _PRIME
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def to_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def band_buckets(sig):
+    """(band, bucket) pairs for ``sig``; buckets are signed 64-bit so they fit a BigIntegerField."""
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two signatures' shingle sets."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def index_job_description(job_description):
+    """Store the LSH band rows for a job description whose ``minhash`` is already set."""
+    JobDescriptionBand.objects.filter(job_description=job_description).delete()
+    JobDescriptionBand.objects.bulk_create([
+        JobDescriptionBand(job_description=job_description, band=band, bucket=bucket)
+        for band, bucket in band_buckets(from_bytes(job_description.minhash))
+    ])
+
+
+def find_similar(job_description, threshold=DEFAULT_THRESHOLD, limit=20):
+    """
+    Near-duplicates of ``job_description`` as ``[(JobDescription, similarity)]``, most similar first.
+
+    Candidates come from an indexed lookup of the posting's (band, bucket) pairs,
+    so the cost depends on the number of colliding postings, not the corpus size.
+    """
+    if not job_description.minhash:
+        return []
+    sig = from_bytes(job_description.minhash)
+
+    collisions = Q()
+    for band, bucket in band_buckets(sig):
+        collisions |= Q(band=band, bucket=bucket)
+    candidate_ids = (
+        JobDescriptionBand.objects.filter(collisions)
+        .exclude(job_description_id=job_description.pk)
+        .values('job_description_id')
+        .distinct()
+    )
+
+    matches = []
+    for candidate in JobDescription.objects.filter(id__in=candidate_ids).defer('description'):
+        score = similarity(sig, from_bytes(candidate.minhash))
+        if score >= threshold:
+            matches.append((candidate, score))
+    matches.sort(key=lambda match: (-match[1], match[0].pk))
+    return matches[:limit]
@@ -9,6 +9,14 @@ LOGIN_BY = {
     (4, 'Facebook')
 }
 
+DEGREE_LEVELS = (
+    (0, 'None'),
+    (1, 'Associate'),
+    (2, 'Bachelor'),
+    (3, 'Master'),
+    (4, 'Doctorate'),
+)
+
 class CustomUser(AbstractUser):
     id = models.BigAutoField(primary_key=True)
     email = models.EmailField(unique=True)
@@ -30,6 +38,7 @@ class CustomUser(AbstractUser):
     login_by = models.IntegerField(choices=LOGIN_BY, default=1, blank=True, null=True)
     password = models.CharField(max_length=255, blank=True, null=True)
     two_factor = models.BooleanField(default=False)
+    token_version = models.PositiveIntegerField(default=0)
     profile_picture = models.ImageField(upload_to='profile_pictures/', default="", blank=True, null=True)
 
     USERNAME_FIELD = 'email'
@@ -43,30 +52,78 @@ class CustomUser(AbstractUser):
 class JobDescription(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="job_descriptions", unique=False)
     title = models.CharField(max_length=255)
-    company_name = models.CharField(max_length=255, blank=True, null=True)
+    company_name = models.CharField(max_length=255, blank=True, null=True, db_index=True)
     description = models.TextField()
     skills_required = models.TextField(blank=True, null=True)
+    normalized_skills = models.ManyToManyField('Skill', through='JobDescriptionSkill', related_name="job_descriptions", blank=True)
     experience_required = models.CharField(max_length=100, blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
+    minhash = models.BinaryField(blank=True, null=True, editable=False)
     posted_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.title} - {self.company_name if self.company_name else 'N/A'}"
 
+class JobDescriptionBand(models.Model):
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name="lsh_bands")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='jd_band_bucket_idx'),
+        ]
+
+class Skill(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
 class Resume(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="resume", unique=False)
     summary = models.TextField(blank=True, null=True)
     skills = models.TextField(blank=True, null=True)
+    normalized_skills = models.ManyToManyField(Skill, through='ResumeSkill', related_name="resumes", blank=True)
+    experience_years = models.PositiveSmallIntegerField(default=0, db_index=True)
+    degree_level = models.PositiveSmallIntegerField(choices=DEGREE_LEVELS, default=0, db_index=True)
     education = models.TextField(blank=True, null=True)
     experience = models.TextField(blank=True, null=True)
     certifications = models.TextField(blank=True, null=True)
     languages = models.TextField(blank=True, null=True)
+    content = models.TextField(blank=True, null=True)
     resume_file = models.FileField(upload_to="resumes/", blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.user.email} - Resume"
 
+class ResumeSkill(models.Model):
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="skill_links")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="resume_links")
+
+    class Meta:
+        # Leading on skill makes the unique index double as the per-skill posting list.
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'resume'], name='unique_resume_skill'),
+        ]
+
+    def __str__(self):
+        return f"{self.resume_id} - {self.skill_id}"
+
+class JobDescriptionSkill(models.Model):
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name="skill_links")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="job_description_links")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'job_description'], name='unique_job_description_skill'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_description_id} - {self.skill_id}"
+
 class ResumeAnalysis(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="resume_analyses", unique=False)
     job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name="analyses")
@@ -75,10 +132,45 @@ class ResumeAnalysis(models.Model):
     missing_skills = models.TextField(blank=True, null=True)
     extra_skills = models.TextField(blank=True, null=True)
     analysis_details = models.TextField(blank=True, null=True)
+    engine_version = models.CharField(max_length=20, default="1", db_index=True)
     analyzed_at = models.DateTimeField(auto_now_add=True)
+    # User email and names plus JD title and company, indexed by job_analysis.search for the admin search.
+    search_document = models.TextField(default="", blank=True, editable=False)
+
+    class Meta:
+        # Keyset order of the admin analysis list (see pagination.paginate).
+        indexes = [
+            models.Index(fields=['analyzed_at', 'id'], name='analysis_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - Analysis for {self.job_description.title}"
+
+class AnalysisSkill(models.Model):
+    # One skill listed in ResumeAnalysis.missing_skills or extra_skills.
+    KIND_MISSING = 'missing'
+    KIND_EXTRA = 'extra'
+    KIND_CHOICES = (
+        (KIND_MISSING, 'Missing'),
+        (KIND_EXTRA, 'Extra'),
+    )
+
+    analysis = models.ForeignKey(ResumeAnalysis, on_delete=models.CASCADE, related_name="skill_links")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="analysis_links")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Copied from the analysis so "candidates missing X" is answered from one index.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'skill', 'analysis'], name='unique_analysis_skill'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'skill', 'user'], name='analysis_skill_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.analysis_id} - {self.skill_id} ({self.kind})"
     
 class Feedback(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='feedbacks')
@@ -89,6 +181,13 @@ class Feedback(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination on (created_at, id), newest first, overall and per user.
+            models.Index(fields=['-created_at', '-id'], name='feedback_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='feedback_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Feedback by {self.user.username} - {self.rating} Stars"
     
@@ -96,7 +195,7 @@ class Feedback(models.Model):
 class OTP(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     code = models.CharField(max_length=4)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def is_expired(self, expiry_minutes=5):
         return timezone.now() > self.created_at + timezone.timedelta(minutes=expiry_minutes)
@@ -110,4 +209,137 @@ class ContactUs(models.Model):
     modified_at = models.DateTimeField(auto_now_add=True)
 
     def _str_(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class OutboundEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, null=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+class PostCounter(models.Model):
+    # Denormalized counts for community posts, kept in step by job_analysis.counters.
+    post = models.OneToOneField('community.Post', on_delete=models.CASCADE, primary_key=True, related_name='counter')
+    like_count = models.PositiveIntegerField(default=0, db_index=True)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Post {self.post_id}: {self.like_count} likes, {self.comment_count} comments"
+
+class CommentCounter(models.Model):
+    comment = models.OneToOneField('community.Comment', on_delete=models.CASCADE, primary_key=True, related_name='counter')
+    reply_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Comment {self.comment_id}: {self.reply_count} replies"
+
+class AnalysisDayStat(models.Model):
+    # Analyses made on one day, kept in step by job_analysis.rollups for the admin dashboard.
+    day = models.DateField(unique=True)
+    analysis_count = models.PositiveIntegerField(default=0)
+    match_total = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.analysis_count} analyses"
+
+class CompanyDayStat(models.Model):
+    # Same as AnalysisDayStat per JD company ('' when the JD has none).
+    day = models.DateField()
+    company = models.CharField(max_length=255)
+    analysis_count = models.PositiveIntegerField(default=0)
+    match_total = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'company'], name='unique_company_day_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.company or 'N/A'}: {self.analysis_count} analyses"
+
+class SkillDayStat(models.Model):
+    # Analyses of one day that listed a taxonomy skill as missing or extra, kept in step by job_analysis.rollups.
+    KIND_MISSING = 'missing'
+    KIND_EXTRA = 'extra'
+    KIND_CHOICES = (
+        (KIND_MISSING, 'Missing'),
+        (KIND_EXTRA, 'Extra'),
+    )
+
+    day = models.DateField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    skill = models.CharField(max_length=100)
+    analysis_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Leading on (kind, day) makes the unique index serve "top skills between two days";
+        # the second index serves the trend of one skill.
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'day', 'skill'], name='unique_skill_day_stat'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'skill', 'day'], name='skill_day_stat_trend_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.skill} ({self.kind}): {self.analysis_count} analyses"
+
+class ImageJob(models.Model):
+    # Resized, metadata-free variants of one uploaded image, produced by job_analysis.image_variants.
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_DEAD, 'Dead'),
+    )
+    KIND_POST_IMAGE = 'post_image'
+    KIND_PROFILE_PICTURE = 'profile_picture'
+    KIND_CHOICES = (
+        (KIND_POST_IMAGE, 'Post image'),
+        (KIND_PROFILE_PICTURE, 'Profile picture'),
+    )
+
+    source = models.CharField(max_length=255, unique=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField(blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='image_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
@@ -0,0 +1,182 @@
+"""
+Transactional email outbox.
+
+Views call ``queue_email`` instead of ``send_mail``: it only inserts an
+``OutboundEmail`` row, so the message commits or rolls back with the request's
+own writes and no SMTP session is opened while the client waits. The
+``send_queued_emails`` command drains due rows in batches over a single
+connection from ``get_connection()``.
+
+A failed message is retried after ``BACKOFF * 2 ** (attempts - 1)`` seconds
+(capped at ``MAX_BACKOFF``) and dead-lettered once it has failed
+``MAX_ATTEMPTS`` times. Rows are claimed with a lease by pushing
+``next_attempt_at`` forward, so several senders can run side by side and a
+sender that dies mid-batch only delays its rows until the lease runs out.
+
+Configured through ``settings.EMAIL_OUTBOX``::
+
+    EMAIL_OUTBOX = {'BATCH_SIZE': 100, 'MAX_ATTEMPTS': 5, 'BACKOFF': 60, 'MAX_BACKOFF': 3600, 'LEASE': 300}
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from job_analysis.models import OutboundEmail
+
+DEFAULTS = {'BATCH_SIZE': 100, 'MAX_ATTEMPTS': 5, 'BACKOFF': 60, 'MAX_BACKOFF': 3600, 'LEASE': 300}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_OUTBOX', {})}
+
+
+def queue_email(subject, message, recipient_list, from_email=None, html_message=None):
+    """Queue a message with ``send_mail``'s arguments; it is sent by ``send_queued_emails``."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message,
+        from_email=from_email or settings.EMAIL_HOST_USER,
+        to=list(recipient_list),
+    )
+
+
+def queue_emails(subject, message, recipients, from_email=None, html_message=None):
+    """Queue the same message separately to each of ``recipients`` with one insert."""
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            subject=subject,
+            body=message,
+            html_body=html_message,
+            from_email=from_email or settings.EMAIL_HOST_USER,
+            to=[recipient],
+        )
+        for recipient in recipients
+    ])
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def retry_delay(attempts, config=None):
+    config = config or get_config()
+    return min(config['BACKOFF'] * 2 ** max(attempts - 1, 0), config['MAX_BACKOFF'])
+
+
+def claim_batch(batch_size, lease):
+    """Lease up to ``batch_size`` due rows to this sender and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=lease)
+            )
+    return batch
+
+
+def send_batch(batch, connection, config=None):
+    """
+    Send ``batch`` over the already open ``connection`` and record each outcome.
+
+    Returns ``{'sent': n, 'retried': n, 'dead': n}``. A failure reopens the
+    connection so one dropped session does not fail the rest of the batch.
+    """
+    config = config or get_config()
+    counts = {'sent': 0, 'retried': 0, 'dead': 0}
+    sent = []
+    failed = []
+    for email in batch:
+        try:
+            connection.send_messages([build_message(email, connection)])
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if email.attempts >= config['MAX_ATTEMPTS']:
+                email.status = OutboundEmail.STATUS_DEAD
+                counts['dead'] += 1
+            else:
+                email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts, config))
+                counts['retried'] += 1
+            failed.append(email)
+            connection.close()
+            try:
+                connection.open()
+            except Exception:
+                pass
+        else:
+            email.attempts += 1
+            email.status = OutboundEmail.STATUS_SENT
+            email.sent_at = timezone.now()
+            email.last_error = None
+            sent.append(email)
+            counts['sent'] += 1
+
+    OutboundEmail.objects.bulk_update(sent, ['status', 'attempts', 'sent_at', 'last_error'])
+    OutboundEmail.objects.bulk_update(failed, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+    return counts
+
+
+def drain(batch_size=None, max_batches=None, connection=None):
+    """
+    Send every due message, one batch at a time, over one reused connection.
+
+    Returns the totals of ``send_batch`` plus ``batches`` and ``seconds``.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    totals = {'sent': 0, 'retried': 0, 'dead': 0, 'batches': 0}
+    started = time.monotonic()
+
+    connection = connection or get_connection(fail_silently=False)
+    opened = False
+    try:
+        while max_batches is None or totals['batches'] < max_batches:
+            batch = claim_batch(batch_size, config['LEASE'])
+            if not batch:
+                break
+            if not opened:
+                connection.open()
+                opened = True
+            for key, value in send_batch(batch, connection, config).items():
+                totals[key] += value
+            totals['batches'] += 1
+    finally:
+        if opened:
+            connection.close()
+
+    totals['seconds'] = round(time.monotonic() - started, 3)
+    return totals
+
+
+def outbox_stats():
+    """Row counts per status plus the age in seconds of the oldest due message."""
+    counts = dict(OutboundEmail.objects.values_list('status').annotate(total=Count('id')).order_by())
+    oldest = OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=timezone.now()
+    ).aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'pending': counts.get(OutboundEmail.STATUS_PENDING, 0),
+        'sent': counts.get(OutboundEmail.STATUS_SENT, 0),
+        'dead': counts.get(OutboundEmail.STATUS_DEAD, 0),
+        'oldest_due_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0,
+    }
@@ -0,0 +1,107 @@
+"""
+Per-post cache of serialized feed fragments.
+
+A fragment is the JSON for one post exactly as the feed renders it (fields,
+formatted timestamps, comment preview and counts) minus the viewer-specific
+``user_liked`` flag, which the view splices in at request time. Fragments are
+stored as encoded JSON strings, so a warm feed page is assembled by string
+concatenation without re-serializing anything.
+
+Each fragment is keyed by post id and version. A post's current version lives
+under its own key and ``invalidate_post`` replaces it once the writing
+transaction commits; a fragment built from rows read before an invalidation
+is therefore stored under the old version and never served again. Missing
+versions get a fresh random value, so an evicted version key can not resurrect
+an old fragment.
+
+Configured through ``settings.POST_FRAGMENT_CACHE``::
+
+    POST_FRAGMENT_CACHE = {'ENABLED': True, 'ALIAS': 'default', 'TTL': 3600}
+"""
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+DEFAULTS = {'ENABLED': True, 'ALIAS': 'default', 'TTL': 3600}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'POST_FRAGMENT_CACHE', {})}
+
+
+def _version_key(post_id):
+    return f'post_fragment_version:{post_id}'
+
+
+def _fragment_key(post_id, version):
+    return f'post_fragment:{post_id}:{version}'
+
+
+def encode(data):
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def _versions(cache, post_ids):
+    found = cache.get_many([_version_key(post_id) for post_id in post_ids])
+    versions = {}
+    for post_id in post_ids:
+        key = _version_key(post_id)
+        version = found.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            # add() so a version set concurrently (e.g. by an invalidation) wins.
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[post_id] = version
+    return versions
+
+
+def get_fragments(post_ids, build):
+    """
+    Return ``{post_id: json_string}`` for ``post_ids``.
+
+    ``build(missing_ids)`` must return ``{post_id: dict}`` for the posts whose
+    fragments are not cached; ids it leaves out (deleted posts) are omitted.
+    """
+    config = get_config()
+    if not post_ids:
+        return {}
+    if not config['ENABLED']:
+        return {post_id: encode(data) for post_id, data in build(list(post_ids)).items()}
+
+    cache = caches[config['ALIAS']]
+    versions = _versions(cache, post_ids)
+    keys = {post_id: _fragment_key(post_id, version) for post_id, version in versions.items()}
+    cached = cache.get_many(list(keys.values()))
+
+    fragments = {post_id: cached[key] for post_id, key in keys.items() if key in cached}
+    missing = [post_id for post_id in post_ids if post_id not in fragments]
+    if missing:
+        built = {post_id: encode(data) for post_id, data in build(missing).items()}
+        cache.set_many({keys[post_id]: fragment for post_id, fragment in built.items()}, timeout=config['TTL'])
+        fragments.update(built)
+    return fragments
+
+
+def with_user_liked(fragment, user_liked):
+    """Append the viewer's ``user_liked`` flag to an encoded fragment object."""
+    return f'{fragment[:-1]}, "user_liked": {"true" if user_liked else "false"}}}'
+
+
+def invalidate_post(post_id):
+    """Retire the cached fragment of ``post_id`` once the current transaction commits."""
+    config = get_config()
+    if not config['ENABLED'] or post_id is None:
+        return
+    cache = caches[config['ALIAS']]
+    transaction.on_commit(lambda: cache.set(_version_key(post_id), uuid.uuid4().hex, timeout=None))
+
+
+def forget(post_ids):
+    """Drop the version keys of ``post_ids`` immediately, leaving their fragments unreachable."""
+    config = get_config()
+    caches[config['ALIAS']].delete_many([_version_key(post_id) for post_id in post_ids])
@@ -1,122 +1,118 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from django.db.models.functions import Coalesce
 
-from community.models import Post
+from community.models import Comment, Like, Post
 from job_analysis.models import CustomUser
 
 import json
 
-from job_analysis.utils import jwt_encode, jwt_decode, auth_user
-
+from job_analysis import image_variants, post_cache
+from job_analysis.models import ImageJob
+from job_analysis.pagination import InvalidCursor, paginate
+from job_analysis.serializers import serialize_comment
+from job_analysis.utils import jwt_required, load_user
+
+
+def comment_queryset():
+    """Comments with their author and reply count, ready for ``serializers.COMMENT``."""
+    return Comment.objects.select_related('user').annotate(reply_count=Coalesce('counter__reply_count', Value(0)))
+
+def feed_queryset():
+    """
+    Posts with everything a feed fragment renders loaded up front.
+
+    Authors come from joins and counts from the denormalized counter rows. Only
+    the latest ``FEED_COMMENT_PREVIEW`` comments of each post are prefetched:
+    Django turns the sliced prefetch into one ``ROW_NUMBER() OVER (PARTITION BY
+    post_id ...)`` query, so neither the query count nor the payload grows with
+    the number of posts or the size of their threads. Full threads are served
+    by the paginated comment and reply endpoints.
+    """
+    preview = getattr(settings, 'FEED_COMMENT_PREVIEW', 3)
+    comments = comment_queryset().order_by('-created_at', '-id')[:preview]
+    return (
+        Post.objects.select_related('user')
+        .prefetch_related(Prefetch('comments', queryset=comments, to_attr='comment_preview'))
+        .annotate(
+            like_count=Coalesce('counter__like_count', Value(0)),
+            comment_count=Coalesce('counter__comment_count', Value(0)),
+        )
+    )
+
+def with_user_liked(queryset, user):
+    return queryset.annotate(user_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=user)))
+
+def serialize_post(post, variants=None):
+    # 'image' is the feed-sized variant once the image worker has produced it, the original until then.
+    return {
+        'id': post.id,
+        'user': post.user.email,
+        'title': post.title,
+        'content': post.content,
+        'image': image_variants.display_url(post.image.name, variants),
+        'image_variants': image_variants.variant_urls(variants),
+        'created_at': post.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+        'updated_at': post.updated_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    }
+
+POST_FIELDS = ('id', 'user', 'title', 'content', 'image', 'image_variants', 'created_at', 'updated_at')
+
+def build_fragments(post_ids):
+    """Feed fragments (everything except ``user_liked``) for the given posts, for post_cache."""
+    posts = list(feed_queryset().filter(id__in=post_ids))
+    variants = image_variants.variants_for([post.image.name for post in posts])
+    return {post.id: {
+        **serialize_post(post, variants.get(post.image.name)),
+        'comments': [serialize_comment(comment) for comment in post.comment_preview],
+        'comment_count': post.comment_count,
+        'like_count': post.like_count
+    } for post in posts}
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@jwt_required
 def list_all_posts(request):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-
-        posts = Post.objects.all().order_by('-created_at')
-        post_list = []
-        for post in posts:
-            comments = []
-            for comment in post.comments.all():
-                replies = [{
-                    'id': reply.id,
-                    'user': reply.user.first_name,
-                    'content': reply.content,
-                    'created_at': reply.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                } for reply in comment.replies.all()]
-                comment_data = {
-                    'id': comment.id,
-                    'user': comment.user.first_name,
-                    'content': comment.content,
-                    'created_at': comment.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                    'replies': replies
-                }
-                comments.append(comment_data)
-            post_data = {
-                'id': post.id,
-                'user': post.user.email,
-                'title': post.title,
-                'content': post.content,
-                'image': post.image.url if post.image else None,
-                'created_at': post.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                'updated_at': post.updated_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                'comments': comments,
-                'like_count': post.likes.count(),
-                'user_liked': post.likes.filter(user=user).exists()
-            }
-            post_list.append(post_data)
-        return JsonResponse({'success': True, 'message': 'Posts retrieved successfully', 'posts': post_list}, status=200)
+        user = request.user
+
+        # Only ids and the viewer's like flag come from the database on a warm cache.
+        posts, page_info = paginate(request, with_user_liked(Post.objects.only('id', 'created_at'), user))
+        fragments = post_cache.get_fragments([post.id for post in posts], build_fragments)
+        post_list = ', '.join(
+            post_cache.with_user_liked(fragments[post.id], post.user_liked) for post in posts if post.id in fragments
+        )
+        content = (
+            '{"success": true, "message": "Posts retrieved successfully", '
+            f'"posts": [{post_list}], "pagination": {post_cache.encode(page_info)}}}'
+        )
+        return HttpResponse(content, content_type='application/json', status=200)
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'message': f"Error retrieving posts: {e}"}, status=500)
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@jwt_required
 def get_post_by_id(request, post_id):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
+        user = request.user
 
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-
-        post = Post.objects.get(id=post_id)
-        comments = []
-        for comment in post.comments.all():
-            replies = []
-            for reply in comment.replies.all():
-                replies.append({
-                    'id': reply.id,
-                    'user': reply.user.first_name,
-                    'content': reply.content,
-                    'created_at': reply.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                })
-            comments.append({
-                'id': comment.id,
-                'user': comment.user.first_name,
-                'content': comment.content,
-                'created_at': comment.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                'replies': replies
-            })
+        post = with_user_liked(Post.objects.only('id'), user).get(id=post_id)
+        fragment = post_cache.get_fragments([post.id], build_fragments).get(post.id)
+        if fragment is None:
+            raise Post.DoesNotExist
+        fragment = json.loads(fragment)
         post_data = {
-            'post': {
-                'id': post.id,
-                'user': post.user.email,
-                'title': post.title,
-                'content': post.content,
-                'image': post.image.url if post.image else None,
-                'created_at': post.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                'updated_at': post.updated_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            },
-            'comments': comments,
-            'like_count': post.likes.count(),
-            'user_liked': post.likes.filter(user=user).exists()
+            'post': {field: fragment[field] for field in POST_FIELDS},
+            'comments': fragment['comments'],
+            'comment_count': fragment['comment_count'],
+            'like_count': fragment['like_count'],
+            'user_liked': post.user_liked
         }
         return JsonResponse({'success': True, 'message': 'Post retrieved successfully', 'post': post_data}, status=200)
     except Post.DoesNotExist:
@@ -126,35 +122,24 @@ def get_post_by_id(request, post_id):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def create_post(request):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+        user = load_user(request.user)
 
         title = request.POST.get('title')
         content = request.POST.get('content')
         image = request.FILES.get('image')
 
         post = Post.objects.create(user=user, title=title, content=content, image=image)
+        image_variants.queue_image(post.image, ImageJob.KIND_POST_IMAGE, post.id)
         post_data = {
             'post': post.id,
             'user': post.user.email,
             'title': post.title,
             'content': post.content,
             'image': post.image.url if post.image else None,
+            'image_variants': None,
             'created_at': post.created_at,
             'updated_at': post.updated_at
         }
@@ -164,23 +149,10 @@ def create_post(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def update_post(request, post_id):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-        
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+        user = request.user
 
         title = request.POST.get('title')
         content = request.POST.get('content')
@@ -194,13 +166,17 @@ def update_post(request, post_id):
         if 'image' in request.FILES:
             post.image = request.FILES.get('image')
         post.save()
+        if 'image' in request.FILES:
+            image_variants.queue_image(post.image, ImageJob.KIND_POST_IMAGE, post.id)
+        variants = image_variants.variants_for([post.image.name]).get(post.image.name)
 
         post_data = {
             'id': post.id,
             'user': post.user.email,
             'title': post.title,
             'content': post.content,
-            'image': post.image.url if post.image else None,
+            'image': image_variants.display_url(post.image.name, variants),
+            'image_variants': image_variants.variant_urls(variants),
             'created_at': post.created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
             'updated_at': post.updated_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
         }
@@ -214,23 +190,10 @@ def update_post(request, post_id):
 
 @csrf_exempt
 @require_http_methods(["DELETE"])
+@jwt_required
 def delete_post(request, post_id):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-        
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+        user = request.user
 
         try:
             post = Post.objects.get(id=post_id, user=user)
@@ -247,25 +210,12 @@ def delete_post(request, post_id):
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@jwt_required
 def list_posts_by_user(request):
     try:
-        bearer = request.headers.get('Authorization')
-        if not bearer:
-            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-        token = bearer.split()[1]
-        if not auth_user(token):
-            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-
-        decoded_token = jwt_decode(token)
-        user_email = decoded_token.get('email')
-
-        try:
-            user = CustomUser.objects.get(email=user_email)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+        user = request.user
         
-        posts = Post.objects.filter(user=user)
+        posts, page_info = paginate(request, Post.objects.filter(user=user))
         post_list = [
             {
                 'id': post.id,
@@ -277,7 +227,9 @@ def list_posts_by_user(request):
             }
             for post in posts
         ]
-        return JsonResponse({'success': True, 'message': 'Posts retrieved successfully', 'posts': post_list}, status=200)
+        return JsonResponse({'success': True, 'message': 'Posts retrieved successfully', 'posts': post_list, 'pagination': page_info}, status=200)
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'message': f"Error retrieving posts: {e}"}, status=500)
 
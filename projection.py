@@ -0,0 +1,85 @@
+"""
+Declarative projections: serialize list rows straight from ``.values()``.
+
+A ``Projection`` maps output keys to field paths (``'user__email'``), to
+``Field`` objects that add a formatter, or to nested dicts for sub-objects::
+
+    FEEDBACK = Projection({
+        'id': 'id',
+        'user': {'email': 'user__email', 'first_name': 'user__first_name'},
+        'created_at': Field('created_at', iso_datetime),
+    })
+    rows = FEEDBACK.values(queryset)     # SELECT only those columns, with the joins
+    data = [FEEDBACK.dict(row) for row in rows]
+
+The spec is compiled once into getters, so serializing a row is a handful of
+dict lookups: no model instances, no ``model_to_dict`` field introspection and
+no per-value work in the JSON encoder. ``pk`` is always selected so the rows
+can be passed to ``pagination.paginate``. ``from_instance`` renders the same
+shape from an object already in memory (e.g. ``request.user``), reading
+attributes instead of columns.
+"""
+from operator import attrgetter, itemgetter
+
+from django.core.files.storage import default_storage
+
+
+class Field:
+    __slots__ = ('path', 'format')
+
+    def __init__(self, path, format=None):
+        self.path = path
+        self.format = format
+
+
+def iso_datetime(value):
+    """The text ``DjangoJSONEncoder`` writes for a datetime (milliseconds, ``Z`` for UTC)."""
+    if value is None:
+        return None
+    text = value.isoformat()
+    if value.microsecond:
+        text = text[:23] + text[26:]
+    if text.endswith('+00:00'):
+        text = text[:-6] + 'Z'
+    return text
+
+
+def utc_timestamp(value):
+    """Same as ``value.strftime('%Y-%m-%dT%H:%M:%S.%fZ')``, the format of the community endpoints."""
+    if value is None:
+        return None
+    return value.isoformat(timespec='microseconds')[:26] + 'Z'
+
+
+def media_url(value):
+    """URL of a stored file, from its name (``values()``) or its ``FieldFile`` (instances)."""
+    name = getattr(value, 'name', value)
+    return default_storage.url(name) if name else None
+
+
+def _compile(spec, paths, getter):
+    if isinstance(spec, dict):
+        items = [(key, _compile(sub, paths, getter)) for key, sub in spec.items()]
+        return lambda row: {key: get(row) for key, get in items}
+    field = spec if isinstance(spec, Field) else Field(spec)
+    paths.append(field.path)
+    get = getter(field.path)
+    if field.format is None:
+        return get
+    format = field.format
+    return lambda row: format(get(row))
+
+
+class Projection:
+    def __init__(self, spec):
+        paths = []
+        self.dict = _compile(spec, paths, itemgetter)
+        self.from_instance = _compile(spec, [], lambda path: attrgetter(path.replace('__', '.')))
+        self.paths = tuple(dict.fromkeys(['pk', *paths]))
+
+    def values(self, queryset, *extra):
+        """``queryset`` restricted to the projected columns (plus ``extra``), yielding one dict per row."""
+        return queryset.values(*self.paths, *(path for path in extra if path not in self.paths))
+
+    def serialize(self, queryset):
+        return [self.dict(row) for row in self.values(queryset)]
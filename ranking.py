@@ -0,0 +1,195 @@
+"""
+In-process ranking index that scores every stored resume against one job description.
+
+Resumes are vectorized once into a cached, L2-normalized TF-IDF sparse matrix, so
+text similarity for the whole corpus is a single sparse matrix-vector product.
+Skill overlap comes from a parallel matrix of skill bitsets (see job_analysis.skills).
+
+The index stays fresh incrementally: every query polls ``Resume.updated_at`` past
+the last sync watermark, re-vectorizes only the resumes whose ``updated_at``
+differs from the indexed version with the existing vocabulary and appends them as
+new rows, masking out the rows they replace. Deleted resumes are masked as soon
+as the indexed count exceeds the table's, so totals never include them. Once
+masked rows make up more than ``max_stale_ratio`` of the matrix the index is
+rebuilt (and the vocabulary and IDF refitted) from scratch.
+"""
+import threading
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from django.utils import timezone
+
+from job_analysis.models import Resume
+from job_analysis.skills import (
+    SKILL_WORDS, batch_skill_coverage, bitset_to_words, encode_skill_matrix, skills_to_bitset, split_skills,
+)
+
+# Rows saved just before a sync may commit just after it; re-read this much overlap every poll.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class ResumeRankingIndex:
+    def __init__(self, max_stale_ratio=0.2):
+        self.max_stale_ratio = max_stale_ratio
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._vectorizer = None
+        self._text_matrix = None
+        self._skill_matrix = np.zeros((0, SKILL_WORDS), dtype=np.uint64)
+        self._resume_ids = np.zeros(0, dtype=np.int64)
+        self._active = np.zeros(0, dtype=bool)
+        self._rows = {}
+        self._versions = {}
+        self._synced_at = None
+
+    def invalidate(self):
+        """Drop the cached matrices; the next query rebuilds them."""
+        with self._lock:
+            self._reset()
+
+    def _load(self, resumes, changed_only=False):
+        ids, texts, skills, versions = [], [], [], []
+        rows = resumes.values_list('id', 'content', 'summary', 'skills', 'updated_at').iterator(chunk_size=2000)
+        for resume_id, content, summary, skill_names, updated_at in rows:
+            if changed_only and self._versions.get(resume_id) == updated_at:
+                continue
+            ids.append(resume_id)
+            texts.append(content or summary or '')
+            skills.append(skills_to_bitset(split_skills(skill_names)))
+            versions.append(updated_at)
+        return ids, texts, skills, versions
+
+    def _rebuild(self, now):
+        ids, texts, skills, versions = self._load(Resume.objects.all())
+        self._reset()
+        self._synced_at = now
+        if not ids:
+            return
+
+        self._vectorizer = TfidfVectorizer()
+        try:
+            self._text_matrix = self._vectorizer.fit_transform(texts).tocsr()
+        except ValueError:
+            # Every resume is empty; keep an all-zero matrix so skill overlap still ranks.
+            self._vectorizer = None
+            self._text_matrix = sparse.csr_matrix((len(ids), 1))
+        self._skill_matrix = encode_skill_matrix(skills)
+        self._resume_ids = np.array(ids, dtype=np.int64)
+        self._active = np.ones(len(ids), dtype=bool)
+        self._rows = {resume_id: row for row, resume_id in enumerate(ids)}
+        self._versions = dict(zip(ids, versions))
+
+    def _append(self, ids, texts, skills, versions):
+        for resume_id in ids:
+            previous = self._rows.get(resume_id)
+            if previous is not None:
+                self._active[previous] = False
+
+        start = len(self._resume_ids)
+        if self._vectorizer is not None:
+            new_rows = self._vectorizer.transform(texts)
+        else:
+            new_rows = sparse.csr_matrix((len(ids), self._text_matrix.shape[1]))
+        self._text_matrix = sparse.vstack([self._text_matrix, new_rows], format='csr')
+        self._skill_matrix = np.vstack([self._skill_matrix, encode_skill_matrix(skills)])
+        self._resume_ids = np.concatenate([self._resume_ids, np.array(ids, dtype=np.int64)])
+        self._active = np.concatenate([self._active, np.ones(len(ids), dtype=bool)])
+        self._rows.update({resume_id: start + offset for offset, resume_id in enumerate(ids)})
+        self._versions.update(zip(ids, versions))
+
+    def _sync(self):
+        now = timezone.now()
+        if self._synced_at is None or self._text_matrix is None:
+            self._rebuild(now)
+            return
+
+        # The overlap re-reads rows that are already indexed; only new versions are appended.
+        ids, texts, skills, versions = self._load(
+            Resume.objects.filter(updated_at__gte=self._synced_at - SYNC_OVERLAP), changed_only=True
+        )
+        self._synced_at = now
+        if ids:
+            self._append(ids, texts, skills, versions)
+        if len(self._rows) > Resume.objects.count():
+            self._remove(set(self._rows) - set(Resume.objects.values_list('id', flat=True)))
+
+        stale = len(self._active) - int(self._active.sum())
+        if stale > self.max_stale_ratio * len(self._active):
+            self._rebuild(now)
+
+    def _remove(self, resume_ids):
+        for resume_id in resume_ids:
+            row = self._rows.pop(resume_id, None)
+            self._versions.pop(resume_id, None)
+            if row is not None:
+                self._active[row] = False
+
+    def rank(self, jd_text, jd_skills, offset=0, limit=20, skill_weight=0.5):
+        """
+        Rank all stored resumes against one job description.
+
+        Args:
+            jd_text: preprocessed job description text
+            jd_skills: skill names required by the job description
+            offset / limit: slice of the ranking to return
+            skill_weight: share of the score taken by skill coverage (the rest is text similarity)
+
+        Returns:
+            (results, total) where results is a list of dicts with resume, score,
+            text_match_percentage and skills_match_percentage, best first
+        """
+        with self._lock:
+            self._sync()
+            if not len(self._resume_ids) or not self._active.any():
+                return [], 0
+
+            if self._vectorizer is not None:
+                query = self._vectorizer.transform([jd_text])
+                text_scores = (self._text_matrix @ query.T).toarray().ravel() * 100
+            else:
+                text_scores = np.zeros(len(self._resume_ids))
+            skill_scores = batch_skill_coverage(bitset_to_words(skills_to_bitset(jd_skills)), self._skill_matrix)
+
+            scores = (1 - skill_weight) * text_scores + skill_weight * skill_scores
+            scores[~self._active] = -np.inf
+            total = int(self._active.sum())
+
+            wanted = min(offset + limit, total)
+            if wanted <= offset:
+                return [], total
+            if wanted < len(scores):
+                top = np.argpartition(-scores, wanted - 1)[:wanted]
+            else:
+                top = np.arange(len(scores))
+            # Ties break on resume id so pages stay stable between requests.
+            top = top[np.lexsort((self._resume_ids[top], -scores[top]))][offset:wanted]
+            top = top[np.isfinite(scores[top])]
+
+            page_ids = [int(resume_id) for resume_id in self._resume_ids[top]]
+            page = [(int(self._resume_ids[row]), scores[row], text_scores[row], skill_scores[row]) for row in top]
+
+        resumes = Resume.objects.select_related('user').in_bulk(page_ids)
+        missing = [resume_id for resume_id in page_ids if resume_id not in resumes]
+        if missing:
+            with self._lock:
+                self._remove(missing)
+
+        results = [
+            {
+                'resume': resumes[resume_id],
+                'score': float(score),
+                'text_match_percentage': float(text_score),
+                'skills_match_percentage': float(skill_score),
+            }
+            for resume_id, score, text_score, skill_score in page
+            if resume_id in resumes
+        ]
+        return results, total - len(missing)
+
+
+ranking_index = ResumeRankingIndex()
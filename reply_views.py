@@ -1,10 +1,13 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
 
 from community.models import Reply, Comment, CustomUser
 
-from job_analysis.utils import jwt_decode, auth_user
+from job_analysis.pagination import InvalidCursor, paginate, paginated_list_response
+from job_analysis.serializers import REPLY
+from job_analysis.utils import jwt_required
 from django.forms.models import model_to_dict
 
 import json
@@ -12,9 +15,12 @@ import json
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_all_replies(request):
-    replies = Reply.objects.all()
+    try:
+        replies, page_info = paginate(request, Reply.objects.all())
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     replies_data = [model_to_dict(reply) for reply in replies]
-    return JsonResponse(replies_data, safe=False)
+    return paginated_list_response(replies_data, page_info)
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -27,22 +33,9 @@ def retrieve_reply(request, reply_id):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def create_reply(request, comment_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         comment = Comment.objects.get(id=comment_id)
@@ -60,11 +53,12 @@ def create_reply(request, comment_id):
         return JsonResponse({'success': False, 'message': 'Content is required.'}, status=400)
 
     try:
-        reply = Reply.objects.create(
-            user=user,
-            comment=comment,
-            content=content
-        )
+        with transaction.atomic():
+            reply = Reply.objects.create(
+                user=user,
+                comment=comment,
+                content=content
+            )
     except Exception as e:
         return JsonResponse({"success": False, "message": f"Error creating reply: {e}"}, status=500)
 
@@ -72,22 +66,9 @@ def create_reply(request, comment_id):
 
 @csrf_exempt
 @require_http_methods(["PUT"])
+@jwt_required
 def update_reply(request, reply_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         reply = Reply.objects.get(id=reply_id)
@@ -114,22 +95,9 @@ def update_reply(request, reply_id):
 
 @csrf_exempt
 @require_http_methods(["DELETE"])
+@jwt_required
 def delete_reply(request, reply_id):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-    
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-    
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
 
     try:
         reply = Reply.objects.get(id=reply_id)
@@ -139,18 +107,20 @@ def delete_reply(request, reply_id):
     if reply.user != user:
         return JsonResponse({"success": False, "message": "You can only delete your own replies."}, status=403)
 
-    reply.delete()
+    with transaction.atomic():
+        reply.delete()
 
     return JsonResponse({"success": True, "message": "Reply deleted successfully."}, status=200)
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_replies_for_comment(request, comment_id):
-    try:
-        comment = Comment.objects.get(id=comment_id)
-    except Comment.DoesNotExist:
+    if not Comment.objects.filter(id=comment_id).exists():
         return JsonResponse({"success": False, "message": "Comment not found."}, status=404)
-    replies = comment.replies.all()
-    replies_data = [model_to_dict(reply) for reply in replies]
-    return JsonResponse(replies_data, safe=False)
+    try:
+        replies, page_info = paginate(request, REPLY.values(Reply.objects.filter(comment_id=comment_id)))
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    replies_data = [REPLY.dict(row) for row in replies]
+    return JsonResponse({"success": True, "message": "Replies retrieved successfully.", "replies": replies_data, "pagination": page_info}, status=200)
 
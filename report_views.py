@@ -1,25 +1,28 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.contrib.auth.decorators import login_required
 
 from community.models import Report, Post, Comment, CustomUser
-from job_analysis.utils import jwt_decode, auth_user
+from job_analysis.pagination import InvalidCursor, paginate, paginated_list_response
+from job_analysis.utils import jwt_required
 from django.forms.models import model_to_dict
 
 import json
 
 @csrf_exempt
-@login_required
 @require_http_methods(["GET"])
+@jwt_required
 def list_all_reports_view(request):
-    reports = Report.objects.all()
+    try:
+        reports, page_info = paginate(request, Report.objects.all())
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     reports_data = [model_to_dict(report) for report in reports]
-    return JsonResponse(reports_data, safe=False)
+    return paginated_list_response(reports_data, page_info)
 
 @csrf_exempt
-@login_required
 @require_http_methods(["GET"])
+@jwt_required
 def retrieve_report_view(request, report_id):
     try:
         report = Report.objects.get(id=report_id)
@@ -28,13 +31,11 @@ def retrieve_report_view(request, report_id):
     return JsonResponse(model_to_dict(report))
 
 @csrf_exempt
-@login_required
 @require_http_methods(["POST"])
+@jwt_required
 def create_report_view(request):
     data = json.loads(request.body)
-    user = auth_user(request)
-    if not user:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = request.user
     if 'post_id' in data:
         try:
             post = Post.objects.get(id=data['post_id'])
@@ -55,16 +56,16 @@ def create_report_view(request):
         return JsonResponse({'success': False, 'message': 'No target specified.'}, status=400)
 
 @csrf_exempt
-@login_required
 @require_http_methods(["PUT"])
+@jwt_required
 def update_report_view(request, report_id):
     data = json.loads(request.body)
     try:
         report = Report.objects.get(id=report_id)
     except Report.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Report not found.'}, status=404)
-    user = auth_user(request)
-    if not user or report.user != user:
+    user = request.user
+    if report.user != user:
         return JsonResponse({'success': False, 'message': 'User not found or not authorized.'}, status=404)
     report.reason = data.get('reason', report.reason)
     report.description = data.get('description', report.description)
@@ -72,51 +73,60 @@ def update_report_view(request, report_id):
     return JsonResponse(model_to_dict(report))
 
 @csrf_exempt
-@login_required
 @require_http_methods(["DELETE"])
+@jwt_required
 def delete_report_view(request, report_id):
     try:
         report = Report.objects.get(id=report_id)
     except Report.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Report not found.'}, status=404)
-    user = auth_user(request)
-    if not user or report.user != user:
+    user = request.user
+    if report.user != user:
         return JsonResponse({'success': False, 'message': 'User not found or not authorized.'}, status=404)
     report.delete()
     return JsonResponse({'success': True, 'message': 'Report deleted successfully'})
 
 @csrf_exempt
-@login_required
 @require_http_methods(["GET"])
+@jwt_required
 def list_reports_for_post_view(request, post_id):
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Post not found.'}, status=404)
-    reports = post.reports.all()
+    try:
+        reports, page_info = paginate(request, post.reports.all())
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     reports_data = [model_to_dict(report) for report in reports]
-    return JsonResponse(reports_data, safe=False)
+    return paginated_list_response(reports_data, page_info)
 
 @csrf_exempt
-@login_required
 @require_http_methods(["GET"])
+@jwt_required
 def list_reports_for_comment_view(request, comment_id):
     try:
         comment = Comment.objects.get(id=comment_id)
     except Comment.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Comment not found.'}, status=404)
-    reports = comment.reports.all()
+    try:
+        reports, page_info = paginate(request, comment.reports.all())
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     reports_data = [model_to_dict(report) for report in reports]
-    return JsonResponse(reports_data, safe=False)
+    return paginated_list_response(reports_data, page_info)
 
 @csrf_exempt
-@login_required
 @require_http_methods(["GET"])
+@jwt_required
 def list_reports_by_user_view(request, user_id):
     try:
         user = CustomUser.objects.get(id=user_id)
     except CustomUser.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-    reports = user.reports.all()
+    try:
+        reports, page_info = paginate(request, user.reports.all())
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
     reports_data = [model_to_dict(report) for report in reports]
-    return JsonResponse(reports_data, safe=False)
+    return paginated_list_response(reports_data, page_info)
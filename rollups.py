@@ -0,0 +1,296 @@
+"""
+Per-day rollups of resume analyses for the admin dashboard and trend charts.
+
+* ``AnalysisDayStat``: number of analyses and sum of ``match_percentage`` per day.
+* ``CompanyDayStat``: the same per day and JD company.
+* ``SkillDayStat``: per day and taxonomy skill, how many analyses listed it in
+  ``missing_skills`` and in ``extra_skills``.
+
+Summaries and trends over any range of days sum at most one row per day (and
+company or skill) instead of aggregating ``ResumeAnalysis`` and splitting its
+comma-joined skills, so they cost the same at any table size.
+
+``signals.py`` applies every analysis that is created, re-scored or deleted
+as a delta with ``F()`` updates; callers write the analysis in a transaction
+(``analyze_resume`` wraps it in ``transaction.atomic()``, ``delete()`` is
+atomic already) so it commits together with its rollups. Code that writes
+analyses with ``bulk_update`` (``rescore_analyses``) calls ``apply`` itself.
+A day is always rolled up as a whole: when its ``AnalysisDayStat`` row is
+missing (a day from before rollups existed, or the first analysis of a day)
+the whole day is rebuilt from its analyses, and once it exists a missing
+company or skill row just means the count was zero. Two transactions that
+both find the row missing race on its unique ``day``; the loser adds its
+delta to the winner's row instead. ``manage.py rebuild_rollups``
+recomputes any range of days, or only the days not rolled up yet.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from job_analysis.models import AnalysisDayStat, CompanyDayStat, ResumeAnalysis, SkillDayStat
+from job_analysis.skills import split_skills
+
+SKILL_FIELDS = ((SkillDayStat.KIND_MISSING, 'missing_skills'), (SkillDayStat.KIND_EXTRA, 'extra_skills'))
+# Fields of an analysis whose change moves it in the rollups.
+ANALYSIS_FIELDS = {'match_percentage', 'missing_skills', 'extra_skills', 'job_description'}
+
+
+def day_of(value):
+    """The day ``TruncDate`` puts ``value`` in: the current time zone's date when ``USE_TZ`` is on."""
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def day_bounds(day):
+    """``[start, end)`` of ``day`` as ``analyzed_at`` values, for index range scans."""
+    start = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=1)
+
+
+def _days_filter(days):
+    # Ranges rather than ``analyzed_at__date`` so the analyzed_at index is used.
+    condition = Q(pk__in=[])
+    for day in days:
+        start, end = day_bounds(day)
+        condition |= Q(analyzed_at__gte=start, analyzed_at__lt=end)
+    return condition
+
+
+def _aggregate(analyses, by_company=False):
+    analyses = analyses.order_by().annotate(stat_day=TruncDate('analyzed_at'))
+    fields = ['stat_day']
+    if by_company:
+        analyses = analyses.annotate(stat_company=Coalesce('job_description__company_name', Value('')))
+        fields.append('stat_company')
+    return analyses.values(*fields).annotate(n=Count('pk'), total=Coalesce(Sum('match_percentage'), Value(0.0)))
+
+
+def _day_stats(analyses):
+    return [
+        AnalysisDayStat(day=row['stat_day'], analysis_count=row['n'], match_total=row['total'])
+        for row in _aggregate(analyses)
+    ]
+
+
+def _company_stats(analyses):
+    return [
+        CompanyDayStat(day=row['stat_day'], company=row['stat_company'], analysis_count=row['n'], match_total=row['total'])
+        for row in _aggregate(analyses, by_company=True)
+    ]
+
+
+def _skill_stats(analyses, chunk_size=2000):
+    counts = Counter()
+    rows = analyses.order_by().values_list('analyzed_at', *(field for _, field in SKILL_FIELDS))
+    for analyzed_at, *values in rows.iterator(chunk_size=chunk_size):
+        day = day_of(analyzed_at)
+        for (kind, _), value in zip(SKILL_FIELDS, values):
+            counts.update((day, kind, skill) for skill in split_skills(value))
+    return [
+        SkillDayStat(day=day, kind=kind, skill=skill, analysis_count=count)
+        for (day, kind, skill), count in counts.items()
+    ]
+
+
+def _bump(model, key, **deltas):
+    """Add ``deltas`` to the row of ``model`` identified by ``key``, creating it at zero first if needed."""
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if not model.objects.filter(**key).update(**increments):
+        model.objects.get_or_create(**key)
+        model.objects.filter(**key).update(**increments)
+
+
+def _build_day(day):
+    """Build the rollups of a day that has none; False when a concurrent transaction built it first."""
+    try:
+        with transaction.atomic():
+            rebuild_days([day])
+    except IntegrityError:
+        return False
+    return True
+
+
+def change(analysis, sign=1):
+    """
+    The ``apply`` entry that adds (``sign=1``) or removes (``sign=-1``) ``analysis``:
+    a model instance, or anything with the same attributes.
+    """
+    return (
+        day_of(analysis.analyzed_at), analysis.job_description.company_name or '', sign,
+        analysis.match_percentage, analysis.missing_skills, analysis.extra_skills,
+    )
+
+
+def apply(changes):
+    """
+    Apply ``(day, company, sign, match_percentage, missing_skills, extra_skills)``
+    changes to the rollups: each adds (``sign=1``) or removes (``sign=-1``) one
+    analysis. A re-score is its old values removed and its new values added.
+
+    Must run after the analyses themselves are written: a day that is not rolled
+    up yet is built from its analyses, which already include them.
+    """
+    days = defaultdict(lambda: [0, 0.0])
+    companies = defaultdict(lambda: [0, 0.0])
+    skills = defaultdict(int)
+    for day, company, sign, match, missing, extra in changes:
+        for totals in (days[day], companies[day, company]):
+            totals[0] += sign
+            totals[1] += sign * match
+        for (kind, _), value in zip(SKILL_FIELDS, (missing, extra)):
+            for skill in split_skills(value):
+                skills[day, kind, skill] += sign
+
+    rebuilt = set()
+    for day, (count, match) in days.items():
+        increments = {'analysis_count': F('analysis_count') + count, 'match_total': F('match_total') + match}
+        if AnalysisDayStat.objects.filter(day=day).update(**increments):
+            continue
+        # Nothing to take away from a day that was never rolled up; it is built whole when it is.
+        if count < 0 or _build_day(day):
+            rebuilt.add(day)
+        else:
+            AnalysisDayStat.objects.filter(day=day).update(**increments)
+    for (day, company), (count, match) in companies.items():
+        if day not in rebuilt and (count or match):
+            _bump(CompanyDayStat, {'day': day, 'company': company}, analysis_count=count, match_total=match)
+    for (day, kind, skill), count in skills.items():
+        if day not in rebuilt and count:
+            _bump(SkillDayStat, {'day': day, 'kind': kind, 'skill': skill}, analysis_count=count)
+
+
+def _replace(days_filter, analyses, skills=True):
+    CompanyDayStat.objects.filter(days_filter).delete()
+    CompanyDayStat.objects.bulk_create(_company_stats(analyses), batch_size=2000)
+    if skills:
+        SkillDayStat.objects.filter(days_filter).delete()
+        SkillDayStat.objects.bulk_create(_skill_stats(analyses), batch_size=2000)
+
+
+def rebuild_days(days):
+    """Recompute every rollup for the given days from ``ResumeAnalysis``."""
+    days = list(days)
+    if not days:
+        return
+    analyses = ResumeAnalysis.objects.filter(_days_filter(days))
+    AnalysisDayStat.objects.filter(day__in=days).delete()
+    AnalysisDayStat.objects.bulk_create(_day_stats(analyses))
+    _replace(Q(day__in=days), analyses)
+
+
+def rebuild_companies(job_description_id):
+    """Recompute the company rollup of every day with an analysis of one JD, after its company changed."""
+    days = {
+        day_of(value) for value in
+        ResumeAnalysis.objects.filter(job_description_id=job_description_id).values_list('analyzed_at', flat=True)
+    }
+    if days:
+        _replace(Q(day__in=days), ResumeAnalysis.objects.filter(_days_filter(days)), skills=False)
+
+
+def rebuild(since, until):
+    """Recompute every rollup for the days from ``since`` to ``until`` inclusive; returns the days written."""
+    start, _ = day_bounds(since)
+    _, end = day_bounds(until)
+    analyses = ResumeAnalysis.objects.filter(analyzed_at__gte=start, analyzed_at__lt=end)
+    window = Q(day__gte=since, day__lte=until)
+    AnalysisDayStat.objects.filter(window).delete()
+    written = AnalysisDayStat.objects.bulk_create(_day_stats(analyses))
+    _replace(window, analyses)
+    return len(written)
+
+
+def missing_days():
+    """Days that have analyses but no rollups yet, oldest first (one aggregate over ``ResumeAnalysis``)."""
+    days = ResumeAnalysis.objects.order_by().annotate(stat_day=TruncDate('analyzed_at')).values_list(
+        'stat_day', flat=True
+    ).distinct()
+    return sorted(set(days) - set(AnalysisDayStat.objects.values_list('day', flat=True)))
+
+
+def _average(count, total):
+    return round(total / count, 2) if count else None
+
+
+def _window(since, until):
+    window = Q()
+    if since:
+        window &= Q(day__gte=since)
+    if until:
+        window &= Q(day__lte=until)
+    return window
+
+
+def _days(since, until):
+    day = since
+    while day <= until:
+        yield day
+        day += timedelta(days=1)
+
+
+def summary(since=None, until=None, top_companies=10):
+    """
+    Dashboard totals, average match, analyses per day and top companies for the
+    days from ``since`` to ``until`` (both optional, inclusive).
+    """
+    window = _window(since, until)
+    per_day = list(
+        AnalysisDayStat.objects.filter(window, analysis_count__gt=0).order_by('day')
+        .values_list('day', 'analysis_count', 'match_total')
+    )
+    total_count = sum(count for _, count, _ in per_day)
+    total_match = sum(match for _, _, match in per_day)
+    companies = (
+        CompanyDayStat.objects.filter(window).values('company')
+        .annotate(n=Sum('analysis_count'), total=Sum('match_total', output_field=FloatField()))
+        .filter(n__gt=0).order_by('-n', 'company')[:top_companies]
+    )
+    return {
+        'total_analyses': total_count,
+        'average_match': _average(total_count, total_match),
+        'analyses_per_day': [
+            {'day': day.isoformat(), 'analyses': count, 'average_match': _average(count, match)}
+            for day, count, match in per_day
+        ],
+        'top_companies': [
+            {'company': row['company'] or 'N/A', 'analyses': row['n'], 'average_match': _average(row['n'], row['total'])}
+            for row in companies
+        ],
+    }
+
+
+def match_trend(since, until, company=None):
+    """Analyses and average match on every day from ``since`` to ``until``, zero-filled, optionally for one company."""
+    if company is None:
+        stats = AnalysisDayStat.objects.filter(_window(since, until))
+    else:
+        stats = CompanyDayStat.objects.filter(_window(since, until), company=company)
+    by_day = {day: (count, match) for day, count, match in stats.values_list('day', 'analysis_count', 'match_total')}
+    trend = []
+    for day in _days(since, until):
+        count, match = by_day.get(day, (0, 0.0))
+        trend.append({'day': day.isoformat(), 'analyses': count, 'average_match': _average(count, match)})
+    return trend
+
+
+def top_skills(kind, since, until, limit=10):
+    """The ``limit`` skills most often listed as ``kind`` (missing or extra) from ``since`` to ``until``."""
+    rows = (
+        SkillDayStat.objects.filter(_window(since, until), kind=kind).values('skill')
+        .annotate(n=Sum('analysis_count')).filter(n__gt=0).order_by('-n', 'skill')[:limit]
+    )
+    return [{'skill': row['skill'], 'analyses': row['n']} for row in rows]
+
+
+def skill_trend(kind, skill, since, until):
+    """How many analyses listed ``skill`` as ``kind`` on every day from ``since`` to ``until``, zero-filled."""
+    by_day = dict(
+        SkillDayStat.objects.filter(_window(since, until), kind=kind, skill=skill).values_list('day', 'analysis_count')
+    )
+    return [{'day': day.isoformat(), 'analyses': by_day.get(day, 0)} for day in _days(since, until)]
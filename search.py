@@ -0,0 +1,252 @@
+"""
+Full-text search over community posts and comments, and over the denormalized
+``ResumeAnalysis.search_document`` used by the admin analysis search.
+
+SQLite: an external-content FTS5 table per source (``community_post_fts``,
+``community_comment_fts``) indexes the text columns and three triggers keep it
+in step with every insert, update and delete, so there is no sync job. Results
+are ordered by ``bm25()`` (title matches weigh more than content matches) and
+snippets come from FTS5's ``snippet()``.
+
+PostgreSQL: a GIN expression index over the same weighted ``tsvector`` the
+queries compute, which PostgreSQL maintains itself. Results are ordered by
+``ts_rank_cd()`` (PostgreSQL has no BM25) and snippets come from
+``ts_headline()``.
+
+``install`` creates whatever is missing and runs after every ``migrate`` (see
+``signals.py``); ``manage.py build_search_index --rebuild`` re-indexes existing
+rows. User input never reaches the query syntax: it is reduced to word tokens,
+all required, the last one matched as a prefix. Snippets are HTML-escaped with
+the matches wrapped in ``<mark>``.
+
+Pages are keyset-paginated on ``(score, id)``, so the cursor of one page is the
+score and id of its last row.
+"""
+import html
+import re
+
+from django.db import connection as default_connection
+from django.utils.dateparse import parse_datetime
+
+from community.models import Comment, Post
+from job_analysis.models import ResumeAnalysis
+from job_analysis.projection import utc_timestamp
+
+# columns: (column, PostgreSQL weight, bm25 weight); fields: extra columns returned with each hit.
+SOURCES = {
+    'posts': {
+        'model': Post,
+        'columns': (('title', 'A', 4.0), ('content', 'B', 1.0)),
+        'fields': ('title', 'created_at'),
+    },
+    'comments': {
+        'model': Comment,
+        'columns': (('content', 'A', 1.0),),
+        'fields': ('post_id', 'created_at'),
+    },
+    # Admin-only; see admin_views.search_analyses. Names and emails are not stemmed, and FTS5
+    # keeps prefix indexes so search-as-you-type does not expand every term.
+    'analyses': {
+        'model': ResumeAnalysis,
+        'columns': (('search_document', 'A', 1.0),),
+        'fields': (),
+        'snippet': False,
+        'tokenize': 'unicode61 remove_diacritics 2',
+        'prefix': '2 3 4',
+        'config': 'simple',
+    },
+}
+
+COMMUNITY_SOURCES = ('posts', 'comments')
+
+ANALYSIS_DOCUMENT_FIELDS = ('user__email', 'user__first_name', 'user__last_name',
+                            'job_description__title', 'job_description__company_name')
+USER_DOCUMENT_FIELDS = {'email', 'first_name', 'last_name'}
+JOB_DOCUMENT_FIELDS = {'title', 'company_name'}
+
+
+def analysis_document(*values):
+    """``ResumeAnalysis.search_document`` from the values of ``ANALYSIS_DOCUMENT_FIELDS``."""
+    return ' '.join(value for value in values if value)
+
+
+def refresh_analysis_documents(queryset, batch_size=2000):
+    """Recompute ``search_document`` for the analyses in ``queryset``; returns how many changed."""
+    manager = ResumeAnalysis.objects.db_manager(queryset.db)
+    changed = []
+    total = 0
+    rows = queryset.order_by().values_list('pk', 'search_document', *ANALYSIS_DOCUMENT_FIELDS)
+    for pk, current, *values in rows.iterator(chunk_size=batch_size):
+        document = analysis_document(*values)
+        if document != current:
+            changed.append(ResumeAnalysis(pk=pk, search_document=document))
+        if len(changed) >= batch_size:
+            manager.bulk_update(changed, ['search_document'])
+            total += len(changed)
+            changed = []
+    manager.bulk_update(changed, ['search_document'])
+    return total + len(changed)
+
+
+MAX_TERMS = 8
+SNIPPET_WORDS = 16
+# Control characters that never occur in posts; replaced by <mark> after escaping.
+START, STOP = '\x02', '\x03'
+
+TERM_RE = re.compile(r'\w+')
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+def is_supported(connection=None):
+    return (connection or default_connection).vendor in ('sqlite', 'postgresql')
+
+
+def query_terms(query):
+    return TERM_RE.findall(query or '')[:MAX_TERMS]
+
+
+def _fts_table(table):
+    return f'{table}_fts'
+
+
+def _sqlite_statements(source):
+    table, columns = source['model']._meta.db_table, source['columns']
+    fts = _fts_table(table)
+    options = f"tokenize='{source.get('tokenize', 'porter unicode61 remove_diacritics 2')}'"
+    if source.get('prefix'):
+        options += f", prefix='{source['prefix']}'"
+    names = ', '.join(column for column, _, _ in columns)
+    new = ', '.join(f'new.{column}' for column, _, _ in columns)
+    old = ', '.join(f'old.{column}' for column, _, _ in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', {options})",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+def _pg_vector(connection, source):
+    config = source.get('config', 'english')
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({connection.ops.quote_name(column)}, '')), '{weight}')"
+        for column, weight, _ in source['columns']
+    )
+
+
+def install(connection=None, rebuild=False):
+    """Create the search index of every source if it is missing; ``rebuild`` re-indexes existing rows."""
+    connection = connection or default_connection
+    if not is_supported(connection):
+        raise SearchUnavailable(f'Full-text search is not supported on {connection.vendor}.')
+    with connection.cursor() as cursor:
+        for source in SOURCES.values():
+            table = source['model']._meta.db_table
+            if connection.vendor == 'sqlite':
+                fts = _fts_table(table)
+                exists = fts in connection.introspection.table_names(cursor)
+                create, *triggers = _sqlite_statements(source)
+                if not exists:
+                    cursor.execute(create)
+                for statement in triggers:
+                    cursor.execute(statement)
+                if rebuild or not exists:
+                    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            else:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (({_pg_vector(connection, source)}))"
+                )
+                if rebuild:
+                    cursor.execute(f"REINDEX INDEX {table}_search_idx")
+
+
+def _sqlite_search(connection, source, terms, limit, after):
+    table, columns = source['model']._meta.db_table, source['columns']
+    fts = _fts_table(table)
+    match = ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+    weights = ', '.join(str(weight) for _, _, weight in columns)
+    score = f'bm25({fts}, {weights})'
+    select = ['t.id', *(f't.{field}' for field in source['fields'])]
+    if source.get('snippet', True):
+        select.append(f"snippet({fts}, -1, '{START}', '{STOP}', '…', {SNIPPET_WORDS})")
+    # bm25() is negative, lower is better; the API reports -bm25 so higher is better everywhere.
+    sql = (
+        f"SELECT {', '.join(select)}, -{score} "
+        f"FROM {fts} JOIN {table} t ON t.id = {fts}.rowid WHERE {fts} MATCH %s"
+    )
+    params = [match]
+    if after is not None:
+        sql += f" AND ({score} > %s OR ({score} = %s AND t.id > %s))"
+        params += [-after[0], -after[0], after[1]]
+    sql += f" ORDER BY {score}, t.id LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _pg_search(connection, source, terms, limit, after):
+    table, config = source['model']._meta.db_table, source.get('config', 'english')
+    vector = _pg_vector(connection, source)
+    score = f'ts_rank_cd({vector}, q)'
+    select = ['t.id', *(f't.{connection.ops.quote_name(field)}' for field in source['fields'])]
+    if source.get('snippet', True):
+        text_column = connection.ops.quote_name(source['columns'][-1][0])
+        select.append(
+            f"ts_headline('{config}', coalesce(t.{text_column}, ''), q, "
+            f"'StartSel={START}, StopSel={STOP}, MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS // 2}')"
+        )
+    sql = (
+        f"SELECT {', '.join(select)}, {score} "
+        f"FROM {table} t, to_tsquery('{config}', %s) q WHERE {vector} @@ q"
+    )
+    params = [' & '.join(terms[:-1] + [f'{terms[-1]}:*'])]
+    if after is not None:
+        sql += f" AND ({score} < %s OR ({score} = %s AND t.id > %s))"
+        params += [after[0], after[0], after[1]]
+    sql += f" ORDER BY {score} DESC, t.id LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def format_snippet(snippet):
+    return html.escape(snippet or '').replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+def search(source_name, query, limit, after=None, connection=None):
+    """
+    Up to ``limit`` best matches for ``query`` in the source ``source_name``.
+
+    ``after`` is the ``(score, id)`` of the last row of the previous page. Returns
+    a list of dicts with ``id``, the source's extra fields, ``snippet`` (unless the
+    source disables it) and ``score`` (higher is better); empty when ``query`` has
+    no words.
+    """
+    connection = connection or default_connection
+    if not is_supported(connection):
+        raise SearchUnavailable(f'Full-text search is not supported on {connection.vendor}.')
+    source = SOURCES[source_name]
+    terms = query_terms(query)
+    if not terms:
+        return []
+    run = _sqlite_search if connection.vendor == 'sqlite' else _pg_search
+    keys = ('id', *source['fields'], *(('snippet',) if source.get('snippet', True) else ()), 'score')
+    results = []
+    for row in run(connection, source, terms, limit, after):
+        result = dict(zip(keys, row))
+        if 'snippet' in result:
+            result['snippet'] = format_snippet(result['snippet'])
+        if 'created_at' in result:
+            if isinstance(result['created_at'], str):
+                # Raw SQLite cursors may return the column text.
+                result['created_at'] = parse_datetime(result['created_at'])
+            result['created_at'] = utc_timestamp(result['created_at'])
+        results.append(result)
+    return results
@@ -0,0 +1,52 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from job_analysis import search
+from job_analysis.pagination import InvalidCursor, get_page_size, pack_cursor, unpack_cursor
+from job_analysis.utils import jwt_required
+
+# =============================== #
+# ======== Search API's ========= #
+# =============================== #
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@jwt_required
+def search_community_view(request):
+    query = request.GET.get('q', '').strip()
+    source = request.GET.get('type', 'posts')
+    if source not in search.COMMUNITY_SOURCES:
+        return JsonResponse({'success': False, 'message': f"type must be one of: {', '.join(search.COMMUNITY_SOURCES)}."}, status=400)
+    if not search.query_terms(query):
+        return JsonResponse({'success': False, 'message': 'Query is required.'}, status=400)
+
+    try:
+        page_size = get_page_size(request)
+        after = None
+        if request.GET.get('cursor'):
+            payload = unpack_cursor(request.GET['cursor'])
+            try:
+                after = (float(payload['s']), int(payload['id']))
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursor('Invalid cursor.')
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    try:
+        rows = search.search(source, query, page_size + 1, after)
+    except search.SearchUnavailable as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=501)
+
+    results = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = results[-1]
+        next_cursor = pack_cursor({'s': last['score'], 'id': last['id']})
+    return JsonResponse({
+        'success': True,
+        'message': 'Search results retrieved successfully.',
+        'results': results,
+        'pagination': {'next_cursor': next_cursor, 'page_size': page_size},
+    }, status=200)
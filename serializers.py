@@ -0,0 +1,39 @@
+"""
+JSON shapes for community comments and replies.
+
+The feed preview and the paginated comment and reply endpoints render through
+the same projections, so a client can show a preview comment and a fetched one
+with the same code. Authors are reduced to public profile fields. Comment rows
+need a ``reply_count`` annotation (see ``post_views.comment_queryset``).
+"""
+from job_analysis.projection import Field, Projection, media_url, utc_timestamp
+
+
+def _author(prefix):
+    return {
+        'id': f'{prefix}__id',
+        'first_name': f'{prefix}__first_name',
+        'last_name': f'{prefix}__last_name',
+        'profile_picture': Field(f'{prefix}__profile_picture', media_url),
+    }
+
+
+COMMENT = Projection({
+    'id': 'id',
+    'post': 'post_id',
+    'user': _author('user'),
+    'content': 'content',
+    'created_at': Field('created_at', utc_timestamp),
+    'reply_count': 'reply_count',
+})
+
+REPLY = Projection({
+    'id': 'id',
+    'comment': 'comment_id',
+    'user': _author('user'),
+    'content': 'content',
+    'created_at': Field('created_at', utc_timestamp),
+})
+
+# For comment instances loaded by the feed prefetch.
+serialize_comment = COMMENT.from_instance
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 import os
@@ -23,6 +24,8 @@ DEBUG = True
 ALLOWED_HOSTS = ['*']
 
 CORS_ALLOW_ALL_ORIGINS = True
+# Cursors for list endpoints that return a bare JSON array (job_analysis.pagination).
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'X-Previous-Cursor']
 
 
 # Application definition
@@ -111,9 +114,66 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How job_analysis.media_views hands files to the client: 'django' (FileResponse/sendfile),
+# 'nginx' (X-Accel-Redirect to an internal location aliasing MEDIA_ROOT) or 'sendfile' (X-Sendfile).
+MEDIA_DELIVERY = {
+    'BACKEND': 'django',
+    'INTERNAL_PREFIX': '/protected-media/',
+    'PROTECTED_PREFIXES': ('resumes/',),
+    'MAX_AGE': 3600,
+}
+
 DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+JWT_ACCESS_TOKEN_LIFETIME = timedelta(minutes=15)
+JWT_REFRESH_TOKEN_LIFETIME = timedelta(days=30)
+# Accept email-only tokens issued before versioned tokens, for users whose tokens were never revoked
+# (revoke_tokens ends them too); turn off once they have been refreshed away.
+JWT_ACCEPT_LEGACY_TOKENS = True
+# user_login skips django.contrib.auth.login() (and its session write) unless the client sends "session": true.
+JWT_STATELESS_LOGIN = True
+
+# Admin sessions live in a signed cookie, so logins add no django_session rows.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+SESSION_COOKIE_HTTPONLY = True
+
+# Keyset pagination for list endpoints; clients may ask for up to MAX_PAGE_SIZE items per page.
+PAGINATION = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+}
+
+# Number of latest comments embedded per post in the community feed; the rest are paginated.
+FEED_COMMENT_PREVIEW = 3
+
+# Token -> user snapshot cache used by job_analysis.utils.jwt_required.
+# Set ALIAS to a shared cache (e.g. Redis) in CACHES to share it across worker processes.
+JWT_USER_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+    'ALIAS': None,
+}
+
+# Serialized post fragments for the community feed (job_analysis.post_cache).
+POST_FRAGMENT_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TTL': 3600,
+}
+
+# Background resizing of uploaded images (job_analysis.image_variants); SIZES bound the longest side in pixels.
+IMAGE_VARIANTS = {
+    'SIZES': {'thumbnail': 160, 'feed': 1080, 'full': 2048},
+    'QUALITY': 82,
+    'BATCH_SIZE': 10,
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF': 60,
+    'MAX_BACKOFF': 3600,
+    'LEASE': 600,
+}
+
 load_dotenv()
 
 
@@ -124,6 +184,15 @@ EMAIL_HOST_USER = 'kangana0313@gmail.com'
 EMAIL_HOST_PASSWORD = 'aiog wdev qbrf kurw'
 EMAIL_USE_TLS = True
 
+# Outbox drained by `manage.py send_queued_emails`; see job_analysis.outbox.
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF': 60,
+    'MAX_BACKOFF': 3600,
+    'LEASE': 300,
+}
+
 
 
 RAZORPAY_KEY_ID = 'rzp_test_ew74Ktx27rLLPC'
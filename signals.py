@@ -0,0 +1,179 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from community.models import Comment, Like, Post, Reply
+from job_analysis import counters, minhash, post_cache, rollups, search
+from job_analysis.models import CommentCounter, CustomUser, JobDescription, PostCounter, ResumeAnalysis
+from job_analysis.token_cache import get_token_user_cache
+
+
+@receiver(pre_save, sender=JobDescription)
+def compute_job_description_minhash(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Recomputed on every save that may change the description, so edits never leave a stale signature.
+    instance._minhash_changed = False
+    if raw or (update_fields is not None and 'description' not in update_fields):
+        return
+    data = minhash.to_bytes(minhash.signature(instance.description))
+    instance._minhash_changed = bytes(instance.minhash or b'') != data
+    instance.minhash = data
+
+
+@receiver(post_save, sender=JobDescription)
+def index_job_description_minhash(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not getattr(instance, '_minhash_changed', False):
+        return
+    if update_fields is not None and 'minhash' not in update_fields:
+        JobDescription.objects.filter(pk=instance.pk).update(minhash=instance.minhash)
+    minhash.index_job_description(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_token_user_cache(sender, instance, **kwargs):
+    cache = get_token_user_cache()
+    if cache is not None:
+        cache.invalidate_user(instance)
+
+
+def _removed_with(origin, *models):
+    """
+    Whether a delete of one of ``models`` (an instance or a queryset, which delete
+    signals pass as ``origin``) cascaded to this row. Its parent's own receivers
+    then adjust the counters and cache once, so the row needs no work of its own.
+    """
+    return isinstance(origin, models) or getattr(origin, 'model', None) in models
+
+
+@receiver(post_save, sender=Post)
+def create_post_counter(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        PostCounter.objects.create(post=instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CommentCounter.objects.create(comment=instance)
+        counters.adjust_post(instance.post_id, 'comment_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    if not _removed_with(origin, Post):
+        counters.adjust_post(instance.post_id, 'comment_count', -1)
+
+
+@receiver(post_save, sender=Like)
+def like_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.adjust_post(instance.post_id, 'like_count', 1)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, origin=None, **kwargs):
+    if not _removed_with(origin, Post):
+        counters.adjust_post(instance.post_id, 'like_count', -1)
+
+
+@receiver(post_save, sender=Reply)
+def reply_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.adjust_comment(instance.comment_id, 1)
+
+
+@receiver(post_delete, sender=Reply)
+def reply_deleted(sender, instance, origin=None, **kwargs):
+    if not _removed_with(origin, Post, Comment):
+        counters.adjust_comment(instance.comment_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_fragment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        post_cache.invalidate_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def invalidate_parent_post_fragment(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _removed_with(origin, Post):
+        post_cache.invalidate_post(instance.post_id)
+
+
+@receiver(post_save, sender=Reply)
+@receiver(post_delete, sender=Reply)
+def invalidate_reply_post_fragment(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _removed_with(origin, Post, Comment):
+        post_cache.invalidate_post(Comment.objects.filter(pk=instance.comment_id).values_list('post_id', flat=True).first())
+
+
+@receiver(pre_save, sender=ResumeAnalysis)
+def set_analysis_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        user, job = instance.user, instance.job_description
+        if search.USER_DOCUMENT_FIELDS & user.get_deferred_fields():
+            # A token-cache user: one query for the names rather than one per deferred field.
+            names = CustomUser.objects.filter(pk=user.pk).values_list('email', 'first_name', 'last_name').get()
+        else:
+            names = (user.email, user.first_name, user.last_name)
+        instance.search_document = search.analysis_document(*names, job.title, job.company_name)
+
+
+@receiver(pre_save, sender=ResumeAnalysis)
+def remember_analysis_rollup(sender, instance, raw=False, update_fields=None, **kwargs):
+    # The stored row, so post_save can move its contribution to the rollups.
+    instance._rollup_previous = None
+    if raw or instance._state.adding or (update_fields is not None and not rollups.ANALYSIS_FIELDS & set(update_fields)):
+        return
+    instance._rollup_previous = ResumeAnalysis.objects.filter(pk=instance.pk).select_related('job_description').only(
+        'analyzed_at', 'match_percentage', 'missing_skills', 'extra_skills', 'job_description__company_name'
+    ).first()
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def update_analysis_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.apply([rollups.change(instance)])
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        rollups.apply([rollups.change(previous, -1), rollups.change(instance)])
+
+
+@receiver(post_delete, sender=ResumeAnalysis)
+def remove_analysis_from_rollups(sender, instance, **kwargs):
+    rollups.apply([rollups.change(instance, -1)])
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_user_analysis_documents(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and not search.USER_DOCUMENT_FIELDS & set(update_fields)):
+        return
+    search.refresh_analysis_documents(ResumeAnalysis.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=JobDescription)
+def refresh_job_analysis_documents(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and not search.JOB_DOCUMENT_FIELDS & set(update_fields)):
+        return
+    search.refresh_analysis_documents(ResumeAnalysis.objects.filter(job_description=instance))
+
+
+@receiver(post_save, sender=JobDescription)
+def rebuild_job_company_rollups(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and 'company_name' not in update_fields):
+        return
+    rollups.rebuild_companies(instance.pk)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using='default', **kwargs):
+    # Once per migrate run, after every app's tables exist.
+    if sender.name == 'job_analysis' and search.is_supported(connections[using]):
+        search.install(connections[using])
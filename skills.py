@@ -0,0 +1,407 @@
+"""
+Skill taxonomy and bitset encoding used by the scoring paths.
+
+Every skill in ``SKILL_TAXONOMY`` has a fixed taxonomy id (its position in the
+list). A document's skills are encoded as a bitset with bit ``i`` set when the
+document mentions skill ``i``, so matching, missing and extra skills become
+AND / AND-NOT operations plus a popcount instead of set operations on strings.
+
+Single pairs use plain Python ints. Batch paths use ``uint64`` NumPy arrays of
+shape ``(n, SKILL_WORDS)`` so one resume can be scored against thousands of job
+descriptions in a single vectorized operation.
+"""
+import numpy as np
+
+from job_analysis.models import AnalysisSkill, JobDescriptionSkill, ResumeSkill, Skill
+
+PREDEFINED_SKILLS = [
+    # Technical Skills (General)
+    "Python", "Java", "C++", "JavaScript", "SQL", "Machine Learning", 
+    "Data Science", "Django", "Flask", "HTML", "CSS", "React", "Node.js", 
+    "AWS", "Azure", "Docker", "Kubernetes", "Git", "PostgreSQL", "MongoDB", 
+    "Agile", "Leadership", "Teamwork",
+    
+    # AI/ML & Data Science
+    "TensorFlow", "PyTorch", "OpenCV", "NLP", "Computer Vision",
+    "Deep Learning", "Neural Networks", "Reinforcement Learning",
+    "Natural Language Processing", "Text Analytics",
+    "Data Mining", "Predictive Analytics",
+    "Big Data Analytics", "Data Warehousing",
+    "ETL", "Data Pipelines", "Data Integration",
+    "Machine Learning Operations", "MLOps",
+    
+    # Cloud & Infrastructure
+    "AWS Lambda", "AWS S3", "AWS EC2", "AWS RDS",
+    "Azure Functions", "Azure Blob Storage", "Azure VMs",
+    "Google Cloud Platform", "GCP Cloud Storage",
+    "Cloud Architecture", "Cloud Security",
+    "Infrastructure as Code", "Infrastructure Automation",
+    "Terraform", "Ansible", "SaltStack",
+    
+    # DevOps & CI/CD
+    "CI/CD", "Continuous Integration", "Continuous Deployment",
+    "Jenkins", "GitLab CI", "GitHub Actions",
+    "Docker Compose", "Docker Swarm", "Kubernetes",
+    "Kafka", "RabbitMQ", "Message Queues",
+    "Redis", "Memcached", "Caching",
+    "Monitoring", "Logging", "Debugging",
+    "Performance Optimization", "Load Testing",
+    "Chaos Engineering", "Site Reliability Engineering",
+    
+    # Web Development
+    "REST API", "GraphQL", "Microservices", "Serverless",
+    "Next.js", "Nuxt.js", "Gatsby",
+    "Vue.js", "Angular", "Svelte",
+    "TypeScript", "GraphQL", "Apollo",
+    "Progressive Web Apps", "Web Components",
+    "Web Accessibility", "Performance Optimization",
+    
+    # Mobile Development
+    "React Native", "Flutter", "Swift", "Kotlin",
+    "Android", "iOS", "Xamarin", "Ionic",
+    "Mobile UI/UX", "Mobile Performance",
+    "Push Notifications", "Location Services",
+    
+    # Game Development
+    "Unity", "Unreal Engine", "Godot",
+    "Game Physics", "Game AI", "Game Graphics",
+    "Game Design", "Level Design", "Game Testing",
+    
+    # AR/VR & 3D
+    "ARKit", "ARCore", "WebXR",
+    "Three.js", "WebGL", "WebGPU",
+    "3D Modeling", "3D Animation", "3D Rendering",
+    "Virtual Reality", "Augmented Reality",
+    
+    # Security
+    "Cyber Security", "Penetration Testing", "Ethical Hacking",
+    "Network Security", "Application Security",
+    "Identity and Access Management", "IAM",
+    "Security Compliance", "Security Auditing",
+    "Security Architecture",
+    
+    # Dev Tools & IDEs
+    "Visual Studio Code", "IntelliJ IDEA", "PyCharm",
+    "Eclipse", "NetBeans", "Sublime Text",
+    "Postman", "JMeter", "Selenium",
+    "Jira", "Trello", "Asana",
+    
+    # UI/UX Design
+    "UI/UX Design", "Adobe Creative Suite", "Figma", "Sketch",
+    "Adobe XD", "InVision", "Zeplin",
+    "Wireframing", "Prototyping", "User Testing",
+    "Responsive Design", "Accessibility Design",
+    
+    # Data Visualization
+    "Tableau", "Power BI", "Matplotlib", "Seaborn",
+    "Plotly", "D3.js", "Bokeh",
+    "Data Storytelling", "Dashboard Design",
+    
+    # Version Control
+    "Git", "GitLab", "Bitbucket", "GitHub Actions",
+    "Branch Management", "Code Review",
+    "Version Control Best Practices",
+    
+    # Testing
+    "JUnit", "Selenium", "Postman", "Load Testing",
+    "Test-Driven Development", "Behavior-Driven Development",
+    "Unit Testing", "Integration Testing",
+    "Performance Testing", "Security Testing",
+    
+    # Database
+    "Database Design", "Database Optimization",
+    "SQL", "NoSQL", "MongoDB", "Cassandra",
+    "Redis", "Elasticsearch", "Neo4j",
+    
+    # Network & Systems
+    "Network Administration", "System Administration",
+    "Linux Administration", "Windows Administration",
+    "Network Security", "Network Troubleshooting",
+    
+    # IoT & Embedded Systems
+    "IoT", "Embedded Systems", "Arduino", "Raspberry Pi",
+    "Microcontrollers", "Real-time Systems",
+    "Embedded Software", "Firmware Development",
+    
+    # Engineering Skills
+    "Thermodynamics", "Fluid Mechanics", "Structural Analysis",
+    "Circuit Design", "Control Systems", "Signal Processing",
+    "Material Science", "Process Engineering", "Chemical Engineering",
+    "Aerodynamics", "Structural Design", "Mechanical Design",
+    "Electrical Systems", "Power Systems", "Electronics",
+    "Civil Engineering", "Construction Management",
+    "Chemical Process Design", "Process Optimization",
+    "Biomedical Instrumentation", "Medical Devices",
+    "Environmental Systems", "Waste Management",
+    "Materials Testing", "Manufacturing Processes",
+    "Industrial Engineering", "Operations Research",
+    
+    # Medical Skills
+    "Clinical Research", "Patient Care", "Medical Diagnosis", "Treatment Planning",
+    "Medical Records Management", "Healthcare Documentation", "Patient Assessment",
+    "Emergency Medicine", "Surgery", "Anesthesia", "Radiology", "Pathology",
+    "Pharmacology", "Medical Ethics", "Infection Control", "Sterilization",
+    "Medical Equipment Operation", "Diagnostic Testing",
+    "Nursing Care", "Physiotherapy", "Pharmacy Management",
+    "Optometry", "Medical Imaging", "Medical Laboratory",
+    
+    # Business Skills
+    "Financial Analysis", "Budgeting", "Cost Management",
+    "Marketing Strategy", "Market Research", "Sales Management",
+    "Human Resource Management", "Recruitment", "Training",
+    "Economic Analysis", "Financial Planning",
+    "Accounting", "Taxation", "Auditing",
+    "Business Strategy", "Entrepreneurship",
+    "Customer Relationship Management",
+    "Supply Chain Management", "Logistics",
+    
+    # Science Skills
+    "Physics", "Chemistry", "Biology", "Mathematics", "Statistics",
+    "Research Methodology", "Experimental Design",
+    "Data Analysis", "Scientific Computing",
+    "Environmental Science", "Ecology",
+    "Biotechnology", "Genetic Engineering",
+    "Biochemistry", "Molecular Biology",
+    "Computational Science", "Scientific Programming",
+    
+    # Arts Skills
+    "Literary Analysis", "Historical Research",
+    "Political Science", "Public Policy",
+    "Sociology", "Anthropology",
+    "Psychological Research", "Behavioral Science",
+    "Journalism", "Media Studies",
+    "Art History", "Visual Arts",
+    "Performance Arts", "Theatre Production",
+    
+    # Law Skills
+    "Legal Research", "Legal Writing",
+    "Contract Law", "Corporate Law",
+    "Intellectual Property", "Patent Law",
+    "Criminal Law", "Civil Law",
+    "Legal Advocacy", "Legal Ethics",
+    
+    # Education Skills
+    "Teaching Methodology", "Curriculum Design",
+    "Educational Technology", "Learning Assessment",
+    "Pedagogy", "Educational Research",
+    "Classroom Management", "Student Development",
+    
+    # Professional Skills
+    "Accounting", "Auditing", "Taxation",
+    "Legal Practice", "Legal Consultation",
+    "Architecture", "Urban Planning",
+    "Surveying", "Construction Management",
+    
+    # Specialized Skills
+    "Data Science", "Machine Learning", "AI Development",
+    "Digital Marketing", "SEO", "Social Media",
+    "Hospitality Management", "Food Service",
+    "Event Planning", "Tourism Management",
+    "Social Work", "Community Development",
+    "Public Administration", "Policy Analysis",
+    "Sports Science", "Physical Training",
+    "Music Theory", "Composition",
+    "Dance Choreography", "Theatre Direction",
+    
+    # Non-Technical Skills
+    "Communication", "Problem Solving", "Time Management", "Adaptability",
+    "Critical Thinking", "Decision Making", "Conflict Resolution",
+    "Project Management", "Budget Management", "Risk Management",
+    "Customer Service", "Negotiation", "Presentation", "Research",
+    "Data Analysis", "Report Writing", "Documentation", "Quality Control",
+    "Team Leadership", "Mentoring", "Stress Management", "Multi-tasking",
+    "Attention to Detail", "Creativity", "Strategic Thinking",
+    "Business Development", "Marketing", "Sales",
+    
+    # Sports Skills
+    "Football", "Cricket", "Basketball", "Volleyball", "Badminton",
+    "Tennis", "Swimming", "Athletics", "Track and Field",
+    "Gymnastics", "Martial Arts", "Karate", "Taekwondo",
+    "Yoga", "Aerobics", "Fitness Training",
+    "Team Sports", "Individual Sports", "Sports Leadership",
+    "Sportsmanship", "Sports Strategy",
+    
+    # Dance Skills
+    "Bharatanatyam", "Kathak", "Kuchipudi", "Odissi",
+    "Ballet", "Hip-Hop", "Contemporary", "Jazz",
+    "Salsa", "Bhangra", "Garba", "Folk Dance",
+    "Choreography", "Performance", "Stage Presence",
+    "Dance Technique", "Rhythm", "Expression",
+    
+    # Singing Skills
+    "Classical Singing", "Carnatic Music", "Hindustani Music",
+    "Western Classical", "Pop Singing", "Jazz Singing",
+    "Vocal Training", "Sight Reading", "Music Theory",
+    "Instrumental", "Guitar", "Piano", "Keyboard",
+    "Voice Modulation", "Breathing Techniques",
+    "Stage Performance", "Audition Preparation",
+    "Music Production", "Recording", "Composition"
+]
+
+# The predefined list repeats a few skills across categories; ids follow first occurrence.
+SKILL_TAXONOMY = list(dict.fromkeys(PREDEFINED_SKILLS))
+SKILL_IDS = {skill: index for index, skill in enumerate(SKILL_TAXONOMY)}
+SKILL_WORDS = (len(SKILL_TAXONOMY) + 63) // 64
+_CANONICAL_NAMES = {skill.lower(): skill for skill in SKILL_TAXONOMY}
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def canonical_skill_name(name):
+    """Map user input such as ``' docker '`` to its taxonomy name, or None when unknown."""
+    return _CANONICAL_NAMES.get(name.strip().lower())
+
+
+def split_skills(value):
+    """Parse a comma-joined skills string (as stored on Resume.skills) into taxonomy names."""
+    names = (canonical_skill_name(part) for part in (value or '').split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def skill_ids(names):
+    """``{name: id}`` for ``names``, creating the missing ``Skill`` rows; two queries."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+    return dict(Skill.objects.filter(name__in=names).values_list('name', 'id'))
+
+
+def sync_resume_skills(resume, skills):
+    """Replace the resume's normalized skill rows with ``skills`` using a constant number of queries."""
+    ids = list(skill_ids(skills).values())
+
+    ResumeSkill.objects.filter(resume=resume).exclude(skill_id__in=ids).delete()
+    ResumeSkill.objects.bulk_create(
+        [ResumeSkill(resume=resume, skill_id=skill_id) for skill_id in ids],
+        ignore_conflicts=True,
+    )
+
+
+def sync_job_description_skills(job_description, skills):
+    """Replace the JD's normalized skill rows with ``skills``, like ``sync_resume_skills``."""
+    ids = list(skill_ids(skills).values())
+    JobDescriptionSkill.objects.filter(job_description=job_description).exclude(skill_id__in=ids).delete()
+    JobDescriptionSkill.objects.bulk_create(
+        [JobDescriptionSkill(job_description=job_description, skill_id=skill_id) for skill_id in ids],
+        ignore_conflicts=True,
+    )
+
+
+def sync_analysis_skills(rows):
+    """
+    Replace the ``AnalysisSkill`` rows of many analyses in a constant number of queries.
+
+    ``rows`` holds ``(analysis_id, user_id, missing_skills, extra_skills)`` with
+    the skills as lists of names or comma-joined strings.
+    """
+    def listed(value):
+        return split_skills(value) if value is None or isinstance(value, str) else list(value)
+
+    rows = [(analysis_id, user_id, listed(missing), listed(extra)) for analysis_id, user_id, missing, extra in rows]
+    ids = skill_ids(name for *_, missing, extra in rows for name in (*missing, *extra))
+    AnalysisSkill.objects.filter(analysis_id__in=[row[0] for row in rows]).delete()
+    AnalysisSkill.objects.bulk_create([
+        AnalysisSkill(analysis_id=analysis_id, user_id=user_id, skill_id=ids[name], kind=kind)
+        for analysis_id, user_id, missing, extra in rows
+        for kind, names in ((AnalysisSkill.KIND_MISSING, missing), (AnalysisSkill.KIND_EXTRA, extra))
+        for name in dict.fromkeys(names)
+    ], batch_size=2000, ignore_conflicts=True)
+
+
+def skills_to_bitset(skills):
+    """Encode an iterable of skill names as a Python int bitset. Unknown names are ignored."""
+    bits = 0
+    for skill in skills:
+        skill_id = SKILL_IDS.get(skill)
+        if skill_id is not None:
+            bits |= 1 << skill_id
+    return bits
+
+
+def bitset_to_skills(bits):
+    """Decode a Python int bitset back to skill names in taxonomy order."""
+    skills = []
+    while bits:
+        lowest = bits & -bits
+        skills.append(SKILL_TAXONOMY[lowest.bit_length() - 1])
+        bits ^= lowest
+    return skills
+
+
+def bitset_to_words(bits):
+    """Split a Python int bitset into a ``uint64`` row of length ``SKILL_WORDS``."""
+    mask = (1 << 64) - 1
+    return np.array([(bits >> (64 * word)) & mask for word in range(SKILL_WORDS)], dtype=np.uint64)
+
+
+def encode_skill_matrix(skill_lists):
+    """Encode many skill lists (or Python int bitsets) as a ``(n, SKILL_WORDS)`` ``uint64`` matrix."""
+    matrix = np.zeros((len(skill_lists), SKILL_WORDS), dtype=np.uint64)
+    for row, skills in enumerate(skill_lists):
+        bits = skills if isinstance(skills, int) else skills_to_bitset(skills)
+        if bits:
+            matrix[row] = bitset_to_words(bits)
+    return matrix
+
+
+def popcount_rows(matrix):
+    """Count set bits per row of a ``uint64`` matrix."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(matrix).sum(axis=1, dtype=np.int64)
+    return _BYTE_POPCOUNT[matrix.view(np.uint8)].reshape(matrix.shape[0], -1).sum(axis=1, dtype=np.int64)
+
+
+def skill_overlap(resume_bits, jd_bits):
+    """Return (matching, missing, extra) bitsets for one resume/job description pair."""
+    return resume_bits & jd_bits, jd_bits & ~resume_bits, resume_bits & ~jd_bits
+
+
+def skills_match_percentage(resume_bits, jd_bits):
+    """Percentage of the job description's skills present in the resume (0 when it lists none)."""
+    required = jd_bits.bit_count()
+    if not required:
+        return 0
+    return (resume_bits & jd_bits).bit_count() / required * 100
+
+
+def batch_skill_overlap(resume_words, jd_matrix):
+    """
+    Score one resume against many job descriptions at once.
+
+    Args:
+        resume_words: ``uint64`` row of length ``SKILL_WORDS`` (see ``bitset_to_words``)
+        jd_matrix: ``(n, SKILL_WORDS)`` ``uint64`` matrix (see ``encode_skill_matrix``)
+
+    Returns:
+        dict of ``int64`` arrays of length ``n``: matching, missing and extra counts, plus
+        ``skills_match_percentage`` as ``float64``
+    """
+    resume_words = np.asarray(resume_words, dtype=np.uint64).reshape(1, -1)
+    matching = popcount_rows(jd_matrix & resume_words)
+    missing = popcount_rows(jd_matrix & ~resume_words)
+    required = matching + missing
+    extra = popcount_rows(resume_words).item() - matching
+
+    percentage = np.zeros(len(required), dtype=np.float64)
+    np.divide(matching * 100.0, required, out=percentage, where=required > 0)
+    return {
+        'matching': matching,
+        'missing': missing,
+        'extra': extra,
+        'skills_match_percentage': percentage,
+    }
+
+
+def batch_skill_coverage(required_words, candidate_matrix):
+    """
+    Percentage of ``required_words``' skills held by each candidate row (0 when nothing is required).
+
+    Used to score one job description against many resumes at once.
+    """
+    required_words = np.asarray(required_words, dtype=np.uint64).reshape(1, -1)
+    required = popcount_rows(required_words).item()
+    if not required:
+        return np.zeros(candidate_matrix.shape[0], dtype=np.float64)
+    return popcount_rows(candidate_matrix & required_words) * (100.0 / required)
@@ -0,0 +1,67 @@
+"""
+Streaming JSON responses for endpoints that return whole tables.
+
+``streaming_json_response`` writes the usual ``{"success": ..., "<key>": [...]}``
+envelope, but the array is encoded one row at a time from an iterator
+(normally ``queryset.iterator(chunk_size=...)``) and flushed in buffers of
+about ``BUFFER_SIZE`` bytes. Peak memory is one database chunk plus one
+buffer, however many rows the endpoint returns.
+
+Django materializes a synchronous iterator into a list before serving it
+under ASGI (and an asynchronous one under WSGI), so the response is given an
+async iterator for ``ASGIRequest`` and a plain generator otherwise. The async
+wrapper pulls each buffer with ``sync_to_async(thread_sensitive=True)``, which
+keeps the database cursor on the thread that opened it.
+
+The status code is sent before the first row is read, so an error while
+streaming truncates the body instead of turning into a 500 response.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+_DONE = object()
+
+
+def iter_json(envelope, key, rows, serialize):
+    """
+    Yield ``{**envelope, key: [serialize(row) for row in rows]}`` as encoded JSON chunks.
+    """
+    encoder = DjangoJSONEncoder()
+    # ``key`` is encoded last, so its empty list is the ``[]}`` at the end.
+    head = encoder.encode({**envelope, key: []})
+    buffer, size = [head[:-2]], len(head) - 2
+    separator = ''
+    for row in rows:
+        item = separator + encoder.encode(serialize(row))
+        separator = ', '
+        buffer.append(item)
+        size += len(item)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    buffer.append(']}')
+    yield ''.join(buffer).encode()
+
+
+async def _aiter(iterator):
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(iterator, _DONE)
+        if chunk is _DONE:
+            return
+        yield chunk
+
+
+def streaming_json_response(request, envelope, key, rows, serialize, status=200):
+    """
+    Stream ``envelope`` with ``key`` holding every serialized row, under WSGI or ASGI.
+    """
+    chunks = iter_json(envelope, key, rows, serialize)
+    if isinstance(request, ASGIRequest):
+        chunks = _aiter(chunks)
+    return StreamingHttpResponse(chunks, content_type='application/json', status=status)
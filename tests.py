@@ -1,3 +1,1490 @@
-from django.test import TestCase
+import importlib.util
+import io
+import json
+import os
+import random
+import tempfile
+import socket
+import unittest
+from unittest import mock
+from datetime import timedelta
 
-# Create your tests here.
+import jwt
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from job_analysis import image_variants, outbox, projection, rollups, streaming
+from job_analysis.views.feedback_views import get_all_feedbacks_view
+from job_analysis.models import (
+    OTP, CommentCounter, CustomUser, Feedback, ImageJob, JobDescription, OutboundEmail, PostCounter, Resume,
+    ResumeAnalysis,
+)
+from job_analysis.views.user_views import edit_user_details_view, get_user_details, user_login
+from job_analysis.token_cache import get_token_user_cache, reset_token_user_cache
+from job_analysis.utils import REFRESH_TOKEN, jwt_encode, jwt_required, resolve_token_user, revoke_tokens
+
+
+@jwt_required
+def whoami(request):
+    return JsonResponse({'id': request.user.pk, 'is_admin': request.user.is_admin})
+
+
+class JwtRequiredTests(TestCase):
+    def setUp(self):
+        reset_token_user_cache()
+        self.factory = RequestFactory()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+
+    def get(self, authorization=None):
+        extra = {'HTTP_AUTHORIZATION': authorization} if authorization is not None else {}
+        return whoami(self.factory.get('/', **extra))
+
+    def test_user_is_loaded_with_a_single_query(self):
+        token = jwt_encode(self.user)
+        with self.assertNumQueries(1):
+            response = self.get(f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {'id': self.user.pk, 'is_admin': False})
+
+    def test_missing_header_is_rejected(self):
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_malformed_header_is_rejected(self):
+        for header in ('Bearer', 'Bearer a b', '   '):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(header).status_code, 401)
+
+    def test_invalid_token_is_rejected(self):
+        self.assertEqual(self.get('Bearer not-a-jwt').status_code, 401)
+
+    def test_token_for_deleted_user_is_rejected(self):
+        token = jwt_encode(self.user)
+        self.user.delete()
+        self.assertEqual(self.get(f'Bearer {token}').status_code, 401)
+
+
+class TokenUserCacheTests(TestCase):
+    def setUp(self):
+        reset_token_user_cache()
+        self.factory = RequestFactory()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        self.token = jwt_encode(self.user)
+
+    def get(self, token):
+        return whoami(self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.get(self.token)
+        with self.assertNumQueries(0):
+            response = self.get(self.token)
+        self.assertEqual(response.status_code, 200)
+        stats = get_token_user_cache().stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_saving_the_user_invalidates_its_entries(self):
+        self.get(self.token)
+        self.user.is_admin = True
+        self.user.save()
+        response = self.get(self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {'id': self.user.pk, 'is_admin': True})
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_entries_hold_no_profile_and_are_never_saved_back(self):
+        self.get(self.token)
+        cached = get_token_user_cache().get(f'uid:{self.user.pk}')
+        self.assertTrue({'password', 'email', 'first_name'} <= cached.get_deferred_fields())
+
+        # Another worker changes the password without invalidating this process's entry.
+        CustomUser.objects.filter(pk=self.user.pk).update(password=make_password('changed'),
+                                                          profile_picture='profile_pictures/jane.png')
+        request = self.factory.post('/', {'first_name': 'Janet'}, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(edit_user_details_view(request).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Janet')
+        self.assertTrue(self.user.check_password('changed'))
+
+    def test_revoking_tokens_invalidates_cached_entries(self):
+        self.get(self.token)
+        revoke_tokens(self.user)
+        self.assertEqual(self.get(self.token).status_code, 401)
+        self.assertEqual(self.get(jwt_encode(self.user)).status_code, 200)
+
+    def test_deleting_the_user_invalidates_its_entries(self):
+        self.get(self.token)
+        self.user.delete()
+        self.assertEqual(self.get(self.token).status_code, 401)
+
+    @override_settings(JWT_USER_CACHE={'ENABLED': False})
+    def test_disabled_cache_queries_every_time(self):
+        self.get(self.token)
+        with self.assertNumQueries(1):
+            self.get(self.token)
+
+
+class TokenClaimsTests(TestCase):
+    def setUp(self):
+        reset_token_user_cache()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+
+    def test_access_token_resolves_to_its_user(self):
+        self.assertEqual(resolve_token_user(jwt_encode(self.user)), self.user)
+
+    def test_expired_token_is_rejected(self):
+        with override_settings(JWT_ACCESS_TOKEN_LIFETIME=timedelta(seconds=-1)):
+            token = jwt_encode(self.user)
+        self.assertIsNone(resolve_token_user(token))
+
+    def test_token_types_are_not_interchangeable(self):
+        access, refresh = jwt_encode(self.user), jwt_encode(self.user, REFRESH_TOKEN)
+        self.assertIsNone(resolve_token_user(refresh))
+        self.assertIsNone(resolve_token_user(access, REFRESH_TOKEN))
+        self.assertEqual(resolve_token_user(refresh, REFRESH_TOKEN), self.user)
+
+    def test_revoke_tokens_rejects_earlier_tokens(self):
+        access, refresh = jwt_encode(self.user), jwt_encode(self.user, REFRESH_TOKEN)
+        revoke_tokens(self.user)
+        self.assertIsNone(resolve_token_user(access))
+        self.assertIsNone(resolve_token_user(refresh, REFRESH_TOKEN))
+        self.assertEqual(resolve_token_user(jwt_encode(self.user)), self.user)
+
+    def test_legacy_email_tokens_follow_the_setting(self):
+        token = jwt.encode({'email': self.user.email}, settings.SECRET_KEY, algorithm='HS256')
+        with override_settings(JWT_ACCEPT_LEGACY_TOKENS=True):
+            self.assertEqual(resolve_token_user(token), self.user)
+            self.assertIsNone(resolve_token_user(token, REFRESH_TOKEN))
+        reset_token_user_cache()
+        with override_settings(JWT_ACCEPT_LEGACY_TOKENS=False):
+            self.assertIsNone(resolve_token_user(token))
+
+    @override_settings(JWT_ACCEPT_LEGACY_TOKENS=True)
+    def test_revoke_tokens_rejects_legacy_email_tokens(self):
+        token = jwt.encode({'email': self.user.email}, settings.SECRET_KEY, algorithm='HS256')
+        self.assertEqual(resolve_token_user(token), self.user)
+        revoke_tokens(self.user)
+        self.assertIsNone(resolve_token_user(token))
+        reset_token_user_cache()
+        self.assertIsNone(resolve_token_user(token))
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('smtp unavailable')
+
+
+class OutboxTests(TestCase):
+    def queue(self, count=1):
+        for i in range(count):
+            outbox.queue_email(f'Subject {i}', 'Body', [f'user{i}@example.com'], html_message='<p>Body</p>')
+
+    def test_queue_email_only_writes_a_row(self):
+        self.queue()
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.to, email.from_email),
+                         (OutboundEmail.STATUS_PENDING, ['user0@example.com'], settings.EMAIL_HOST_USER))
+
+    def test_contact_submission_survives_a_template_error(self):
+        from django.template import TemplateDoesNotExist
+        from job_analysis.models import ContactUs
+        from job_analysis.views.contact_views import contact_us
+
+        data = {'name': 'Jane', 'email': 'jane@example.com', 'subject': 'Hello', 'message': 'A question.'}
+        error = TemplateDoesNotExist('email_templates/contact_us.html')
+        with mock.patch('job_analysis.views.contact_views.render_to_string', side_effect=error), \
+                self.assertLogs('job_analysis.views.contact_views', 'ERROR'):
+            response = contact_us(RequestFactory().post('/', data))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(ContactUs.objects.values_list('email', 'message')), [('jane@example.com', 'A question.')])
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        with mock.patch('job_analysis.views.contact_views.render_to_string', return_value='<p>Thanks</p>'):
+            self.assertEqual(contact_us(RequestFactory().post('/', data)).status_code, 200)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_drain_sends_due_messages_in_batches(self):
+        self.queue(5)
+        totals = outbox.drain(batch_size=2)
+        self.assertEqual((totals['sent'], totals['batches']), (5, 3))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    @override_settings(EMAIL_BACKEND='job_analysis.tests.FailingEmailBackend',
+                       EMAIL_OUTBOX={'MAX_ATTEMPTS': 2, 'BACKOFF': 60})
+    def test_failures_back_off_then_dead_letter(self):
+        self.queue()
+        self.assertEqual(outbox.drain()['retried'], 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_PENDING, 1))
+        self.assertIn('smtp unavailable', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # Not due yet, so a second pass leaves it alone.
+        self.assertEqual(outbox.drain()['batches'], 0)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.drain()['dead'], 1)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.STATUS_DEAD)
+        self.assertEqual(outbox.outbox_stats()['dead'], 1)
+
+    def test_claimed_rows_are_leased(self):
+        self.queue(3)
+        self.assertEqual(len(outbox.claim_batch(10, lease=300)), 3)
+        self.assertEqual(outbox.claim_batch(10, lease=300), [])
+
+
+@unittest.skipUnless(importlib.util.find_spec('aiosmtpd'), 'aiosmtpd is not installed (see requirements-dev.txt)')
+class OutboxSmtpTests(TestCase):
+    def setUp(self):
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+
+        class Recorder(Sink):
+            def __init__(self):
+                self.envelopes = []
+                self.sessions = set()
+
+            async def handle_DATA(self, server, session, envelope):
+                self.envelopes.append(envelope)
+                self.sessions.add(id(session))
+                return '250 OK'
+
+        port = self.free_port()
+        self.handler = Recorder()
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=port)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+        self.settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def test_batch_is_delivered_over_one_connection(self):
+        for i in range(4):
+            outbox.queue_email(f'Subject {i}', 'Body', [f'user{i}@example.com'], from_email='noreply@example.com')
+        totals = outbox.drain(batch_size=10)
+        self.assertEqual(totals['sent'], 4)
+        self.assertEqual(sorted(e.rcpt_tos[0] for e in self.handler.envelopes),
+                         [f'user{i}@example.com' for i in range(4)])
+        self.assertEqual(len(self.handler.sessions), 1)
+
+    def test_unreachable_server_leaves_rows_pending(self):
+        outbox.queue_email('Subject', 'Body', ['user@example.com'], from_email='noreply@example.com')
+        with override_settings(EMAIL_PORT=self.free_port()), self.assertRaises(OSError):
+            outbox.drain()
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.STATUS_PENDING)
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db',
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class MinHashTests(TestCase):
+    POSTING = ('We are hiring a senior backend engineer to design, build and operate the services behind our '
+               'payments platform. You will work with Python, Django and PostgreSQL, review code, mentor '
+               'engineers and own the reliability of the systems your team ships. Salary {salary} per year, '
+               'posted {date}.')
+    OTHER = ('Our clinic is looking for a registered nurse to care for patients on the night shift, keep '
+             'accurate records and support the doctors on call with triage and medication rounds.')
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+
+    def post(self, description):
+        return JobDescription.objects.create(user=self.user, title='Posting', description=description)
+
+    def test_signature_ignores_numbers_and_estimates_similarity(self):
+        from job_analysis import minhash
+
+        first = minhash.signature(self.POSTING.format(salary='100,000', date='2024-01-01'))
+        repost = minhash.signature(self.POSTING.format(salary='120,000', date='2024-03-15'))
+        other = minhash.signature(self.OTHER)
+        self.assertEqual(minhash.similarity(first, repost), 1.0)
+        self.assertLess(minhash.similarity(first, other), 0.1)
+        self.assertEqual(minhash.similarity(first, minhash.from_bytes(minhash.to_bytes(first))), 1.0)
+
+    def test_edits_recompute_the_signature_and_bands(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from job_analysis import minhash
+        from job_analysis.models import JobDescriptionBand
+
+        original = self.post(self.POSTING.format(salary='100,000', date='2024-01-01'))
+        repost = self.post(self.POSTING.format(salary='120,000', date='2024-03-15'))
+        self.assertEqual([(match.pk, score) for match, score in minhash.find_similar(original)], [(repost.pk, 1.0)])
+
+        repost.description = self.OTHER
+        repost.save(update_fields=['description'])
+        repost.refresh_from_db()
+        self.assertEqual(bytes(repost.minhash), minhash.to_bytes(minhash.signature(self.OTHER)))
+        self.assertEqual(minhash.find_similar(original), [])
+        self.assertEqual(JobDescriptionBand.objects.filter(job_description=repost).count(), minhash.BANDS)
+
+        with CaptureQueriesContext(connection) as queries:
+            repost.save(update_fields=['title'])
+        self.assertFalse([query for query in queries if 'jobdescriptionband' in query['sql']])
+
+    def test_cluster_command_backfills_and_groups_near_duplicates(self):
+        from job_analysis.models import JobDescriptionBand
+
+        postings = [self.post(self.POSTING.format(salary=salary, date='2024-01-01')) for salary in (1, 2, 3)]
+        self.post(self.OTHER)
+        JobDescription.objects.filter(pk=postings[0].pk).update(minhash=None)
+        JobDescriptionBand.objects.filter(job_description=postings[0]).delete()
+
+        out = io.StringIO()
+        call_command('cluster_job_postings', stdout=out)
+        self.assertIn('1 signatures backfilled', out.getvalue())
+        self.assertIn('4 postings, 1 near-duplicate clusters, 2 redundant postings', out.getvalue())
+        self.assertIn(str([posting.pk for posting in postings]), out.getvalue())
+
+
+# The tests count django_session rows, which only the database engine writes.
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class StatelessLoginTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='jane', email='jane@example.com', password='secret')
+
+    def login(self, **extra):
+        request = RequestFactory().post('/', {'email': 'jane@example.com', 'password': 'secret', **extra},
+                                        content_type='application/json')
+        middleware = SessionMiddleware(lambda request: None)
+        middleware.process_request(request)
+        response = user_login(request)
+        middleware.process_response(request, response)
+        return response
+
+    def test_login_writes_no_session_row(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Session.objects.exists())
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_session_login_on_request(self):
+        self.assertEqual(self.login(session=True).status_code, 200)
+        self.assertEqual(Session.objects.count(), 1)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_session_login_writes_no_session_row(self):
+        response = self.login(session=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_cleanup_removes_expired_sessions_and_stale_otps(self):
+        self.login(session=True)
+        Session.objects.update(expire_date=timezone.now() - timedelta(days=1))
+        OTP.objects.create(user=self.user, code='1234')
+        OTP.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        fresh = OTP.objects.create(user=self.user, code='5678')
+
+        call_command('cleanup_sessions', batch_size=1, stdout=io.StringIO())
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(list(OTP.objects.all()), [fresh])
+
+
+@unittest.skipUnless(apps.is_installed('community'), 'community app is not installed')
+class CommunityTokenAuthTests(TestCase):
+    def test_views_accept_a_token_without_a_session(self):
+        from community.report_views import list_all_reports_view
+        from community.savedpost_views import list_all_saved_posts
+
+        user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        for view in (list_all_saved_posts, list_all_reports_view):
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {jwt_encode(user)}')
+            request.user = AnonymousUser()
+            self.assertEqual(view(request).status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportUsersTests(TestCase):
+    def write(self, name, content):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, name)
+        with open(path, 'w') as fh:
+            fh.write(content)
+        return path
+
+    def test_csv_import_skips_existing_and_invalid_rows(self):
+        CustomUser.objects.create(email='taken@example.com', username='taken')
+        path = self.write('users.csv', 'email,password,first_name\n'
+                                       'ann@example.com,secret,Ann\n'
+                                       'taken@example.com,secret,Taken\n'
+                                       'not-an-email,secret,Bad\n'
+                                       'ann@example.com,other,Duplicate\n')
+        call_command('import_users', path, workers=2, stdout=io.StringIO())
+
+        ann = CustomUser.objects.get(email='ann@example.com')
+        self.assertTrue(ann.check_password('secret'))
+        self.assertEqual((ann.first_name, ann.username), ('Ann', 'ann'))
+        self.assertEqual(CustomUser.objects.count(), 2)
+        self.assertEqual(list(OutboundEmail.objects.values_list('to', flat=True)), [['ann@example.com']])
+
+    def test_jsonl_import_resumes_from_checkpoint(self):
+        path = self.write('users.jsonl', '\n'.join(
+            json.dumps({'email': f'user{i}@example.com', 'password': 'secret'}) for i in range(5)
+        ))
+        checkpoint = self.write('checkpoint.json', json.dumps({'rows': 3}))
+        call_command('import_users', path, batch_size=1, workers=1, checkpoint=checkpoint,
+                     no_welcome_email=True, stdout=io.StringIO())
+
+        self.assertEqual(sorted(CustomUser.objects.values_list('email', flat=True)),
+                         ['user3@example.com', 'user4@example.com'])
+        self.assertFalse(OutboundEmail.objects.exists())
+        with open(checkpoint) as fh:
+            self.assertEqual(json.load(fh), {'rows': 5})
+
+    def test_racing_registration_is_neither_counted_nor_welcomed(self):
+        from job_analysis.user_import import hash_password, import_users
+
+        def register_while_hashing(password):
+            CustomUser.objects.get_or_create(email='bob@example.com', defaults={'username': 'bob', 'first_name': 'Bob'})
+            return hash_password(password)
+
+        with mock.patch('job_analysis.user_import.hash_password', register_while_hashing):
+            totals = import_users([{'email': 'ann@example.com'}, {'email': 'bob@example.com', 'first_name': 'Import'}])
+
+        self.assertEqual((totals['created'], totals['skipped']), (1, 1))
+        self.assertEqual(CustomUser.objects.get(email='bob@example.com').first_name, 'Bob')
+        self.assertEqual(list(OutboundEmail.objects.values_list('to', flat=True)), [['ann@example.com']])
+
+    def test_admin_upload_page_imports_a_file(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.urls import reverse
+        from job_analysis.user_import import WELCOME_SUBJECT
+
+        admin = CustomUser.objects.create_superuser(email='admin@example.com', username='admin', password='secret')
+        self.client.force_login(admin)
+        url = reverse('admin:job_analysis_customuser_import')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        upload = SimpleUploadedFile('users.csv', b'email,first_name\nann@example.com,Ann\nadmin@example.com,Taken\n')
+        response = self.client.post(url, {'file': upload, 'send_welcome_email': 'on'})
+        self.assertRedirects(response, reverse('admin:job_analysis_customuser_changelist'), fetch_redirect_response=False)
+        self.assertEqual(CustomUser.objects.get(email='ann@example.com').first_name, 'Ann')
+        self.assertEqual(list(OutboundEmail.objects.values_list('subject', 'to')), [(WELCOME_SUBJECT, ['ann@example.com'])])
+
+        upload = SimpleUploadedFile('more.csv', b'email\nbob@example.com\n')
+        self.client.post(url, {'file': upload})
+        self.assertTrue(CustomUser.objects.filter(email='bob@example.com').exists())
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+
+@unittest.skipUnless(apps.is_installed('community'), 'community app is not installed')
+class CommunityFeedQueryTests(TestCase):
+    def setUp(self):
+        reset_token_user_cache()
+        cache.clear()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane', first_name='Jane')
+        self.token = jwt_encode(self.user)
+
+    def seed(self, posts):
+        from community.models import Comment, Like, Post, Reply
+
+        for i in range(posts):
+            author = CustomUser.objects.create(email=f'author{Post.objects.count()}@example.com', username='author')
+            post = Post.objects.create(user=author, title=f'Post {i}', content='Body')
+            for _ in range(3):
+                comment = Comment.objects.create(user=author, post=post, content='Comment')
+                Reply.objects.create(user=self.user, comment=comment, content='Reply')
+                Reply.objects.create(user=author, comment=comment, content='Reply')
+            Like.objects.create(user=author, post=post)
+            if i % 2:
+                Like.objects.create(user=self.user, post=post)
+
+    def feed(self):
+        from community.post_views import list_all_posts
+
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return list_all_posts(request)
+
+    def test_query_count_does_not_grow_with_posts(self):
+        for posts in (2, 10):
+            with self.subTest(posts=posts):
+                self.seed(posts // 2)
+                reset_token_user_cache()
+                cache.clear()
+                # User lookup, page of post ids with the viewer's likes, then posts and comment previews.
+                with self.assertNumQueries(4):
+                    response = self.feed()
+                self.assertEqual(response.status_code, 200)
+                # Warm fragments: only the page query remains.
+                with self.assertNumQueries(1):
+                    self.assertEqual(self.feed().content, response.content)
+
+    @override_settings(POST_FRAGMENT_CACHE={'ENABLED': False})
+    def test_feed_without_fragment_cache(self):
+        self.seed(3)
+        reset_token_user_cache()
+        with self.assertNumQueries(4):
+            self.assertEqual(len(json.loads(self.feed().content)['posts']), 3)
+
+    def test_writes_invalidate_cached_fragments(self):
+        from community.models import Comment, Like, Post
+
+        self.seed(1)
+        post = Post.objects.get()
+        self.assertEqual(json.loads(self.feed().content)['posts'][0]['like_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, post=post)
+        posts = json.loads(self.feed().content)['posts']
+        self.assertEqual((posts[0]['like_count'], posts[0]['user_liked']), (2, True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.filter(post=post).first().delete()
+        self.assertEqual(len(json.loads(self.feed().content)['posts'][0]['comments']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Edited'
+            post.save()
+        self.assertEqual(json.loads(self.feed().content)['posts'][0]['title'], 'Edited')
+
+    def test_user_liked_is_per_viewer(self):
+        self.seed(2)
+        self.feed()
+        other = CustomUser.objects.create(email='other@example.com', username='other')
+        self.token = jwt_encode(other)
+        self.assertEqual([post['user_liked'] for post in json.loads(self.feed().content)['posts']], [False, False])
+
+    def test_feed_payload(self):
+        self.seed(2)
+        posts = json.loads(self.feed().content)['posts']
+        self.assertEqual([post['like_count'] for post in posts], [2, 1])
+        self.assertEqual([post['user_liked'] for post in posts], [True, False])
+        self.assertEqual(len(posts[0]['comments']), 3)
+        self.assertEqual(posts[0]['comments'][0]['reply_count'], 2)
+        self.assertNotIn('replies', posts[0]['comments'][0])
+        self.assertNotIn('email', posts[0]['comments'][0]['user'])
+
+    def test_feed_uses_image_variants_once_ready(self):
+        from community.models import Post
+
+        author = CustomUser.objects.create(email='author@example.com', username='author')
+        post = Post.objects.create(user=author, title='Photo', content='Body', image='posts/photo.jpg')
+        self.assertEqual(json.loads(self.feed().content)['posts'][0]['image'], '/media/posts/photo.jpg')
+
+        variants = {size: {'webp': f'posts/photo.{size}.webp', 'jpeg': f'posts/photo.{size}.jpg', 'width': 1, 'height': 1}
+                    for size in ('thumbnail', 'feed', 'full')}
+        job = image_variants.queue_image(post.image, ImageJob.KIND_POST_IMAGE, post.id)
+        # The worker's outcome, without decoding a real file; finishing a job invalidates the post.
+        with mock.patch.object(image_variants, 'render_variants', return_value=variants):
+            with self.captureOnCommitCallbacks(execute=True):
+                image_variants.process_batch([job])
+        posts = json.loads(self.feed().content)['posts']
+        self.assertEqual(posts[0]['image'], '/media/posts/photo.feed.jpg')
+        self.assertEqual(posts[0]['image_variants']['thumbnail']['webp'], '/media/posts/photo.thumbnail.webp')
+
+    @override_settings(FEED_COMMENT_PREVIEW=2)
+    def test_feed_embeds_latest_comments_only(self):
+        from community.models import Comment, Post
+
+        self.seed(2)
+        for post in Post.objects.all():
+            Comment.objects.create(user=self.user, post=post, content='Latest')
+        cache.clear()
+        for post in json.loads(self.feed().content)['posts']:
+            self.assertEqual(post['comment_count'], 4)
+            self.assertEqual([comment['content'] for comment in post['comments']], ['Latest', 'Comment'])
+            self.assertEqual(post['comments'][0]['user']['first_name'], 'Jane')
+
+    @override_settings(PAGINATION={'PAGE_SIZE': 2, 'MAX_PAGE_SIZE': 2})
+    def test_comment_and_reply_endpoints_paginate(self):
+        from community.models import Comment, Post
+        from community.comment_views import list_comments_for_post_view
+        from community.reply_views import list_replies_for_comment
+
+        self.seed(1)
+        post = Post.objects.get()
+        factory = RequestFactory()
+
+        body = json.loads(list_comments_for_post_view(factory.get('/'), post.id).content)
+        self.assertEqual(len(body['comments']), 2)
+        self.assertEqual(body['comments'][0]['reply_count'], 2)
+        cursor = body['pagination']['next_cursor']
+        body = json.loads(list_comments_for_post_view(factory.get('/', {'cursor': cursor}), post.id).content)
+        self.assertEqual((len(body['comments']), body['pagination']['next_cursor']), (1, None))
+
+        comment = Comment.objects.filter(post=post).first()
+        body = json.loads(list_replies_for_comment(factory.get('/'), comment.id).content)
+        self.assertEqual(sorted(reply['user']['first_name'] for reply in body['replies']), ['', 'Jane'])
+        self.assertEqual(list_replies_for_comment(factory.get('/'), 0).status_code, 404)
+
+    @override_settings(PAGINATION={'PAGE_SIZE': 2, 'MAX_PAGE_SIZE': 2})
+    def test_saved_post_lists_paginate_with_cursor_headers(self):
+        from community.models import Post, SavedPost
+        from community.savedpost_views import list_all_saved_posts, list_saved_posts_by_user
+
+        self.seed(3)
+        SavedPost.objects.bulk_create([SavedPost(user=self.user, post=post) for post in Post.objects.all()])
+        expected = list(SavedPost.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        def walk(view, *args):
+            seen, cursor = [], None
+            while True:
+                request = RequestFactory().get('/', {'cursor': cursor} if cursor else {},
+                                               HTTP_AUTHORIZATION=f'Bearer {self.token}')
+                response = view(request, *args)
+                seen += [saved_post['id'] for saved_post in json.loads(response.content)]
+                cursor = response.headers.get('X-Next-Cursor')
+                if not cursor:
+                    return seen
+
+        self.assertEqual(walk(list_all_saved_posts), expected)
+        self.assertEqual(walk(list_saved_posts_by_user, self.user.email), expected)
+        request = RequestFactory().get('/', {'cursor': 'garbage'}, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(list_all_saved_posts(request).status_code, 400)
+
+
+@override_settings(PAGINATION={'PAGE_SIZE': 3, 'MAX_PAGE_SIZE': 4})
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        Feedback.objects.bulk_create([Feedback(user=user, comment=f'Feedback {i}', rating=5) for i in range(8)])
+        # Two rows share a timestamp so the id tie-break is exercised.
+        now = timezone.now()
+        for offset, feedback in enumerate(Feedback.objects.order_by('id')):
+            Feedback.objects.filter(pk=feedback.pk).update(created_at=now + timedelta(seconds=min(offset, 6)))
+        self.expected = list(Feedback.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def page(self, **params):
+        body = json.loads(get_all_feedbacks_view(RequestFactory().get('/', params)).content)
+        return [feedback['id'] for feedback in body['feedbacks']], body['pagination']
+
+    def test_walks_forward_and_back_without_gaps(self):
+        seen, pages, cursor = [], [], None
+        while True:
+            ids, info = self.page(**({'cursor': cursor} if cursor else {}))
+            seen += ids
+            pages.append((ids, info))
+            cursor = info['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(ids) for ids, _ in pages], [3, 3, 2])
+        self.assertIsNone(pages[0][1]['previous_cursor'])
+
+        ids, info = self.page(cursor=pages[2][1]['previous_cursor'])
+        self.assertEqual(ids, pages[1][0])
+        ids, info = self.page(cursor=info['previous_cursor'])
+        self.assertEqual(ids, pages[0][0])
+        self.assertIsNone(info['previous_cursor'])
+
+    def test_page_size_is_clamped(self):
+        ids, info = self.page(page_size=50)
+        self.assertEqual((len(ids), info['page_size']), (4, 4))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = get_all_feedbacks_view(RequestFactory().get('/', {'cursor': 'garbage'}))
+        self.assertEqual(response.status_code, 400)
+
+
+@unittest.skipUnless(apps.is_installed('community'), 'community app is not installed')
+class CommunityCounterTests(TestCase):
+    def setUp(self):
+        from community.models import Post
+
+        reset_token_user_cache()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        self.post = Post.objects.create(user=self.user, title='Post', content='Body')
+
+    def counts(self):
+        counter = PostCounter.objects.get(post=self.post)
+        return counter.like_count, counter.comment_count
+
+    def test_like_toggle_updates_the_counter(self):
+        from community.like_views import toggle_like_view
+
+        request = RequestFactory().post('/', HTTP_AUTHORIZATION=f'Bearer {jwt_encode(self.user)}')
+        toggle_like_view(request, self.post.id)
+        self.assertEqual(self.counts(), (1, 0))
+        toggle_like_view(request, self.post.id)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_comment_and_reply_counts_follow_cascades(self):
+        from community.models import Comment, Reply
+
+        comment = Comment.objects.create(user=self.user, post=self.post, content='Comment')
+        Comment.objects.create(user=self.user, post=self.post, content='Comment')
+        Reply.objects.create(user=self.user, comment=comment, content='Reply')
+        Reply.objects.create(user=self.user, comment=comment, content='Reply')
+        self.assertEqual(self.counts(), (0, 2))
+        self.assertEqual(CommentCounter.objects.get(comment=comment).reply_count, 2)
+
+        comment.delete()
+        self.assertEqual(self.counts(), (0, 1))
+        self.assertFalse(CommentCounter.objects.filter(comment_id=comment.id).exists())
+
+        self.post.delete()
+        self.assertFalse(PostCounter.objects.exists())
+
+    def test_deleting_a_thread_costs_the_same_at_any_size(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from community.models import Comment, Like, Post, Reply
+
+        def delete_thread(size):
+            post = Post.objects.create(user=self.user, title='Thread', content='Body')
+            for _ in range(size):
+                Like.objects.create(user=self.user, post=post)
+                comment = Comment.objects.create(user=self.user, post=post, content='Comment')
+                for _ in range(size):
+                    Reply.objects.create(user=self.user, comment=comment, content='Reply')
+            with CaptureQueriesContext(connection) as queries:
+                post.delete()
+            return len(queries)
+
+        self.assertEqual(delete_thread(1), delete_thread(5))
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_reconcile_repairs_drifted_and_missing_counters(self):
+        from community.models import Comment, Like
+
+        comment = Comment.objects.create(user=self.user, post=self.post, content='Comment')
+        Like.objects.create(user=self.user, post=self.post)
+        PostCounter.objects.update(like_count=7)
+        CommentCounter.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('reconcile_counters', batch_size=1, stdout=out)
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(CommentCounter.objects.get(comment=comment).reply_count, 0)
+        self.assertIn('posts: 1 checked, 1 counters repaired', out.getvalue())
+
+    def test_missing_counter_is_rebuilt_on_first_increment(self):
+        from community.models import Like
+
+        PostCounter.objects.all().delete()
+        Like.objects.create(user=self.user, post=self.post)
+        self.assertEqual(self.counts(), (1, 0))
+
+
+class StreamingJsonTests(TestCase):
+    def test_rows_are_flushed_in_buffers(self):
+        rows = [{'id': i, 'text': 'x' * 50} for i in range(3000)]
+        chunks = list(streaming.iter_json({'success': True}, 'rows', iter(rows), dict))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < streaming.BUFFER_SIZE + 100 for chunk in chunks))
+        self.assertEqual(json.loads(b''.join(chunks)), {'success': True, 'rows': rows})
+        self.assertEqual(json.loads(b''.join(streaming.iter_json({}, 'rows', iter([]), dict))), {'rows': []})
+
+    def test_asgi_requests_get_an_async_iterator(self):
+        response = streaming.streaming_json_response(AsyncRequestFactory().get('/'), {}, 'rows', iter([1, 2]), str)
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(async_to_sync(consume)()), {'rows': ['1', '2']})
+        self.assertFalse(streaming.streaming_json_response(RequestFactory().get('/'), {}, 'rows', [], str).is_async)
+
+    def test_analysis_export_streams_every_analysis(self):
+        from job_analysis.admin_views import export_dashboard_analyses
+
+        admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True, city='Pune', country='IN')
+        job = JobDescription.objects.create(user=admin, title='Engineer', company_name='Acme', description='-')
+        resume = Resume.objects.create(user=admin)
+        for score in (10.0, 20.0, 30.0):
+            ResumeAnalysis.objects.create(user=admin, job_description=job, resume=resume, match_percentage=score)
+
+        request = RequestFactory().get('/')
+        request.user = admin
+        response = export_dashboard_analyses(request)
+        self.assertTrue(response.streaming)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(sorted(row['match_percentage'] for row in body['analyses']), [10.0, 20.0, 30.0])
+        self.assertEqual(body['analyses'][0]['user_details']['location'], 'Pune, IN')
+
+
+class ProjectionTests(TestCase):
+    def test_formatters_match_the_formats_they_replace(self):
+        encoder = DjangoJSONEncoder()
+        for value in (timezone.now(), timezone.now().replace(microsecond=0), timezone.now().replace(tzinfo=None)):
+            self.assertEqual(projection.iso_datetime(value), encoder.default(value))
+            self.assertEqual(projection.utc_timestamp(value), value.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        self.assertIsNone(projection.iso_datetime(None))
+
+    def test_values_and_instances_render_the_same_shape(self):
+        user = CustomUser.objects.create(email='jane@example.com', username='jane', first_name='Jane')
+        Feedback.objects.create(user=user, comment='Great', rating=5)
+        spec = projection.Projection({
+            'id': 'id',
+            'user': {'email': 'user__email', 'first_name': 'user__first_name'},
+            'created_at': projection.Field('created_at', projection.iso_datetime),
+        })
+        self.assertEqual(spec.paths, ('pk', 'id', 'user__email', 'user__first_name', 'created_at'))
+        with self.assertNumQueries(1):
+            rows = spec.serialize(Feedback.objects.all())
+        feedback = Feedback.objects.select_related('user').get()
+        self.assertEqual(rows, [spec.from_instance(feedback)])
+        self.assertEqual(rows[0]['user'], {'email': 'jane@example.com', 'first_name': 'Jane'})
+
+    def test_user_details_without_secrets_in_one_query(self):
+        user = CustomUser.objects.create(email='jane@example.com', username='jane', password='hash')
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {jwt_encode(user)}')
+        get_user_details(request)
+        # The cached token user only carries auth fields; the profile is one query.
+        with self.assertNumQueries(1):
+            details = json.loads(get_user_details(request).content)['user']
+        self.assertEqual(details['email'], 'jane@example.com')
+        self.assertIsNone(details['profile_picture'])
+        self.assertFalse({'password', 'token_version', 'groups', 'user_permissions'} & set(details))
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def store(self, name, data):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        return default_storage.save(name, ContentFile(data))
+
+    def test_variants_are_bounded_rotated_and_stripped(self):
+        from django.core.files.storage import default_storage
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise.
+        exif[0x010f] = 'Phone'
+        buffer = io.BytesIO()
+        Image.new('RGB', (3000, 2000), 'red').save(buffer, 'JPEG', exif=exif.tobytes())
+        source = self.store('posts/photo.jpg', buffer.getvalue())
+
+        job = image_variants.queue_image(source, ImageJob.KIND_POST_IMAGE, 1)
+        self.assertEqual(image_variants.variant_urls(image_variants.variants_for([source]).get(source)), None)
+        self.assertEqual(image_variants.drain()['done'], 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.STATUS_DONE)
+        self.assertEqual((job.variants['full']['width'], job.variants['full']['height']), (1365, 2048))
+        self.assertEqual(job.variants['thumbnail']['jpeg'], 'posts/photo.thumbnail.jpg')
+        for entry in job.variants.values():
+            for key in ('webp', 'jpeg'):
+                with default_storage.open(entry[key]) as fh:
+                    variant = Image.open(fh)
+                    self.assertLessEqual(max(variant.size), 2048)
+                    self.assertFalse({'exif', 'icc_profile'} & set(variant.info))
+        urls = image_variants.variant_urls(image_variants.variants_for([source])[source])
+        self.assertEqual(urls['feed']['webp'], '/media/posts/photo.feed.webp')
+
+    @override_settings(IMAGE_VARIANTS={'MAX_ATTEMPTS': 2})
+    def test_unreadable_upload_is_retried_then_dead_lettered(self):
+        source = self.store('profile_pictures/broken.png', b'not an image')
+        job = image_variants.queue_image(source, ImageJob.KIND_PROFILE_PICTURE, 1)
+
+        self.assertEqual(image_variants.drain()['retried'], 1)
+        ImageJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(image_variants.drain()['dead'], 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ImageJob.STATUS_DEAD, 2))
+        self.assertIn('UnidentifiedImageError', job.last_error)
+        self.assertEqual(image_variants.display_url(source, None), '/media/profile_pictures/broken.png')
+
+
+class MediaDeliveryTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        for name, data in (('posts/photo.jpg', b'0123456789'), ('posts/photo.3f2a9c41d0.jpg', b'hashed'),
+                           ('resumes/cv.pdf', b'%PDF resume')):
+            os.makedirs(os.path.join(media_root.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media_root.name, name), 'wb') as fh:
+                fh.write(data)
+
+    def get(self, path, user=None, **headers):
+        from job_analysis.media_views import protected_media
+
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {jwt_encode(user)}'
+        return protected_media(RequestFactory().get('/', **headers), path)
+
+    def test_public_file_with_validators(self):
+        response = self.get('posts/photo.jpg')
+        self.assertEqual((response.status_code, b''.join(response.streaming_content)), (200, b'0123456789'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        etag = response['ETag']
+        self.assertEqual(self.get('posts/photo.jpg', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get('posts/photo.jpg', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+        self.assertIn('immutable', self.get('posts/photo.3f2a9c41d0.jpg')['Cache-Control'])
+
+    def test_range_requests(self):
+        response = self.get('posts/photo.jpg', HTTP_RANGE='bytes=2-5')
+        self.assertEqual((response.status_code, b''.join(response.streaming_content)), (206, b'2345'))
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 2-5/10', '4'))
+        self.assertEqual(b''.join(self.get('posts/photo.jpg', HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        self.assertEqual(self.get('posts/photo.jpg', HTTP_RANGE='bytes=20-').status_code, 416)
+        stale = self.get('posts/photo.jpg', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_resumes_only_reach_their_owner_or_an_admin(self):
+        owner = CustomUser.objects.create(email='owner@example.com', username='owner')
+        Resume.objects.create(user=owner, resume_file='resumes/cv.pdf')
+        other = CustomUser.objects.create(email='other@example.com', username='other')
+        admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True)
+
+        self.assertEqual(self.get('resumes/cv.pdf').status_code, 403)
+        self.assertEqual(self.get('resumes/cv.pdf', other).status_code, 403)
+        self.assertEqual(self.get('posts/../resumes/cv.pdf', other).status_code, 403)
+        response = self.get('resumes/cv.pdf', owner)
+        self.assertEqual((response.status_code, response['Cache-Control']), (200, 'private, no-cache'))
+        self.assertEqual(self.get('resumes/cv.pdf', admin).status_code, 200)
+
+    def test_proxy_hand_off_and_missing_files(self):
+        from django.http import Http404
+
+        with override_settings(MEDIA_DELIVERY={'BACKEND': 'nginx'}):
+            response = self.get('posts/photo.jpg')
+            self.assertEqual((response['X-Accel-Redirect'], response.content), ('/protected-media/posts/photo.jpg', b''))
+        with override_settings(MEDIA_DELIVERY={'BACKEND': 'sendfile'}):
+            self.assertEqual(self.get('posts/photo.jpg')['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, 'posts/photo.jpg'))
+        for path in ('posts/missing.jpg', '../secret.txt', 'posts'):
+            with self.assertRaises(Http404):
+                self.get(path)
+
+
+@unittest.skipUnless(apps.is_installed('community'), 'community app is not installed')
+class CommunitySearchTests(TestCase):
+    def setUp(self):
+        from community.models import Comment, Post
+
+        reset_token_user_cache()
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        self.token = jwt_encode(self.user)
+        self.title_match = Post.objects.create(user=self.user, title='Python interview questions', content='A list.')
+        self.content_match = Post.objects.create(user=self.user, title='Weekend', content='Learning <b>python</b> slowly.')
+        Post.objects.create(user=self.user, title='Unrelated', content='Nothing to see here.')
+        Comment.objects.create(user=self.user, post=self.content_match, content='Pythonic code is nice')
+
+    def search(self, **params):
+        from job_analysis.search_views import search_community_view
+
+        request = RequestFactory().get('/', params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return search_community_view(request)
+
+    def test_ranked_results_with_escaped_snippets(self):
+        body = json.loads(self.search(q='python').content)
+        self.assertEqual([row['id'] for row in body['results']], [self.title_match.id, self.content_match.id])
+        self.assertGreater(body['results'][0]['score'], body['results'][1]['score'])
+        self.assertIn('<mark>python</mark>', body['results'][1]['snippet'])
+        self.assertIn('&lt;b&gt;', body['results'][1]['snippet'])
+
+        comments = json.loads(self.search(q='pyth', type='comments').content)['results']
+        self.assertEqual([row['post_id'] for row in comments], [self.content_match.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.title_match.title = 'Golang interview questions'
+        self.title_match.save()
+        self.content_match.delete()
+        self.assertEqual(json.loads(self.search(q='python').content)['results'], [])
+        self.assertEqual(len(json.loads(self.search(q='golang interview').content)['results']), 1)
+
+    def test_cursor_pagination_and_validation(self):
+        first = json.loads(self.search(q='python', page_size=1).content)
+        second = json.loads(self.search(q='python', page_size=1, cursor=first['pagination']['next_cursor']).content)
+        self.assertEqual([row['id'] for row in first['results'] + second['results']],
+                         [self.title_match.id, self.content_match.id])
+        self.assertIsNone(second['pagination']['next_cursor'])
+
+        self.assertEqual(self.search(q='python', cursor='garbage').status_code, 400)
+        self.assertEqual(self.search(q='"*(').status_code, 400)
+        self.assertEqual(self.search(q='python', type='users').status_code, 400)
+
+
+class AnalysisSearchTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True)
+        self.jane = CustomUser.objects.create(email='jane@example.com', username='jane', first_name='Jane', last_name='Doe')
+        self.john = CustomUser.objects.create(email='john@corp.io', username='john', first_name='John', last_name='Smith')
+        acme = JobDescription.objects.create(user=self.admin, title='Backend Engineer', company_name='Acme', description='-')
+        globex = JobDescription.objects.create(user=self.admin, title='Data Analyst', company_name='Globex', description='-')
+        self.jane_acme = ResumeAnalysis.objects.create(
+            user=self.jane, job_description=acme, resume=Resume.objects.create(user=self.jane), match_percentage=80.0
+        )
+        self.john_globex = ResumeAnalysis.objects.create(
+            user=self.john, job_description=globex, resume=Resume.objects.create(user=self.john), match_percentage=40.0
+        )
+
+    def search(self, **params):
+        from job_analysis.admin_views import search_analyses
+
+        request = RequestFactory().get('/', params)
+        request.user = self.admin
+        return json.loads(search_analyses(request).content)
+
+    def ids(self, **params):
+        return [row['id'] for row in self.search(**params)['results']]
+
+    def test_prefix_match_on_every_document_field(self):
+        self.assertEqual(self.ids(q='jan'), [self.jane_acme.id])
+        self.assertEqual(self.ids(q='corp.io'), [self.john_globex.id])
+        self.assertEqual(self.ids(q='globex analy'), [self.john_globex.id])
+        self.assertEqual(self.ids(q='doe backend'), [self.jane_acme.id])
+        self.assertEqual(self.ids(q='jane globex'), [])
+        row = self.search(q='acme')['results'][0]
+        self.assertEqual((row['user_email'], row['job_title'], row['company']),
+                         ('jane@example.com', 'Backend Engineer', 'Acme'))
+
+    def test_documents_follow_user_and_job_renames(self):
+        self.jane.last_name = 'Roe'
+        self.jane.save()
+        self.john_globex.job_description.company_name = 'Initech'
+        self.john_globex.job_description.save(update_fields=['company_name'])
+        self.assertEqual(self.ids(q='roe'), [self.jane_acme.id])
+        self.assertEqual(self.ids(q='doe'), [])
+        self.assertEqual(self.ids(q='initech'), [self.john_globex.id])
+
+    def test_token_cache_user_document_takes_one_user_query(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        reset_token_user_cache()
+        token = jwt_encode(self.jane)
+        resolve_token_user(token)
+        user = resolve_token_user(token)
+        self.assertIn('email', user.get_deferred_fields())
+        with CaptureQueriesContext(connection) as queries:
+            analysis = ResumeAnalysis.objects.create(user=user, job_description=self.john_globex.job_description,
+                                                     resume=self.jane_acme.resume, match_percentage=50.0)
+        self.assertEqual(len([query for query in queries if 'job_analysis_customuser' in query['sql']]), 1)
+        self.assertEqual(analysis.search_document, 'jane@example.com Jane Doe Data Analyst Globex')
+
+    def test_pages_are_capped(self):
+        with mock.patch('job_analysis.admin_views.SEARCH_RESULT_CAP', 1):
+            first = self.search(q='example', page_size=1)
+            self.assertEqual(len(first['results']), 1)
+        self.assertIsNone(first['pagination']['next_cursor'])
+
+        first = self.search(q='j', page_size=1)
+        second = self.search(q='j', page_size=1, cursor=first['pagination']['next_cursor'])
+        self.assertEqual(sorted(row['id'] for row in first['results'] + second['results']),
+                         sorted([self.jane_acme.id, self.john_globex.id]))
+
+    def test_empty_query_lists_recent_analyses(self):
+        self.assertEqual(self.ids(), [self.john_globex.id, self.jane_acme.id])
+
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in ('scipy', 'sklearn')), 'scipy and scikit-learn are not installed'
+)
+class ResumeRankingIndexTests(TestCase):
+    def resume(self, name, content, skills=''):
+        user = CustomUser.objects.create(email=f'{name}@example.com', username=name)
+        return Resume.objects.create(user=user, content=content, skills=skills)
+
+    def ranked_ids(self, index, **kwargs):
+        results, total = index.rank('python django backend engineer', ['Python', 'Django'], **kwargs)
+        return [result['resume'].pk for result in results], total
+
+    def test_ranks_by_text_and_skill_match(self):
+        from job_analysis.ranking import ResumeRankingIndex
+
+        strong = self.resume('strong', 'python django postgresql backend engineer', 'Python, Django, PostgreSQL')
+        partial = self.resume('partial', 'python scripting and data analysis', 'Python')
+        unrelated = self.resume('unrelated', 'registered nurse on the night shift')
+        index = ResumeRankingIndex()
+
+        self.assertEqual(self.ranked_ids(index), ([strong.pk, partial.pk, unrelated.pk], 3))
+        self.assertEqual(self.ranked_ids(index, offset=1, limit=1), ([partial.pk], 3))
+        results, _ = index.rank('python django backend engineer', ['Python', 'Django'], limit=1, skill_weight=1.0)
+        self.assertEqual(results[0]['skills_match_percentage'], 100.0)
+
+    def test_sync_appends_each_change_once_and_drops_deleted_resumes(self):
+        from job_analysis.ranking import ResumeRankingIndex
+
+        index = ResumeRankingIndex(max_stale_ratio=1.0)
+        first = self.resume('first', 'python developer', 'Python')
+        second = self.resume('second', 'java developer', 'Java')
+        self.ranked_ids(index)
+        rows = len(index._resume_ids)
+        # Both resumes fall inside the sync overlap but have not changed, so nothing is appended again.
+        self.ranked_ids(index)
+        self.assertEqual(len(index._resume_ids), rows)
+
+        second.content, second.skills = 'python django backend engineer', 'Python, Django'
+        second.save()
+        self.assertEqual(self.ranked_ids(index), ([second.pk, first.pk], 2))
+        self.assertEqual(len(index._resume_ids), rows + 1)
+
+        nurse = self.resume('nurse', 'registered nurse on the night shift')
+        self.assertEqual(self.ranked_ids(index, limit=1), ([second.pk], 3))
+        nurse.delete()
+        self.assertEqual(self.ranked_ids(index, limit=1), ([second.pk], 2))
+
+
+class DashboardRollupTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True)
+        self.acme = JobDescription.objects.create(user=self.admin, title='Engineer', company_name='Acme', description='-')
+        self.globex = JobDescription.objects.create(user=self.admin, title='Analyst', company_name='Globex', description='-')
+        self.resume = Resume.objects.create(user=self.admin)
+
+    def analyze(self, job, score):
+        return ResumeAnalysis.objects.create(user=self.admin, job_description=job, resume=self.resume, match_percentage=score)
+
+    def get(self, view, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.admin
+        response = view(request)
+        return response.status_code, json.loads(response.content)
+
+    def summary(self, **params):
+        from job_analysis.admin_views import admin_dashboard
+
+        return self.get(admin_dashboard, **params)[1]
+
+    def test_summary_follows_creates_rescores_and_deletes(self):
+        first = self.analyze(self.acme, 80.0)
+        self.analyze(self.acme, 60.0)
+        self.analyze(self.globex, 40.0)
+        body = self.summary()
+        self.assertEqual((body['total_analyses'], body['average_match']), (3, 60.0))
+        self.assertEqual([(row['company'], row['analyses']) for row in body['top_companies']], [('Acme', 2), ('Globex', 1)])
+        self.assertEqual(body['analyses_per_day'][0]['analyses'], 3)
+
+        first.match_percentage = 20.0
+        first.save()
+        first.refresh_from_db()
+        self.assertEqual(self.summary()['average_match'], 40.0)
+        first.delete()
+        body = self.summary()
+        self.assertEqual((body['total_analyses'], body['average_match']), (2, 50.0))
+        self.assertEqual(body['top_companies'][0], {'company': 'Acme', 'analyses': 1, 'average_match': 60.0})
+
+        self.globex.company_name = 'Acme'
+        self.globex.save()
+        self.assertEqual(self.summary()['top_companies'], [{'company': 'Acme', 'analyses': 2, 'average_match': 50.0}])
+
+    def test_rebuild_matches_incremental_rollups_and_filters_days(self):
+        from job_analysis.models import AnalysisDayStat, CompanyDayStat
+
+        self.analyze(self.acme, 80.0)
+        old = self.analyze(self.globex, 40.0)
+        ResumeAnalysis.objects.filter(pk=old.pk).update(analyzed_at=old.analyzed_at - timedelta(days=3))
+        AnalysisDayStat.objects.all().delete()
+        CompanyDayStat.objects.all().delete()
+        call_command('rebuild_rollups', stdout=io.StringIO())
+
+        body = self.summary()
+        self.assertEqual([row['analyses'] for row in body['analyses_per_day']], [1, 1])
+        today = rollups.day_of(old.analyzed_at)
+        body = self.summary(since=str(today - timedelta(days=1)))
+        self.assertEqual((body['total_analyses'], body['top_companies'][0]['company']), (1, 'Acme'))
+
+        self.analyze(self.acme, 20.0)
+        self.assertEqual(self.summary(since=str(today))['average_match'], 50.0)
+
+    def test_first_analysis_of_a_day_joins_a_row_built_concurrently(self):
+        from django.db import IntegrityError
+        from job_analysis.models import AnalysisDayStat, CompanyDayStat
+
+        day = rollups.day_of(timezone.now())
+
+        def built_elsewhere(day):
+            # Another transaction rolled the day up first, without this analysis.
+            AnalysisDayStat.objects.create(day=day, analysis_count=1, match_total=40.0)
+            CompanyDayStat.objects.create(day=day, company='Globex', analysis_count=1, match_total=40.0)
+            return False
+
+        with mock.patch.object(rollups, '_build_day', side_effect=built_elsewhere):
+            self.analyze(self.acme, 80.0)
+        body = self.summary()
+        self.assertEqual((body['total_analyses'], body['average_match']), (2, 60.0))
+        self.assertEqual([row['company'] for row in body['top_companies']], ['Acme', 'Globex'])
+
+        with mock.patch.object(AnalysisDayStat.objects, 'bulk_create', side_effect=IntegrityError):
+            self.assertFalse(rollups._build_day(day))
+        self.assertEqual(CompanyDayStat.objects.filter(day=day).count(), 2)
+
+    def test_analysis_list_is_paginated_and_filtered(self):
+        from job_analysis.admin_views import dashboard_analyses
+
+        analyses = [self.analyze(self.acme, 80.0), self.analyze(self.globex, 40.0), self.analyze(self.acme, 30.0)]
+        status, first = self.get(dashboard_analyses, page_size=2)
+        status, second = self.get(dashboard_analyses, page_size=2, cursor=first['pagination']['next_cursor'])
+        self.assertEqual([row['id'] for row in first['analyses'] + second['analyses']],
+                         [analysis.id for analysis in reversed(analyses)])
+        self.assertEqual(first['analyses'][0]['user_details']['location'], 'N/A')
+
+        status, body = self.get(dashboard_analyses, company='Acme', min_match=50)
+        self.assertEqual([row['id'] for row in body['analyses']], [analyses[0].id])
+        self.assertEqual(self.get(dashboard_analyses, since='yesterday')[0], 400)
+
+
+class SkillBitsetTests(TestCase):
+    def test_bitsets_match_the_set_based_overlap(self):
+        from job_analysis.management.commands.benchmark_skill_overlap import _set_overlap
+        from job_analysis.skills import (
+            SKILL_TAXONOMY, batch_skill_overlap, bitset_to_skills, bitset_to_words, encode_skill_matrix,
+            skill_overlap, skills_match_percentage, skills_to_bitset,
+        )
+
+        rng = random.Random(0)
+        for _ in range(200):
+            resume_skills = rng.sample(SKILL_TAXONOMY, rng.randint(0, 30))
+            jd_skills = rng.sample(SKILL_TAXONOMY, rng.randint(0, 30))
+            matching, missing, extra, percentage = _set_overlap(resume_skills, jd_skills)
+
+            resume_bits, jd_bits = skills_to_bitset(resume_skills), skills_to_bitset(jd_skills)
+            # Bitsets decode in taxonomy order, where the sets came back in arbitrary order.
+            self.assertEqual([sorted(bitset_to_skills(bits)) for bits in skill_overlap(resume_bits, jd_bits)],
+                             [sorted(matching), sorted(missing), sorted(extra)])
+            self.assertAlmostEqual(skills_match_percentage(resume_bits, jd_bits), percentage)
+
+            batch = batch_skill_overlap(bitset_to_words(resume_bits), encode_skill_matrix([jd_bits]))
+            self.assertEqual([int(batch[key][0]) for key in ('matching', 'missing', 'extra')],
+                             [len(matching), len(missing), len(extra)])
+            self.assertAlmostEqual(float(batch['skills_match_percentage'][0]), percentage)
+
+
+class TrendRollupTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True)
+        self.job = JobDescription.objects.create(user=self.admin, title='Engineer', company_name='Acme', description='-')
+        self.resume = Resume.objects.create(user=self.admin)
+
+    def analyze(self, score, missing='', extra=''):
+        return ResumeAnalysis.objects.create(user=self.admin, job_description=self.job, resume=self.resume,
+                                             match_percentage=score, missing_skills=missing, extra_skills=extra)
+
+    def get(self, view, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.admin
+        response = view(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_skill_counts_follow_analyses(self):
+        from job_analysis.admin_views import skill_trends
+
+        first = self.analyze(50.0, missing='Docker, Kubernetes', extra='Python')
+        self.analyze(70.0, missing='kubernetes, Not A Skill')
+        _, body = self.get(skill_trends)
+        self.assertEqual(body['skills'], [{'skill': 'Kubernetes', 'analyses': 2}, {'skill': 'Docker', 'analyses': 1}])
+        self.assertEqual(self.get(skill_trends, kind='extra')[1]['skills'], [{'skill': 'Python', 'analyses': 1}])
+
+        first.missing_skills = 'Docker'
+        first.save(update_fields=['missing_skills'])
+        self.assertEqual(self.get(skill_trends)[1]['skills'][0], {'skill': 'Docker', 'analyses': 1})
+        first.delete()
+        _, body = self.get(skill_trends, skill='KUBERNETES', since=str(rollups.day_of(timezone.now()) - timedelta(days=2)))
+        self.assertEqual(body['skill'], 'Kubernetes')
+        self.assertEqual([day['analyses'] for day in body['trend']], [0, 0, 1])
+
+    def test_match_trend_is_zero_filled_and_validated(self):
+        from job_analysis.admin_views import analysis_trends
+
+        self.analyze(40.0)
+        self.analyze(60.0)
+        today = rollups.day_of(timezone.now())
+        _, body = self.get(analysis_trends, since=str(today - timedelta(days=1)))
+        self.assertEqual(body['trend'], [
+            {'day': str(today - timedelta(days=1)), 'analyses': 0, 'average_match': None},
+            {'day': str(today), 'analyses': 2, 'average_match': 50.0},
+        ])
+        self.assertEqual(self.get(analysis_trends, company='Globex')[1]['trend'][-1]['analyses'], 0)
+        self.assertEqual(self.get(analysis_trends, since=str(today), until=str(today - timedelta(days=1)))[0], 400)
+        self.assertEqual(self.get(analysis_trends, since='2000-01-01')[0], 400)
+
+    def test_default_range_ends_today_with_and_without_time_zones(self):
+        from job_analysis.admin_views import analysis_trends
+
+        for use_tz in (False, True):
+            with self.subTest(use_tz=use_tz), override_settings(USE_TZ=use_tz):
+                analysis = self.analyze(40.0)
+                status, body = self.get(analysis_trends)
+                self.assertEqual(status, 200)
+                self.assertEqual(body['until'], str(rollups.day_of(timezone.now())))
+                self.assertEqual(len(body['trend']), 30)
+                self.assertEqual(body['trend'][-1]['analyses'], 1)
+                analysis.delete()
+
+    def test_catch_up_rolls_up_days_without_rollups(self):
+        from job_analysis.models import AnalysisDayStat, SkillDayStat
+
+        analysis = self.analyze(80.0, missing='Docker')
+        ResumeAnalysis.objects.filter(pk=analysis.pk).update(analyzed_at=analysis.analyzed_at - timedelta(days=10))
+        AnalysisDayStat.objects.all().delete()
+        SkillDayStat.objects.all().delete()
+        self.analyze(20.0, missing='Docker')
+        call_command('rebuild_rollups', missing=True, stdout=io.StringIO())
+
+        self.assertEqual(AnalysisDayStat.objects.count(), 2)
+        self.assertEqual(rollups.top_skills(SkillDayStat.KIND_MISSING, None, None), [{'skill': 'Docker', 'analyses': 2}])
+
+
+class SkillLinkTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create(email='admin@example.com', username='admin', is_admin=True)
+        self.jane = CustomUser.objects.create(email='jane@example.com', username='jane')
+        self.job = JobDescription.objects.create(user=self.admin, title='Engineer', description='-',
+                                                 skills_required='Python, Docker, Kubernetes')
+
+    def analyze(self, user, missing, extra=''):
+        resume, _ = Resume.objects.get_or_create(user=user)
+        return ResumeAnalysis.objects.create(user=user, job_description=self.job, resume=resume,
+                                             match_percentage=50.0, missing_skills=missing, extra_skills=extra)
+
+    def gaps(self, **params):
+        from job_analysis.admin_views import skill_gaps
+
+        request = RequestFactory().get('/', params)
+        request.user = self.admin
+        response = skill_gaps(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_backfill_and_skill_gaps(self):
+        from job_analysis.models import AnalysisSkill, JobDescriptionSkill
+
+        self.analyze(self.admin, 'Kubernetes, Docker', extra='Git')
+        self.analyze(self.jane, 'Kubernetes')
+        self.analyze(self.jane, 'kubernetes, Unknown Thing')
+        call_command('backfill_skill_links', batch_size=2, stdout=io.StringIO())
+        call_command('backfill_skill_links', stdout=io.StringIO())
+
+        self.assertEqual(sorted(self.job.normalized_skills.values_list('name', flat=True)), ['Docker', 'Kubernetes', 'Python'])
+        self.assertEqual(JobDescriptionSkill.objects.count(), 3)
+        self.assertEqual(AnalysisSkill.objects.count(), 5)
+
+        _, body = self.gaps()
+        self.assertEqual(body['skills'], [
+            {'skill': 'Kubernetes', 'candidates': 2, 'analyses': 3},
+            {'skill': 'Docker', 'candidates': 1, 'analyses': 1},
+        ])
+        self.assertEqual(self.gaps(skill='docker')[1]['skills'], [{'skill': 'Docker', 'candidates': 1, 'analyses': 1}])
+        self.assertEqual(self.gaps(kind='extra')[1]['skills'][0]['skill'], 'Git')
+        self.assertEqual(self.gaps(skill='Cobol 2000')[0], 400)
+
+    def test_sync_replaces_rows(self):
+        from job_analysis.models import AnalysisSkill
+        from job_analysis.skills import sync_analysis_skills, sync_job_description_skills
+
+        analysis = self.analyze(self.jane, '')
+        sync_analysis_skills([(analysis.pk, self.jane.pk, ['Docker', 'Git'], ['Python'])])
+        sync_analysis_skills([(analysis.pk, self.jane.pk, 'Docker', '')])
+        self.assertEqual(list(AnalysisSkill.objects.values_list('skill__name', 'kind')), [('Docker', 'missing')])
+
+        sync_job_description_skills(self.job, ['Git'])
+        self.assertEqual(list(self.job.normalized_skills.values_list('name', flat=True)), ['Git'])
+
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in ('nltk', 'sklearn', 'pdfplumber', 'docx')),
+    'resume analysis dependencies are not installed'
+)
+class AnalyzeResumeTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(email='jane@example.com', username='jane')
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def docx(self, *paragraphs):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from docx import Document
+
+        document = Document()
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+        content = io.BytesIO()
+        document.save(content)
+        return SimpleUploadedFile('resume.docx', content.getvalue())
+
+    def test_experience_and_degree_come_from_the_raw_text(self):
+        from job_analysis.views.analysis_views import analyze_resume
+
+        request = RequestFactory().post('/', {
+            'resume_pdf': self.docx('Master of Science in Computer Science.', '5 years of experience with Python.'),
+            'job_description_text': 'Python developer with 3 years of experience.',
+        }, HTTP_AUTHORIZATION=f'Bearer {jwt_encode(self.user)}')
+        self.assertEqual(analyze_resume(request).status_code, 200)
+
+        resume = Resume.objects.get(user=self.user)
+        self.assertEqual((resume.experience_years, resume.experience), (5, '5'))
+        self.assertEqual(resume.degree_level, 3)
+        self.assertEqual(JobDescription.objects.get(user=self.user).experience_required, '3')
+
+    def test_analysis_rollups_and_skill_links_commit_together(self):
+        from job_analysis.models import AnalysisDayStat
+        from job_analysis.views import analysis_views
+
+        request = RequestFactory().post('/', {
+            'resume_pdf': self.docx('Python and SQL developer.'),
+            'job_description_text': 'Python developer who knows Docker.',
+        }, HTTP_AUTHORIZATION=f'Bearer {jwt_encode(self.user)}')
+        with mock.patch.object(analysis_views, 'sync_analysis_skills', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            analysis_views.analyze_resume(request)
+        self.assertFalse(ResumeAnalysis.objects.exists())
+        self.assertFalse(AnalysisDayStat.objects.exists())
+
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in ('nltk', 'sklearn', 'pdfplumber')),
+    'resume analysis dependencies are not installed'
+)
+class RescoreAnalysesTests(TestCase):
+    def setUp(self):
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'rescore.json')
+
+    def analyze(self, email):
+        user = CustomUser.objects.create(email=email, username=email)
+        resume = Resume.objects.create(user=user, content='python django developer')
+        job = JobDescription.objects.create(user=user, title='Engineer', description='python docker developer')
+        return ResumeAnalysis.objects.create(user=user, job_description=job, resume=resume, match_percentage=0.0,
+                                             missing_skills='', extra_skills='', engine_version='0')
+
+    def rescore(self):
+        out = io.StringIO()
+        call_command('rescore_analyses', workers=1, batch_size=1, checkpoint=self.checkpoint, stdout=out)
+        return out.getvalue()
+
+    def test_resumes_from_checkpoint_and_skips_replaced_resumes(self):
+        from job_analysis.views.analysis_views import SCORING_ENGINE_VERSION
+
+        done, replaced, pending = (self.analyze(f'{name}@example.com') for name in ('done', 'replaced', 'pending'))
+        Resume.objects.filter(pk=replaced.resume_id).update(updated_at=replaced.analyzed_at + timedelta(minutes=1))
+        with open(self.checkpoint, 'w') as fh:
+            json.dump({'last_pk': done.pk}, fh)
+
+        output = self.rescore()
+        self.assertIn(f"Resuming after analysis {done.pk}.", output)
+        self.assertIn("1 whose resume was replaced", output)
+        versions = dict(ResumeAnalysis.objects.values_list('pk', 'engine_version'))
+        self.assertEqual(versions, {done.pk: '0', replaced.pk: '0', pending.pk: SCORING_ENGINE_VERSION})
+        pending.refresh_from_db()
+        self.assertEqual((pending.missing_skills, pending.extra_skills), ('Docker', 'Django'))
+        self.assertGreater(pending.match_percentage, 0)
+        with open(self.checkpoint) as fh:
+            self.assertEqual(json.load(fh), {'last_pk': pending.pk})
@@ -0,0 +1,163 @@
+"""
+Cache from verified token claims to the authentication fields of their user.
+
+Authenticated requests would otherwise cost one ``CustomUser`` query each. The
+cache stores only ``AUTH_FIELDS`` (never the password hash or profile), and
+every hit rebuilds an instance with ``from_db`` that can be used as a foreign
+key or for permission checks; its other fields are deferred. Views that read or
+write the profile load the current row with ``utils.load_user`` first, so a
+stale entry can never be saved back over newer data.
+
+Entries expire after ``TTL`` seconds, the in-process store is a bounded LRU, and
+``signals.py`` invalidates a user's entries on ``post_save`` / ``post_delete``.
+Queryset ``update()`` calls bypass those signals and must call
+``invalidate_user`` themselves. The in-process store only sees invalidations
+made by its own process; setting ``ALIAS`` to a Django cache alias stores
+entries in that backend instead, so all worker processes share one cache and a
+revocation reaches every worker at once.
+
+Configured through ``settings.JWT_USER_CACHE``::
+
+    JWT_USER_CACHE = {'ENABLED': True, 'MAX_SIZE': 10000, 'TTL': 300, 'ALIAS': None}
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from job_analysis.models import CustomUser
+
+DEFAULTS = {'ENABLED': True, 'MAX_SIZE': 10000, 'TTL': 300, 'ALIAS': None}
+
+# What resolve_token_user and the permission checks read; everything else is deferred.
+# from_db() takes partial values in concrete field order.
+AUTH_FIELDS = tuple(
+    field.attname for field in CustomUser._meta.concrete_fields
+    if field.attname in {'id', 'token_version', 'is_active', 'is_staff', 'is_admin'}
+)
+_PK_INDEX = AUTH_FIELDS.index(CustomUser._meta.pk.attname)
+
+
+def snapshot(user):
+    return tuple(getattr(user, name) for name in AUTH_FIELDS)
+
+
+def restore(values):
+    return CustomUser.from_db('default', AUTH_FIELDS, values)
+
+
+class TokenUserCache:
+    def __init__(self, max_size=DEFAULTS['MAX_SIZE'], ttl=DEFAULTS['TTL'], alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = caches[alias] if alias else None
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return a fresh user instance for ``key``, or None on a miss or expired entry."""
+        if self.shared is not None:
+            values = self.shared.get(f'jwt_user:{key}')
+        else:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < time.monotonic():
+                    self._drop(key)
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                values = entry[1] if entry is not None else None
+
+        with self._lock:
+            if values is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return restore(values) if values is not None else None
+
+    def set(self, key, user):
+        values = snapshot(user)
+        if self.shared is not None:
+            keys_key = f'jwt_user:keys:{user.pk}'
+            keys = set(self.shared.get(keys_key) or ())
+            keys.add(key)
+            self.shared.set_many({f'jwt_user:{key}': values, keys_key: keys}, timeout=self.ttl)
+            return
+
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, user):
+        """Forget every entry that resolved to ``user`` (including ones keyed by an old email)."""
+        if self.shared is not None:
+            keys_key = f'jwt_user:keys:{user.pk}'
+            keys = self.shared.get(keys_key) or ()
+            self.shared.delete_many([keys_key, *(f'jwt_user:{key}' for key in keys)])
+            return
+
+        with self._lock:
+            for key in list(self._keys_by_user.get(user.pk, ())):
+                self._drop(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_pk = entry[1][_PK_INDEX]
+        keys = self._keys_by_user.get(user_pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_pk]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'shared' if self.shared is not None else 'local',
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_token_user_cache():
+    """The process-wide cache, or None when ``JWT_USER_CACHE['ENABLED']`` is false."""
+    global _cache
+    config = {**DEFAULTS, **getattr(settings, 'JWT_USER_CACHE', {})}
+    if not config['ENABLED']:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TokenUserCache(max_size=config['MAX_SIZE'], ttl=config['TTL'], alias=config['ALIAS'])
+    return _cache
+
+
+def reset_token_user_cache():
+    """Drop the process-wide cache so the next lookup rebuilds it from current settings."""
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -1,11 +1,13 @@
 from django.urls import path
 from django.views.generic import TemplateView
 from .views import user_views, feedback_views, analysis_views, contact_views
+from . import admin_views, media_views, search_views
 
 urlpatterns = [
     # USER API'S
     path('user_register/', user_views.user_register, name='user_register'),
     path('user_login/', user_views.user_login, name='user_login'),
+    path('refresh_token/', user_views.refresh_token_view, name='refresh_token'),
     path('user_details/', user_views.get_user_details, name='user_detail'),
     path('edit_user_details/', user_views.edit_user_details_view, name='edit_user_details'),
     path('edit_profile_picture/', user_views.edit_profile_picture_view, name='edit_profile_picture'),
@@ -25,4 +27,25 @@ urlpatterns = [
     # CONTACT US API
     path('contact_us/', contact_views.contact_us, name='contact_us'),
 
+    # SEARCH API
+    path('search/', search_views.search_community_view, name='search_community'),
+
+    # MEDIA
+    path('media/<path:path>', media_views.protected_media, name='protected_media'),
+
+    # ADMIN API'S
+    path('admin_dashboard/', admin_views.admin_dashboard, name='admin_dashboard'),
+    path('admin_dashboard/analyses/', admin_views.dashboard_analyses, name='dashboard_analyses'),
+    path('admin_dashboard/export/', admin_views.export_dashboard_analyses, name='export_dashboard_analyses'),
+    path('analysis_trends/', admin_views.analysis_trends, name='analysis_trends'),
+    path('skill_trends/', admin_views.skill_trends, name='skill_trends'),
+    path('skill_gaps/', admin_views.skill_gaps, name='skill_gaps'),
+    path('candidate_search/', admin_views.candidate_search, name='candidate_search'),
+    path('search_analyses/', admin_views.search_analyses, name='search_analyses'),
+    path('rank_resumes/', admin_views.rank_resumes, name='rank_resumes'),
+    path('job_descriptions/<int:job_description_id>/similar/', admin_views.similar_job_descriptions, name='similar_job_descriptions'),
+    path('token_cache_stats/', admin_views.token_cache_stats, name='token_cache_stats'),
+    path('email_outbox_stats/', admin_views.email_outbox_stats, name='email_outbox_stats'),
+    path('import_users/', admin_views.import_users_view, name='import_users'),
+
 ]
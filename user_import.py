@@ -0,0 +1,156 @@
+"""
+Bulk user import from CSV or JSON Lines.
+
+Each row needs an ``email``; ``password``, ``first_name``, ``last_name`` and
+``phone_number`` are optional (users without a password get an unusable one
+and can set it through the forgot-password flow). Rows are handled in
+batches:
+
+1. emails that already exist are skipped before any hashing is done,
+2. the remaining passwords are hashed, in a process pool when one is given,
+3. users are inserted with ``bulk_create(ignore_conflicts=True)`` so a
+   concurrent registration of the same email is skipped rather than fatal,
+4. welcome emails go to the outbox in the same transaction, so the sender
+   delivers them after the import commits, and only to the users this batch
+   inserted: they are told apart from racing registrations by their salted
+   password hash, which is unique to this import.
+
+``import_users`` reports progress after each batch through ``on_batch`` with
+the number of input rows consumed so far, which the command stores as its
+resume checkpoint.
+"""
+import csv
+import io
+import json
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from job_analysis.models import CustomUser
+from job_analysis.outbox import queue_emails
+
+# Also sent by user_views.user_register, so imported and self-registered users get the same email.
+WELCOME_SUBJECT = 'Thank you for registering!'
+WELCOME_MESSAGE = '<div style="display: flex; align-items: center; justify-content: center; flex-direction: column; padding: 20px; border: 1px solid #ccc; border-radius: 10px;">' \
+                  '<h1 style="color: #333; font-weight: 600; font-size: 24px; margin-bottom: 10px;">Thank you for registering!</h1>' \
+                  '<p style="color: #666; font-size: 16px; line-height: 1.5; margin-bottom: 20px;">We are excited to have you on board.</p>' \
+                  '</div>'
+
+FIELDS = ('first_name', 'last_name', 'phone_number')
+
+
+def read_rows(fh, fmt):
+    """Yield one dict per record of a text file object in ``csv`` or ``jsonl`` format."""
+    if fmt == 'csv':
+        yield from csv.DictReader(fh)
+    elif fmt == 'jsonl':
+        for line in fh:
+            line = line.strip()
+            yield json.loads(line) if line else {}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def detect_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def hash_password(password):
+    """Hash one password; module level so it can run in a worker process."""
+    return make_password(password or None)
+
+
+def _clean(row):
+    email = (row.get('email') or '').strip()
+    validate_email(email)
+    return email
+
+
+def _import_batch(rows, pool, send_welcome_email):
+    """Insert one batch of rows and return ``(created, skipped, invalid)``."""
+    cleaned = {}
+    invalid = 0
+    for row in rows:
+        try:
+            email = _clean(row)
+        except ValidationError:
+            invalid += 1
+            continue
+        cleaned.setdefault(email, row)
+
+    existing = set(CustomUser.objects.filter(email__in=list(cleaned)).values_list('email', flat=True))
+    pending = [(email, row) for email, row in cleaned.items() if email not in existing]
+
+    passwords = [row.get('password') for _, row in pending]
+    if pool is not None and len(passwords) > 1:
+        hashes = pool.map(hash_password, passwords)
+    else:
+        hashes = [hash_password(password) for password in passwords]
+
+    users = [
+        CustomUser(
+            email=email,
+            password=hashed,
+            username=email.split('@')[0],
+            profile_picture='profile_pictures/default_male_image.png',
+            **{field: (row.get(field) or '').strip() for field in FIELDS},
+        )
+        for (email, row), hashed in zip(pending, hashes)
+    ]
+
+    inserted = {user.email: user.password for user in users}
+    with transaction.atomic():
+        # A registration racing this batch makes its row a silent no-op instead of an IntegrityError.
+        CustomUser.objects.bulk_create(users, ignore_conflicts=True)
+        created = [
+            email for email, password in
+            CustomUser.objects.filter(email__in=list(inserted)).values_list('email', 'password')
+            if inserted[email] == password
+        ]
+        if send_welcome_email and created:
+            queue_emails(WELCOME_SUBJECT, WELCOME_MESSAGE, created, html_message=WELCOME_MESSAGE)
+
+    return len(created), len(rows) - len(created) - invalid, invalid
+
+
+def import_users(rows, batch_size=500, pool=None, send_welcome_email=True, skip=0, on_batch=None):
+    """
+    Import ``rows`` (an iterable of dicts) and return the totals.
+
+    The first ``skip`` rows are passed over, which is how an interrupted import
+    resumes. ``on_batch(totals)`` is called after every committed batch.
+    """
+    totals = {'rows': skip, 'created': 0, 'skipped': 0, 'invalid': 0, 'seconds': 0.0}
+    started = time.monotonic()
+    batch = []
+    for index, row in enumerate(rows):
+        if index < skip:
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _record(totals, batch, _import_batch(batch, pool, send_welcome_email), started, on_batch)
+            batch = []
+    if batch:
+        _record(totals, batch, _import_batch(batch, pool, send_welcome_email), started, on_batch)
+    totals['seconds'] = round(time.monotonic() - started, 3)
+    return totals
+
+
+def _record(totals, batch, result, started, on_batch):
+    created, skipped, invalid = result
+    totals['rows'] += len(batch)
+    totals['created'] += created
+    totals['skipped'] += skipped
+    totals['invalid'] += invalid
+    totals['seconds'] = round(time.monotonic() - started, 3)
+    if on_batch is not None:
+        on_batch(totals)
+
+
+def import_uploaded_file(uploaded_file, send_welcome_email=True):
+    """Import a Django ``UploadedFile`` in-process, for the admin upload endpoint."""
+    fh = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig')
+    return import_users(read_rows(fh, detect_format(uploaded_file.name)), send_welcome_email=send_welcome_email)
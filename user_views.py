@@ -1,24 +1,58 @@
 import json
 from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import authenticate, login, user_logged_in
 from django.views.decorators.http import require_http_methods
 
 from job_analysis.models import CustomUser
 
-from job_analysis.utils import jwt_encode, jwt_decode, auth_user
+from job_analysis.outbox import queue_email
+from job_analysis.user_import import WELCOME_MESSAGE, WELCOME_SUBJECT
+from job_analysis.utils import REFRESH_TOKEN, jwt_encode, jwt_required, load_user, resolve_token_user, revoke_tokens
 
 from django.forms.models import model_to_dict
 from django.conf import settings
 import random
-from job_analysis.models import OTP
-from django.core.mail import send_mail
+from job_analysis.models import OTP, ImageJob
+from job_analysis import image_variants
+from job_analysis.projection import Field, Projection, iso_datetime, media_url
 
 
 # =============================== #
 # ========== User API's ========== #
 # =============================== #
+# The model_to_dict(user) keys without the password hash, token_version and the
+# groups/user_permissions many-to-many lists (two queries per request).
+USER_DETAILS = Projection({
+    'last_login': Field('last_login', iso_datetime),
+    'is_superuser': 'is_superuser',
+    'is_staff': 'is_staff',
+    'is_active': 'is_active',
+    'date_joined': Field('date_joined', iso_datetime),
+    'id': 'id',
+    'email': 'email',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'username': 'username',
+    'phone_number': 'phone_number',
+    'dob': 'dob',
+    'marital_status': 'marital_status',
+    'nationality': 'nationality',
+    'gender': 'gender',
+    'country': 'country',
+    'city': 'city',
+    'address': 'address',
+    'zip_code': 'zip_code',
+    'is_admin': 'is_admin',
+    'is_customer': 'is_customer',
+    'is_email': 'is_email',
+    'login_by': 'login_by',
+    'two_factor': 'two_factor',
+    'profile_picture': Field('profile_picture', media_url),
+})
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def user_register(request):
@@ -49,29 +83,22 @@ def user_register(request):
         username = email.split('@')[0]
 
         hashed_password = make_password(password)
-        encoded_token = jwt_encode(email)
-        CustomUser.objects.create(email=email, password=hashed_password, first_name=first_name,
-                            last_name=last_name, username=username, phone_number=phone_number,
-                            profile_picture='profile_pictures/default_male_image.png')
-
-        subject = 'Thank you for registering!'
-        message = '<div style="display: flex; align-items: center; justify-content: center; flex-direction: column; padding: 20px; border: 1px solid #ccc; border-radius: 10px;">' \
-                  '<h1 style="color: #333; font-weight: 600; font-size: 24px; margin-bottom: 10px;">Thank you for registering!</h1>' \
-                  '<p style="color: #666; font-size: 16px; line-height: 1.5; margin-bottom: 20px;">We are excited to have you on board.</p>' \
-                  '</div>'
-        send_mail(
-            subject,
-            message,
-            settings.EMAIL_HOST_USER,
-            [email],
-            fail_silently=False,
-            html_message=message
-        )
+        with transaction.atomic():
+            user = CustomUser.objects.create(email=email, password=hashed_password, first_name=first_name,
+                                last_name=last_name, username=username, phone_number=phone_number,
+                                profile_picture='profile_pictures/default_male_image.png')
+            queue_email(
+                WELCOME_SUBJECT,
+                WELCOME_MESSAGE,
+                [email],
+                html_message=WELCOME_MESSAGE
+            )
 
         return JsonResponse(
             {'status': 'success',
              'message': 'User registered successfully',
-             'token': str(encoded_token)},
+             'token': jwt_encode(user),
+             'refresh_token': jwt_encode(user, REFRESH_TOKEN)},
             status=201
         )
     except json.JSONDecodeError:
@@ -106,23 +133,25 @@ def user_login(request):
         user = authenticate(request, username=email, password=password)
 
         if user is not None:
-            login(request, user)
-            token = jwt_encode(email)
+            # API clients authenticate with the JWT; only create a session when one is asked for.
+            if data.get('session', not getattr(settings, 'JWT_STATELESS_LOGIN', True)):
+                login(request, user)
+            else:
+                user_logged_in.send(sender=user.__class__, request=request, user=user)
             subject = 'Login successful!'
             message = '<p>You have successfully logged in to our platform.</p>' \
                       '<p>Thanks for using our service.</p>' \
                       '<p>Best regards,</p>' \
                       '<p>The Team</p>'
-            send_mail(
+            queue_email(
                 subject,
                 message,
-                settings.EMAIL_HOST_USER,
                 [email],
-                fail_silently=False,
                 html_message=message
             )
             return JsonResponse(
-                {'status': 'success', 'message': 'Login successful.', 'token': str(token)},
+                {'status': 'success', 'message': 'Login successful.',
+                 'token': jwt_encode(user), 'refresh_token': jwt_encode(user, REFRESH_TOKEN)},
                 status=200
             )
         else:
@@ -143,48 +172,40 @@ def user_login(request):
         )
 
 @csrf_exempt
-@require_http_methods(["GET"])
-def get_user_details(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'status': 'failed', 'message': 'Authentication header is required.'}, status=401)
+@require_http_methods(["POST"])
+def refresh_token_view(request):
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON in request body.'}, status=400)
 
-    token = bearer.split()[1]
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return JsonResponse({'success': False, 'message': 'Refresh token is required.'}, status=400)
 
-    if not auth_user(token):
-        return JsonResponse({'status': 'failed', 'message': 'Invalid token data.'}, status=401)
+    user = resolve_token_user(refresh_token, token_type=REFRESH_TOKEN)
+    if user is None:
+        return JsonResponse({'success': False, 'message': 'Invalid or expired refresh token.'}, status=401)
 
-    decoded_token = jwt_decode(token)
-    email = decoded_token.get('email')
+    return JsonResponse({'success': True, 'message': 'Token refreshed successfully.', 'token': jwt_encode(user)}, status=200)
 
-    try:
-        user = CustomUser.objects.get(email=email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'status': 'failed', 'message': 'User not found.'}, status=404)
+@csrf_exempt
+@require_http_methods(["GET"])
+@jwt_required
+def get_user_details(request):
+    user = load_user(request.user)
 
-    user_data = model_to_dict(user)
-    user_data['profile_picture'] = user.profile_picture.url if user.profile_picture else None
+    user_data = USER_DETAILS.from_instance(user)
+    variants = image_variants.variants_for([user.profile_picture.name]).get(user.profile_picture.name)
+    user_data['profile_picture_variants'] = image_variants.variant_urls(variants)
 
     return JsonResponse({'status': 'success', 'message': 'User details retrieved successfully.', 'user': user_data}, status=200)
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def edit_user_details_view(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+    user = load_user(request.user)
 
     data = request.POST
     if data.get('first_name'):
@@ -196,17 +217,15 @@ def edit_user_details_view(request):
     if data.get('phone_number'):
         user.phone_number = data.get('phone_number')
 
-    user.save()
+    user.save(update_fields=['first_name', 'last_name', 'username', 'phone_number'])
 
     user_details = model_to_dict(user, exclude=['password'])
     user_details['profile_picture'] = str(user.profile_picture.url)
 
-    send_mail(
+    queue_email(
         'User details edited successfully!',
         'Your user details have been successfully edited.',
-        settings.EMAIL_HOST_USER,
-        [user_email],
-        fail_silently=False,
+        [user.email]
     )
 
     return JsonResponse({"success": True, "message": "User details edited successfully.", "user_details": user_details}, status=200)
@@ -214,39 +233,26 @@ def edit_user_details_view(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@jwt_required
 def edit_profile_picture_view(request):
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
-
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
-
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-
+    user = load_user(request.user)
     uploaded_image = request.FILES.get('profile_picture')
 
-    try:
-        user = CustomUser.objects.get(email=user_email)
-    except CustomUser.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-
     if not uploaded_image:
         return JsonResponse({'success': False, 'message': 'No profile picture uploaded.'}, status=400)
 
     try:
-        user.profile_picture.save(uploaded_image.name, uploaded_image)
-        user.save()
+        user.profile_picture.save(uploaded_image.name, uploaded_image, save=False)
+        user.save(update_fields=['profile_picture'])
         user_details = model_to_dict(user, exclude=['password'])
         user_details['profile_picture'] = str(user.profile_picture.url)
-        send_mail(
+        # Variants are produced by `manage.py process_images`; clients use the original until then.
+        image_variants.queue_image(user.profile_picture, ImageJob.KIND_PROFILE_PICTURE, user.id)
+        user_details['profile_picture_variants'] = None
+        queue_email(
             'Profile picture edited successfully!',
             'Your profile picture has been successfully edited.',
-            settings.EMAIL_HOST_USER,
-            [user_email],
-            fail_silently=False,
+            [user.email]
         )
         return JsonResponse({"success": True, "message": "Profile picture edited successfully.", "user_details": user_details}, status=200)
     except Exception as e:
@@ -270,12 +276,10 @@ def forgot_password_api(request):
             OTP.objects.filter(user=user).delete()
             code = str(random.randint(0, 9999)).zfill(4)
             OTP.objects.create(user=user, code=code)
-            send_mail(
+            queue_email(
                 'Password Reset OTP',
                 f'Your OTP for password reset is: {code}',
-                settings.EMAIL_HOST_USER,
-                [user.email],
-                fail_silently=False,
+                [user.email]
             )
             return JsonResponse({'success': True, 'message': 'OTP sent to your email.'}, status=200)
 
@@ -290,36 +294,28 @@ def forgot_password_api(request):
         if not new_password:
             return JsonResponse({'success': True, 'message': 'OTP verified successfully.'}, status=200)
 
-        user.set_password(new_password)
-        user.save()
-        otp.delete()
-        send_mail(
-            'Password Reset Successful!',
-            'Your password has been successfully reset.',
-            settings.EMAIL_HOST_USER,
-            [user.email],
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            user.set_password(new_password)
+            user.save()
+            revoke_tokens(user)
+            otp.delete()
+            queue_email(
+                'Password Reset Successful!',
+                'Your password has been successfully reset.',
+                [user.email]
+            )
         return JsonResponse({'success': True, 'message': 'Password reset successfully.'}, status=200)
     except Exception as e:
         return JsonResponse({'success': False, 'message': f'Error: {str(e)}'}, status=500)
 
 @csrf_exempt
+@jwt_required
 def change_password(request):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Invalid request method. Use POST.'}, status=405)
-    
-    bearer = request.headers.get('Authorization')
-    if not bearer:
-        return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
 
-    token = bearer.split()[1]
-    if not auth_user(token):
-        return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
+    user = load_user(request.user)
 
-    decoded_token = jwt_decode(token)
-    user_email = decoded_token.get('email')
-    
     try:
         data = json.loads(request.body)
         current_password = data.get('current')
@@ -332,17 +328,18 @@ def change_password(request):
         if new_password != confirm_password:
             return JsonResponse({'success': False, 'message': 'New passwords do not match.'}, status=400)
 
-        try:
-            user = CustomUser.objects.get(email=user_email)
-            if not user.check_password(current_password):
-                return JsonResponse({'success': False, 'message': 'Current password is incorrect.'}, status=400)
+        if not user.check_password(current_password):
+            return JsonResponse({'success': False, 'message': 'Current password is incorrect.'}, status=400)
 
-            user.set_password(new_password)
-            user.save()
-            return JsonResponse({'success': True, 'message': 'Password updated successfully.'})
-            
-        except CustomUser.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
+        user.set_password(new_password)
+        user.save(update_fields=['password'])
+        revoke_tokens(user)
+        return JsonResponse({
+            'success': True,
+            'message': 'Password updated successfully.',
+            'token': jwt_encode(user),
+            'refresh_token': jwt_encode(user, REFRESH_TOKEN)
+        })
 
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data.'}, status=400)
@@ -1,9 +1,36 @@
 import jwt
+from datetime import timedelta
+from functools import wraps
 from django.conf import settings
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils import timezone
 from job_analysis.models import CustomUser
+from job_analysis.token_cache import get_token_user_cache
 
-def jwt_encode(email):
-    encoded_token = jwt.encode({'email': email}, settings.SECRET_KEY, algorithm='HS256')
+ACCESS_TOKEN = 'access'
+REFRESH_TOKEN = 'refresh'
+
+def jwt_encode(user, token_type=ACCESS_TOKEN):
+    """
+    Sign a token for ``user`` carrying its pk, the token type and the user's token version.
+
+    Access tokens live for ``JWT_ACCESS_TOKEN_LIFETIME``, refresh tokens for
+    ``JWT_REFRESH_TOKEN_LIFETIME``. Bumping ``CustomUser.token_version`` revokes both.
+    """
+    if token_type == REFRESH_TOKEN:
+        lifetime = getattr(settings, 'JWT_REFRESH_TOKEN_LIFETIME', timedelta(days=30))
+    else:
+        lifetime = getattr(settings, 'JWT_ACCESS_TOKEN_LIFETIME', timedelta(minutes=15))
+    now = timezone.now()
+    payload = {
+        'uid': user.pk,
+        'ver': user.token_version,
+        'typ': token_type,
+        'iat': now,
+        'exp': now + lifetime,
+    }
+    encoded_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
     return encoded_token
 
 
@@ -12,11 +39,104 @@ def jwt_decode(token):
     return decoded_token
 
 
-def auth_user(token):
-    decoded_token = jwt_decode(token)
-    email = decoded_token['email']
-    obj = CustomUser.objects.filter(email=email).first()
-    if obj:
-        return True
-    else:
-        return False
\ No newline at end of file
+def revoke_tokens(user):
+    """Invalidate every token issued to ``user`` so far by bumping its token version."""
+    CustomUser.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    # update() skips post_save, so drop the cached snapshot here.
+    cache = get_token_user_cache()
+    if cache is not None:
+        cache.invalidate_user(user)
+
+
+def get_bearer_token(request):
+    """Return the token from an ``Authorization: Bearer <token>`` header, or None if it is malformed."""
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) != 2:
+        return None
+    return parts[1]
+
+
+def _cached_user(key, lookup):
+    cache = get_token_user_cache()
+    if cache is not None:
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+    user = CustomUser.objects.filter(**lookup).first()
+    if user is not None and cache is not None:
+        cache.set(key, user)
+    return user
+
+
+def resolve_token_user(token, token_type=ACCESS_TOKEN):
+    """
+    Verify ``token`` once and return its user, or None when either step fails.
+
+    Tokens must be of ``token_type`` and carry the user's current token version.
+    Email-only tokens issued before versioned tokens are accepted as access tokens
+    while ``JWT_ACCEPT_LEGACY_TOKENS`` is true, and only for users whose tokens were
+    never revoked: they carry no version, so ``token_version`` 0 is the only one they
+    can match. The user comes from the token-user
+    cache when enabled, else from a single primary-key (or email) query.
+    """
+    try:
+        decoded_token = jwt_decode(token)
+    except jwt.InvalidTokenError:
+        return None
+
+    uid = decoded_token.get('uid')
+    if uid is not None:
+        if decoded_token.get('typ') != token_type:
+            return None
+        user = _cached_user(f'uid:{uid}', {'pk': uid})
+        if user is None or user.token_version != decoded_token.get('ver'):
+            return None
+        return user
+
+    email = decoded_token.get('email')
+    if not email or token_type != ACCESS_TOKEN or not getattr(settings, 'JWT_ACCEPT_LEGACY_TOKENS', False):
+        return None
+    user = _cached_user(f'email:{email}', {'email': email})
+    if user is None or user.token_version != 0:
+        return None
+    return user
+
+
+def load_user(user):
+    """
+    The current row of a token user, for views that read or write its profile.
+
+    Users served from the token-user cache only carry ``AUTH_FIELDS``; this loads
+    the rest in one query instead of one per deferred field.
+    """
+    if not user.get_deferred_fields():
+        return user
+    return CustomUser.objects.get(pk=user.pk)
+
+
+def jwt_required(view_func):
+    """
+    Authenticate the request from its bearer token and attach the user as ``request.user``.
+
+    Responds 401 when the header is missing or malformed, the token does not verify,
+    has been revoked, or its user no longer exists, so views can rely on ``request.user``
+    directly.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.headers.get('Authorization'):
+            return JsonResponse({'success': False, 'message': 'Authentication header is required.'}, status=401)
+
+        token = get_bearer_token(request)
+        if token is None:
+            return JsonResponse({'success': False, 'message': 'Malformed authentication header.'}, status=401)
+
+        user = resolve_token_user(token)
+        if user is None:
+            return JsonResponse({'success': False, 'message': 'Invalid token data.'}, status=401)
+
+        request.user = user
+        return view_func(request, *args, **kwargs)
+    return wrapper